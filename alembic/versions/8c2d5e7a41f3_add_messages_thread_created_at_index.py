@@ -0,0 +1,25 @@
+"""Add (thread_id, created_at, id) index for message pagination
+
+Revision ID: 8c2d5e7a41f3
+Revises: 3f1492b30aee
+Create Date: 2026-10-18 09:12:04.511873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2d5e7a41f3'
+down_revision: Union[str, None] = '3f1492b30aee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_messages_thread_id_created_at_id', 'messages', ['thread_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_thread_id_created_at_id', table_name='messages')
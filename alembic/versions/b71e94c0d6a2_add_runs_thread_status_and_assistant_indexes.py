@@ -0,0 +1,29 @@
+"""Add (thread_id, status) and assistant_id indexes on runs
+
+Revision ID: b71e94c0d6a2
+Revises: 8c2d5e7a41f3
+Create Date: 2026-10-18 10:03:41.220917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e94c0d6a2'
+down_revision: Union[str, None] = '8c2d5e7a41f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # messages.thread_id lookups and (thread_id, created_at) ordering are served by the
+    # leading columns of ix_messages_thread_id_created_at_id from revision 8c2d5e7a41f3
+    op.create_index('ix_runs_thread_id_status', 'runs', ['thread_id', 'status'], unique=False)
+    op.create_index('ix_runs_assistant_id', 'runs', ['assistant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_runs_assistant_id', table_name='runs')
+    op.drop_index('ix_runs_thread_id_status', table_name='runs')
@@ -1,19 +1,19 @@
-import os
 from fastapi import FastAPI
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import text, inspect
 from models.models import Base
 from api.v1.routers import router as api_router
+from api.v1.async_routers import router as async_api_router
+from api.metrics import install_metrics
+from db.database import DATABASE_ASYNC, async_engine, engine, pool_status
 from ollama.new_clients.loggin_service import LoggingUtility
 
 # Initialize the logging utility
 logging_utility = LoggingUtility()
 
-# Update this with your actual database URL
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-engine = create_engine(DATABASE_URL)
-
 def drop_constraints():
+    # Foreign keys only have to be dropped before their tables on MySQL
+    if engine.dialect.name != "mysql":
+        return
     logging_utility.info("Dropping constraints")
     inspector = inspect(engine)
     with engine.connect() as connection:
@@ -39,20 +39,33 @@ def update_messages_content_column():
             connection.execute(text("ALTER TABLE messages MODIFY COLUMN content TEXT;"))
             logging_utility.info("Successfully updated messages.content column to TEXT")
         except Exception as e:
-            logging_utility.error(f"Error updating messages.content column: {str(e)}")
+            logging_utility.error("Error updating messages.content column: %s", e)
 
 def create_app(init_db=True):
     logging_utility.info("Creating FastAPI app")
     app = FastAPI()
 
-    # Include API routers
-    app.include_router(api_router, prefix="/v1")
+    # Request latency, per-service query timings, pool gauges and run transitions at GET /metrics
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine
+    install_metrics(app, engines)
+
+    # Include API routers, async handlers on an AsyncSession when DATABASE_ASYNC is set
+    app.include_router(async_api_router if DATABASE_ASYNC else api_router, prefix="/v1")
 
     @app.get("/")
     def read_root():
         logging_utility.info("Root endpoint accessed")
         return {"message": "Welcome to the API!"}
 
+    @app.get("/db/pool")
+    def read_pool_status():
+        status = {"sync": pool_status(engine)}
+        if async_engine is not None:
+            status["async"] = pool_status(async_engine)
+        return status
+
     if init_db:
         logging_utility.info("Initializing database")
         # Create database tables
@@ -0,0 +1,228 @@
+import contextvars
+import functools
+import inspect
+import time
+from typing import Dict
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event, inspect as inspect_state
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+from models.models import Run
+
+# Streamed runs last as long as the model takes to answer, so the buckets reach a few minutes
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+SERVICE_DURATION = Histogram(
+    "service_method_duration_seconds",
+    "Duration of service method calls",
+    ["operation"],
+)
+# The `_count` of this histogram is the number of queries
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of database queries, by the service method that issued them",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+RUN_TRANSITIONS = Counter(
+    "run_status_transitions",
+    "Run status changes written to the database",
+    ["from_status", "to_status"],
+)
+
+# Service method the current request is in; queries outside of one are counted as "other"
+_operation = contextvars.ContextVar("operation", default=None)
+_OTHER = QUERY_DURATION.labels("other")
+
+
+def _instrument(operation: str, method):
+    # Label children are made on the first call, so methods that never run do not export series
+    children = []
+
+    def bind():
+        if not children:
+            children.extend((SERVICE_DURATION.labels(operation), QUERY_DURATION.labels(operation)))
+        return children
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            # Nested service calls count towards the outermost one, the method the handler called
+            if _operation.get() is not None:
+                return await method(*args, **kwargs)
+            duration, queries = bind()
+            token = _operation.set(queries)
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                duration.observe(time.perf_counter() - start)
+                _operation.reset(token)
+    else:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if _operation.get() is not None:
+                return method(*args, **kwargs)
+            duration, queries = bind()
+            token = _operation.set(queries)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                duration.observe(time.perf_counter() - start)
+                _operation.reset(token)
+
+    return wrapper
+
+
+def instrument_service(cls):
+    """
+    Class decorator timing every method of a service, labelled `ClassName.method`, and counting
+    the database queries made while one is running towards it.
+    """
+    for name, method in list(vars(cls).items()):
+        if inspect.isfunction(method) and not name.startswith("__"):
+            setattr(cls, name, _instrument(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    (_operation.get() or _OTHER).observe(elapsed)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start so the next query is timed from its own
+    if context.connection is not None and (starts := context.connection.info.get("query_start")):
+        starts.pop()
+
+
+def _count_run_transitions(session, flush_context, instances):
+    for run in session.new:
+        if isinstance(run, Run) and run.status is not None:
+            RUN_TRANSITIONS.labels("none", run.status).inc()
+    for run in session.dirty:
+        if isinstance(run, Run):
+            history = inspect_state(run).attrs.status.history
+            if history.added and history.added[0] != (history.deleted or [None])[0]:
+                RUN_TRANSITIONS.labels(history.deleted[0] if history.deleted else "none", history.added[0]).inc()
+
+
+class PoolCollector:
+    """Reads the connection pools of the engines at scrape time, from the same numbers as `/db/pool`."""
+
+    GAUGES = {
+        "size": "Connections the pool keeps open",
+        "checked_out": "Connections in use",
+        "checked_in": "Idle connections in the pool",
+        "overflow": "Connections open beyond the pool size",
+    }
+    COUNTERS = {
+        "checkouts": "Connections handed out",
+        "timeouts": "Checkouts that gave up waiting for a connection",
+        "wait_seconds": "Time spent waiting for a connection",
+    }
+    # Metric names that differ from the keys of `pool_status`
+    KEYS = {"wait_seconds": "wait_time_total"}
+
+    def __init__(self, engines: Dict[str, object]):
+        self.engines = engines
+
+    def collect(self):
+        # Imported here so services can use `instrument_service` without creating the engines
+        from db.database import pool_status
+
+        gauges = {name: GaugeMetricFamily(f"db_pool_{name}", text, labels=["engine"]) for name, text in self.GAUGES.items()}
+        counters = {name: CounterMetricFamily(f"db_pool_{name}", text, labels=["engine"]) for name, text in self.COUNTERS.items()}
+        for label, engine in self.engines.items():
+            status = pool_status(engine)
+            for name, family in {**gauges, **counters}.items():
+                key = self.KEYS.get(name, name)
+                if key in status:
+                    family.add_metric([label], status[key])
+        yield from gauges.values()
+        yield from counters.values()
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that handled a request, such as `/v1/threads/{thread_id}/messages`,
+    so IDs stay out of the labels. The router sets `scope["route"]`; FastAPI versions that include
+    routers lazily leave the prefix out of its path, so it is taken from the request path.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    segments = route.path.count("/")
+    prefix = scope["path"].split("/")[:-segments] if segments else []
+    return "/".join(prefix) + route.path
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request until its response is sent, labelled by method, route template and
+    status. A plain ASGI middleware rather than `BaseHTTPMiddleware`, which would copy each
+    response body through a task and a queue.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status)).observe(time.perf_counter() - start)
+
+
+def metrics(request: Request) -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+_installed = False
+
+
+def install_metrics(app, engines: Dict[str, object]):
+    """Adds the middleware and `GET /metrics` to `app`, and hooks the database events once per process."""
+    global _installed
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+    if _installed:
+        return
+
+    for engine in engines.values():
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+    # Sessions of an AsyncSession are plain Sessions too, so this sees both paths
+    event.listen(Session, "before_flush", _count_run_transitions)
+    REGISTRY.register(PoolCollector(engines))
+    _installed = True
@@ -0,0 +1,178 @@
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.v1.schemas import (
+    UserCreate, UserRead, UserUpdate, ThreadCreate, ThreadRead, MessageCreate, MessageList, MessageRead, Run,
+    AssistantCreate, AssistantRead, RunStatusUpdate, RunStreamRequest, AssistantUpdate, ThreadContext, ThreadIds
+)
+from db.database import get_async_db
+from services.async_assistant_service import AsyncAssistantService
+from services.async_context_service import AsyncContextService
+from ollama.new_clients.loggin_service import LoggingUtility
+from services.async_message_service import AsyncMessageService
+from services.async_run_service import AsyncRunService
+from services.async_run_stream_service import AsyncRunStreamService
+from services.async_thread_service import AsyncThreadService
+from services.async_user_service import AsyncUserService
+
+logging_utility = LoggingUtility()
+
+router = APIRouter()
+
+@router.post("/users", response_model=UserRead)
+async def create_user(user: UserCreate = None, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    return await user_service.create_user(user)
+
+@router.get("/users/{user_id}", response_model=UserRead)
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    return await user_service.get_user(user_id)
+
+@router.put("/users/{user_id}", response_model=UserRead)
+async def update_user(user_id: str, user_update: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    return await user_service.update_user(user_id, user_update)
+
+@router.delete("/users/{user_id}", status_code=204)
+async def delete_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    await user_service.delete_user(user_id)
+    return {"detail": "User deleted successfully"}
+
+@router.post("/threads", response_model=ThreadRead)
+async def create_thread(thread: ThreadCreate, db: AsyncSession = Depends(get_async_db)):
+    thread_service = AsyncThreadService(db)
+    return await thread_service.create_thread(thread)
+
+@router.get("/threads/{thread_id}", response_model=ThreadRead)
+async def get_thread(thread_id: str, db: AsyncSession = Depends(get_async_db)):
+    thread_service = AsyncThreadService(db)
+    return await thread_service.get_thread(thread_id)
+
+@router.delete("/threads/{thread_id}", status_code=204)
+async def delete_thread(thread_id: str, db: AsyncSession = Depends(get_async_db)):
+    logging_utility.info("Received request to delete thread with ID: %s", thread_id)
+    thread_service = AsyncThreadService(db)
+    try:
+        await thread_service.delete_thread(thread_id)
+        logging_utility.info("Successfully deleted thread with ID: %s", thread_id)
+        return {"detail": "Thread deleted successfully"}
+    except HTTPException as e:
+        logging_utility.error("HTTP error occurred while deleting thread: %s", e)
+        raise e
+    except Exception as e:
+        logging_utility.error("An error occurred while deleting thread: %s", e)
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") from e
+
+@router.get("/users/{user_id}/threads", response_model=ThreadIds)
+async def list_threads_by_user(user_id: str, db: AsyncSession = Depends(get_async_db)):
+    logging_utility.info("Listing threads for user ID: %s", user_id)
+    thread_service = AsyncThreadService(db)
+    try:
+        thread_ids = await thread_service.list_threads_by_user(user_id)
+        logging_utility.info("Successfully retrieved threads for user ID: %s", user_id)
+        return {"thread_ids": thread_ids}
+    except HTTPException as e:
+        logging_utility.error("HTTP error occurred while listing threads: %s", e)
+        raise e
+    except Exception as e:
+        logging_utility.error("An error occurred while listing threads: %s", e)
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") from e
+
+@router.post("/messages", response_model=MessageRead)
+async def create_message(message: MessageCreate, db: AsyncSession = Depends(get_async_db)):
+    message_service = AsyncMessageService(db)
+    return await message_service.create_message(message)
+
+@router.get("/messages/{message_id}", response_model=MessageRead)
+async def get_message(message_id: str, db: AsyncSession = Depends(get_async_db)):
+    message_service = AsyncMessageService(db)
+    return await message_service.retrieve_message(message_id)
+
+@router.get("/threads/{thread_id}/messages", response_model=MessageList)
+async def list_messages(thread_id: str, limit: int = Query(20, ge=1, le=100), order: str = "asc",
+                        after: Optional[str] = None, before: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    logging_utility.info("Retrieving messages for thread: %s", thread_id)
+    message_service = AsyncMessageService(db)
+    return await message_service.list_messages(thread_id=thread_id, limit=limit, order=order, after=after, before=before)
+
+@router.post("/runs", response_model=Run)
+async def create_run(run: Run, db: AsyncSession = Depends(get_async_db)):
+    run_service = AsyncRunService(db)
+    return await run_service.create_run(run)
+
+@router.get("/runs/{run_id}", response_model=Run)
+async def get_run(run_id: str, db: AsyncSession = Depends(get_async_db)):
+    run_service = AsyncRunService(db)
+    return await run_service.get_run(run_id)
+
+@router.put("/runs/{run_id}/status", response_model=Run)
+async def update_run_status(run_id: str, status_update: RunStatusUpdate, db: AsyncSession = Depends(get_async_db)):
+    run_service = AsyncRunService(db)
+    try:
+        updated_run = await run_service.update_run_status(run_id, status_update.status)
+        return updated_run
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") from e
+
+@router.post("/threads/{thread_id}/runs/{run_id}/stream")
+async def stream_run(thread_id: str, run_id: str, stream_request: Optional[RunStreamRequest] = None,
+                     db: AsyncSession = Depends(get_async_db)):
+    logging_utility.info("Streaming run %s for thread: %s", run_id, thread_id)
+    stream_request = stream_request or RunStreamRequest()
+    run_stream_service = AsyncRunStreamService(db)
+    model, messages = await run_stream_service.prepare(thread_id, run_id, stream_request)
+    return StreamingResponse(
+        run_stream_service.stream_run(run_id, model, messages, stream_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/assistants", response_model=AssistantRead)
+async def create_assistant(assistant: AssistantCreate, db: AsyncSession = Depends(get_async_db)):
+    assistant_service = AsyncAssistantService(db)
+    return await assistant_service.create_assistant(assistant)
+
+@router.get("/assistants/{assistant_id}", response_model=AssistantRead)
+async def get_assistant(assistant_id: str, db: AsyncSession = Depends(get_async_db)):
+    assistant_service = AsyncAssistantService(db)
+    return await assistant_service.get_assistant(assistant_id)
+
+@router.put("/assistants/{assistant_id}", response_model=AssistantRead)
+async def update_assistant(assistant_id: str, assistant_update: AssistantUpdate, db: AsyncSession = Depends(get_async_db)):
+    assistant_service = AsyncAssistantService(db)
+    try:
+        return await assistant_service.update_assistant(assistant_id, assistant_update)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") from e
+
+@router.get("/threads/{thread_id}/formatted_messages", response_model=List[Dict[str, Any]])
+async def get_formatted_messages(thread_id: str, db: AsyncSession = Depends(get_async_db)):
+    message_service = AsyncMessageService(db)
+    try:
+        return await message_service.list_messages_for_thread(thread_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") from e
+
+@router.get("/threads/{thread_id}/context", response_model=ThreadContext)
+async def get_thread_context(thread_id: str, max_tokens: int = Query(4096, ge=1), system_prompt: Optional[str] = None,
+                             db: AsyncSession = Depends(get_async_db)):
+    context_service = AsyncContextService(db)
+    return await context_service.get_context(thread_id, max_tokens=max_tokens, system_prompt=system_prompt)
+
+@router.post("/messages/assistant", response_model=MessageRead)
+async def save_assistant_message(message: MessageCreate, db: AsyncSession = Depends(get_async_db)):
+    message_service = AsyncMessageService(db)
+    return await message_service.save_assistant_message_chunk(
+        thread_id=message.thread_id,
+        content=message.content,
+        is_last_chunk=True  # Assuming we're always sending the complete message
+    )
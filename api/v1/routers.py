@@ -1,15 +1,18 @@
-from typing import Dict, Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from api.v1.schemas import (
-    UserCreate, UserRead, UserUpdate, ThreadCreate, ThreadRead, MessageCreate, MessageRead, Run, AssistantCreate,
-    AssistantRead, RunStatusUpdate, AssistantUpdate, ThreadIds
+    UserCreate, UserRead, UserUpdate, ThreadCreate, ThreadRead, MessageCreate, MessageList, MessageRead, Run,
+    AssistantCreate, AssistantRead, RunStatusUpdate, RunStreamRequest, AssistantUpdate, ThreadContext, ThreadIds
 )
 from db.database import get_db
 from services.assistant_service import AssistantService
+from services.context_service import ContextService
 from ollama.new_clients.loggin_service import LoggingUtility
 from services.message_service import MessageService
 from services.run_service import RunService
+from services.run_stream_service import RunStreamService
 from services.thread_service import ThreadService
 from services.user_service import UserService
 
@@ -50,32 +53,32 @@ def get_thread(thread_id: str, db: Session = Depends(get_db)):
 
 @router.delete("/threads/{thread_id}", status_code=204)
 def delete_thread(thread_id: str, db: Session = Depends(get_db)):
-    logging_utility.info(f"Received request to delete thread with ID: {thread_id}")
+    logging_utility.info("Received request to delete thread with ID: %s", thread_id)
     thread_service = ThreadService(db)
     try:
         thread_service.delete_thread(thread_id)
-        logging_utility.info(f"Successfully deleted thread with ID: {thread_id}")
+        logging_utility.info("Successfully deleted thread with ID: %s", thread_id)
         return {"detail": "Thread deleted successfully"}
     except HTTPException as e:
-        logging_utility.error(f"HTTP error occurred while deleting thread: {str(e)}")
+        logging_utility.error("HTTP error occurred while deleting thread: %s", e)
         raise e
     except Exception as e:
-        logging_utility.error(f"An error occurred while deleting thread: {str(e)}")
+        logging_utility.error("An error occurred while deleting thread: %s", e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 @router.get("/users/{user_id}/threads", response_model=ThreadIds)
 def list_threads_by_user(user_id: str, db: Session = Depends(get_db)):
-    logging_utility.info(f"Listing threads for user ID: {user_id}")
+    logging_utility.info("Listing threads for user ID: %s", user_id)
     thread_service = ThreadService(db)
     try:
         thread_ids = thread_service.list_threads_by_user(user_id)
-        logging_utility.info(f"Successfully retrieved threads for user ID: {user_id}")
+        logging_utility.info("Successfully retrieved threads for user ID: %s", user_id)
         return {"thread_ids": thread_ids}
     except HTTPException as e:
-        logging_utility.error(f"HTTP error occurred while listing threads: {str(e)}")
+        logging_utility.error("HTTP error occurred while listing threads: %s", e)
         raise e
     except Exception as e:
-        logging_utility.error(f"An error occurred while listing threads: {str(e)}")
+        logging_utility.error("An error occurred while listing threads: %s", e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 @router.post("/messages", response_model=MessageRead)
@@ -88,11 +91,12 @@ def get_message(message_id: str, db: Session = Depends(get_db)):
     message_service = MessageService(db)
     return message_service.retrieve_message(message_id)
 
-@router.get("/threads/{thread_id}/messages", response_model=List[MessageRead])
-def list_messages(thread_id: str, limit: int = 20, order: str = "asc", db: Session = Depends(get_db)):
-    logging_utility.info(f"Retrieving messages for thread: {thread_id}")
+@router.get("/threads/{thread_id}/messages", response_model=MessageList)
+def list_messages(thread_id: str, limit: int = Query(20, ge=1, le=100), order: str = "asc",
+                  after: Optional[str] = None, before: Optional[str] = None, db: Session = Depends(get_db)):
+    logging_utility.info("Retrieving messages for thread: %s", thread_id)
     message_service = MessageService(db)
-    return message_service.list_messages(thread_id=thread_id, limit=limit, order=order)
+    return message_service.list_messages(thread_id=thread_id, limit=limit, order=order, after=after, before=before)
 
 @router.post("/runs", response_model=Run)
 def create_run(run: Run, db: Session = Depends(get_db)):
@@ -115,6 +119,19 @@ def update_run_status(run_id: str, status_update: RunStatusUpdate, db: Session =
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+@router.post("/threads/{thread_id}/runs/{run_id}/stream")
+def stream_run(thread_id: str, run_id: str, stream_request: Optional[RunStreamRequest] = None,
+               db: Session = Depends(get_db)):
+    logging_utility.info("Streaming run %s for thread: %s", run_id, thread_id)
+    stream_request = stream_request or RunStreamRequest()
+    run_stream_service = RunStreamService(db)
+    model, messages = run_stream_service.prepare(thread_id, run_id, stream_request)
+    return StreamingResponse(
+        run_stream_service.stream_run(run_id, model, messages, stream_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/assistants", response_model=AssistantRead)
 def create_assistant(assistant: AssistantCreate, db: Session = Depends(get_db)):
     assistant_service = AssistantService(db)
@@ -145,6 +162,12 @@ def get_formatted_messages(thread_id: str, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+@router.get("/threads/{thread_id}/context", response_model=ThreadContext)
+def get_thread_context(thread_id: str, max_tokens: int = Query(4096, ge=1), system_prompt: Optional[str] = None,
+                       db: Session = Depends(get_db)):
+    context_service = ContextService(db)
+    return context_service.get_context(thread_id, max_tokens=max_tokens, system_prompt=system_prompt)
+
 @router.post("/messages/assistant", response_model=MessageRead)
 def save_assistant_message(message: MessageCreate, db: Session = Depends(get_db)):
     message_service = MessageService(db)
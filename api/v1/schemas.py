@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict, Any
 
 class UserBase(BaseModel):
@@ -95,6 +95,19 @@ class MessageRead(BaseModel):
     class Config:
         from_attributes = True
 
+class MessageList(BaseModel):
+    object: str = "list"
+    data: List[MessageRead]
+    first_id: Optional[str] = None
+    last_id: Optional[str] = None
+    has_more: bool = False
+
+class ThreadContext(BaseModel):
+    thread_id: str
+    messages: List[Dict[str, Any]]
+    token_count: int
+    truncated: bool
+
 class MessageUpdate(BaseModel):
     content: Optional[str]
     meta_data: Optional[Dict[str, Any]]
@@ -177,6 +190,19 @@ class Run(BaseModel):
 class RunStatusUpdate(BaseModel):
     status: str
 
+class RunStreamRequest(BaseModel):
+    model: Optional[str] = None  # Defaults to the assistant's model, then the run's
+    num_ctx: int = Field(4096, gt=0)
+    response_tokens: int = Field(1024, ge=0)  # Part of num_ctx kept free for the reply
+    options: Dict[str, Any] = {}
+
+    @model_validator(mode="after")
+    def check_response_tokens(self):
+        # Otherwise no room is left for the thread and the request fails later as if its history were too long
+        if self.response_tokens >= self.num_ctx:
+            raise ValueError(f"response_tokens ({self.response_tokens}) must be less than num_ctx ({self.num_ctx})")
+        return self
+
 class AssistantCreate(BaseModel):
     user_id: str
     name: Optional[str] = None
@@ -0,0 +1,70 @@
+"""
+Compares `Client.embed` decoding with `output='list'` and `output='numpy'`.
+
+Each run replays a synthetic `/api/embed` response through an in-memory transport, so the numbers
+measure decoding only. Peak memory is the tracemalloc high-water mark of one call, with the
+list results converted to a float32 array as a caller would.
+
+  python -m benchmarks.embed_decode --rows 256 --dimensions 1024
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import httpx
+import numpy
+
+from ollama import Client, Decoder
+from ollama._decoder import available_backends
+
+
+def embed_response(rows: int, dimensions: int) -> bytes:
+  rng = random.Random(0)
+  embeddings = [[rng.uniform(-1, 1) for _ in range(dimensions)] for _ in range(rows)]
+  return json.dumps({'model': 'all-minilm', 'embeddings': embeddings, 'total_duration': 1, 'load_duration': 1, 'prompt_eval_count': rows}).encode()
+
+
+def embed(client: Client, rows: int, output: str):
+  response = client.embed('all-minilm', ['text'] * rows, output=output)
+  if output == 'list':
+    return numpy.asarray(response['embeddings'], dtype=numpy.float32)
+  return response['embeddings']
+
+
+def run(decoder: Decoder, body: bytes, rows: int, output: str, repeat: int):
+  transport = httpx.MockTransport(lambda _: httpx.Response(200, content=body))
+  client = Client(transport=transport, decoder=decoder)
+
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    embed(client, rows, output)
+    best = min(best, time.perf_counter() - start)
+
+  tracemalloc.start()
+  embed(client, rows, output)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return len(body) / best, peak
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--rows', type=int, default=256)
+  parser.add_argument('--dimensions', type=int, default=768)
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args()
+
+  body = embed_response(args.rows, args.dimensions)
+  print(f'{"backend":<10} {"output":<8} {"MB/s":>10} {"peak MB":>10}')
+  for backend in available_backends():
+    for output in ('list', 'numpy'):
+      rate, peak = run(Decoder(backend), body, args.rows, output, args.repeat)
+      print(f'{backend:<10} {output:<8} {rate / 1e6:>10,.1f} {peak / 1e6:>10,.1f}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,61 @@
+"""
+Measures what hooks cost on a streamed `Client.generate`: without hooks, with an empty `Hook`, and
+with the `OpenTelemetryHook` on whatever tracer and meter providers are installed.
+
+Each run replays a synthetic response of `--chunks` lines through an in-memory transport, so the
+numbers are client time only.
+
+  python -m benchmarks.hooks --chunks 500 --repeat 200
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+from ollama import Client, Hook
+
+
+def generate_response(chunks: int) -> bytes:
+  lines = [{'model': 'llama3', 'created_at': '2024-01-01T00:00:00Z', 'response': ' token', 'done': False} for _ in range(chunks - 1)]
+  lines.append({'model': 'llama3', 'response': '', 'done': True, 'total_duration': 1, 'load_duration': 1, 'prompt_eval_count': 1, 'prompt_eval_duration': 1, 'eval_count': chunks, 'eval_duration': 1})
+  return b''.join(json.dumps(line).encode() + b'\n' for line in lines)
+
+
+def run(hooks, body: bytes, repeat: int) -> float:
+  client = Client(transport=httpx.MockTransport(lambda _: httpx.Response(200, content=body)), hooks=hooks)
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for _ in client.generate('llama3', 'Why is the sky blue?', stream=True):
+      ...
+    best = min(best, time.perf_counter() - start)
+  return best
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--chunks', type=int, default=500)
+  parser.add_argument('--repeat', type=int, default=200)
+  args = parser.parse_args()
+
+  body = generate_response(args.chunks)
+  variants = [('none', None), ('empty Hook', [Hook()])]
+  try:
+    from ollama import OpenTelemetryHook
+
+    variants.append(('OpenTelemetry', [OpenTelemetryHook()]))
+  except ImportError:
+    ...
+
+  baseline = None
+  print(f'{"hooks":<14} {"ms/request":>12} {"us/chunk":>10} {"overhead":>10}')
+  for name, hooks in variants:
+    seconds = run(hooks, body, args.repeat)
+    baseline = baseline or seconds
+    print(f'{name:<14} {seconds * 1e3:>12,.3f} {seconds / args.chunks * 1e6:>10,.2f} {seconds / baseline - 1:>10,.1%}')
+
+
+if __name__ == '__main__':
+  main()
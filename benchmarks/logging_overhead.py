@@ -0,0 +1,92 @@
+"""
+Measures what logging each streamed token costs the code that streams it, as
+`OllamaClient.streamed_response_helper` did with `logging_utility.debug("Received chunk: %s", ...)`:
+
+- before: the previous `LoggingUtility` setup, a DEBUG logger formatting and writing every record
+  to the stream in the calling thread
+- after, DEBUG off: the default `LOG_LEVEL=INFO`, where the call only checks the level
+- after, DEBUG on: records handed to the `QueueListener` thread, which writes them as JSON; the
+  time for the listener to catch up is shown separately
+
+Records are written to `--sink`, `os.devnull` unless given, so the synchronous setup pays for
+formatting but not for waiting on a terminal or a log collector.
+
+  python -m benchmarks.logging_overhead --tokens 100000 --sink /tmp/bench.log
+"""
+
+import argparse
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+
+from ollama.new_clients.loggin_service import TEXT_FORMAT, JsonFormatter, TruncatingQueueHandler
+
+
+def stream(log, tokens) -> float:
+  start = time.perf_counter()
+  full_response = ''
+  for content in tokens:
+    full_response += content
+    log('Received chunk: %s', content)
+  return time.perf_counter() - start
+
+
+def logger(name: str, handler: logging.Handler, level: int) -> logging.Logger:
+  log = logging.getLogger(f'benchmarks.logging_overhead.{name}')
+  log.handlers = [handler]
+  log.propagate = False
+  log.setLevel(level)
+  return log
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--tokens', type=int, default=100_000)
+  parser.add_argument('--repeat', type=int, default=5)
+  parser.add_argument('--sink', default=os.devnull)
+  args = parser.parse_args()
+
+  tokens = [f' token{i % 50}' for i in range(args.tokens)]
+  sink = open(args.sink, 'w')
+
+  sync_handler = logging.StreamHandler(sink)
+  sync_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+  before = logger('before', sync_handler, logging.DEBUG)
+
+  handler_queue = queue.SimpleQueue()
+  json_handler = logging.StreamHandler(sink)
+  json_handler.setFormatter(JsonFormatter())
+  listener = QueueListener(handler_queue, json_handler)
+  queued = logger('after', TruncatingQueueHandler(handler_queue), logging.DEBUG)
+  gated = logger('gated', TruncatingQueueHandler(handler_queue), logging.INFO)
+
+  def nothing(message, *args): ...
+
+  def drained(log):
+    "Streams with the listener running, and adds the time it takes to write what was queued."
+    listener.start()
+    seconds = stream(log, tokens)
+    start = time.perf_counter()
+    listener.stop()
+    drained.seconds = min(getattr(drained, 'seconds', float('inf')), seconds + time.perf_counter() - start)
+    return seconds
+
+  variants = [
+    ('no logging', lambda: stream(nothing, tokens)),
+    ('before', lambda: stream(before.debug, tokens)),
+    ('after, DEBUG off', lambda: stream(gated.debug, tokens)),
+    ('after, DEBUG on', lambda: drained(queued.debug)),
+  ]
+  results = {name: min(run() for _ in range(args.repeat)) for name, run in variants}
+
+  baseline = results['no logging']
+  print(f'{"logging":<18} {"us/token":>10} {"overhead":>10}')
+  for name, seconds in results.items():
+    print(f'{name:<18} {seconds / args.tokens * 1e6:>10,.3f} {(seconds - baseline) / args.tokens * 1e6:>+10,.3f}')
+  print(f'\nListener writing the queued records: {(drained.seconds - results["after, DEBUG on"]) / args.tokens * 1e6:.3f} us/token, in its own thread')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,142 @@
+"""
+Seeds a large messages table and times the thread-scoped queries the API issues, with and without
+the thread indexes.
+
+The database comes from `--url` (default: `DATABASE_URL`, or a temporary SQLite file). Tables are
+created from `models.models` if missing; the seeded rows are left in place unless `--cleanup` is given.
+
+  python -m benchmarks.message_queries --messages 1000000 --threads 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import Session
+
+from models.models import Base, Message, Run, Thread
+from services.message_service import MessageService
+
+THREAD_INDEXES = [
+  next(index for index in Message.__table__.indexes if index.name == 'ix_messages_thread_id_created_at_id'),
+  next(index for index in Run.__table__.indexes if index.name == 'ix_runs_thread_id_status'),
+]
+
+STATUSES = ['queued', 'in_progress', 'completed', 'failed', 'cancelled']
+
+
+def seed(engine, messages: int, threads: int, batch: int = 10_000) -> list:
+  thread_ids = [f'bench_thread_{i}' for i in range(threads)]
+  now = int(time.time())
+  with engine.begin() as conn:
+    conn.execute(
+      Thread.__table__.insert(),
+      [{'id': thread_id, 'created_at': now, 'meta_data': {}, 'object': 'thread', 'tool_resources': {}} for thread_id in thread_ids],
+    )
+
+    rows = []
+    for i in range(messages):
+      rows.append(
+        {
+          'id': f'bench_message_{i}',
+          'attachments': [],
+          'content': f'message {i}',
+          # Several messages per second, so (created_at, id) ties are common as in real threads
+          'created_at': now + i // 8,
+          'meta_data': json.dumps({}),
+          'object': 'message',
+          'role': 'user' if i % 2 else 'assistant',
+          'thread_id': thread_ids[i % threads],
+          'sender_id': 'bench_user',
+        }
+      )
+      if len(rows) == batch:
+        conn.execute(Message.__table__.insert(), rows)
+        rows = []
+    if rows:
+      conn.execute(Message.__table__.insert(), rows)
+
+    conn.execute(
+      Run.__table__.insert(),
+      [
+        {
+          'id': f'bench_run_{i}',
+          'assistant_id': f'bench_assistant_{i % 100}',
+          'object': 'thread.run',
+          'status': STATUSES[i % len(STATUSES)],
+          'thread_id': thread_ids[i % threads],
+        }
+        for i in range(messages // 10)
+      ],
+    )
+  return thread_ids
+
+
+def cleanup(engine):
+  with engine.begin() as conn:
+    conn.execute(delete(Run.__table__).where(Run.id.like('bench_run_%')))
+    conn.execute(delete(Message.__table__).where(Message.id.like('bench_message_%')))
+    conn.execute(delete(Thread.__table__).where(Thread.id.like('bench_thread_%')))
+
+
+def timed(fn, samples) -> float:
+  durations = []
+  for sample in samples:
+    start = time.perf_counter()
+    fn(sample)
+    durations.append(time.perf_counter() - start)
+  return statistics.median(durations) * 1000
+
+
+def run_queries(engine, thread_ids: list, samples: int) -> dict:
+  sample_ids = random.Random(0).sample(thread_ids, min(samples, len(thread_ids)))
+  with Session(engine) as db:
+    service = MessageService(db)
+    cursors = {thread_id: service.list_messages(thread_id, limit=50).last_id for thread_id in sample_ids}
+
+    return {
+      'first page': timed(lambda t: service.list_messages(t, limit=20), sample_ids),
+      'next page (after)': timed(lambda t: service.list_messages(t, limit=20, after=cursors[t]), sample_ids),
+      'formatted messages': timed(lambda t: service.list_messages_for_thread(t), sample_ids),
+      'count by thread': timed(lambda t: db.execute(select(func.count()).select_from(Message).where(Message.thread_id == t)).scalar(), sample_ids),
+      'runs by thread+status': timed(lambda t: db.execute(select(Run.id).where(Run.thread_id == t, Run.status == 'in_progress')).all(), sample_ids),
+    }
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--url', default=os.getenv('DATABASE_URL'))
+  parser.add_argument('--messages', type=int, default=1_000_000)
+  parser.add_argument('--threads', type=int, default=10_000)
+  parser.add_argument('--samples', type=int, default=50)
+  parser.add_argument('--cleanup', action='store_true')
+  args = parser.parse_args()
+
+  url = args.url or f'sqlite:///{tempfile.mkdtemp()}/message_queries.db'
+  engine = create_engine(url)
+  Base.metadata.create_all(engine)
+
+  start = time.perf_counter()
+  thread_ids = seed(engine, args.messages, args.threads)
+  print(f'seeded {args.messages} messages in {args.threads} threads in {time.perf_counter() - start:.1f}s ({url})')
+
+  with_indexes = run_queries(engine, thread_ids, args.samples)
+  for index in THREAD_INDEXES:
+    index.drop(engine)
+  try:
+    without_indexes = run_queries(engine, thread_ids, args.samples)
+  finally:
+    for index in THREAD_INDEXES:
+      index.create(engine)
+
+  print(f'{"median ms":<24}{"indexed":>12}{"full scan":>12}')
+  for name, indexed in with_indexes.items():
+    print(f'{name:<24}{indexed:>12.2f}{without_indexes[name]:>12.2f}')
+
+  if args.cleanup:
+    cleanup(engine)
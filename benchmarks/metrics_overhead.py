@@ -0,0 +1,95 @@
+"""
+Measures what `api.metrics.MetricsMiddleware` adds to each request: the same FastAPI app is loaded
+by `--concurrency` clients with and without the middleware, and the time per request compared.
+
+Requests go through an in-process ASGI transport to a handler that does no work, so the numbers
+are framework and middleware time only; over a network and a database the relative cost is lower.
+The load test is noisy at the scale of the middleware, so its cost around an ASGI app that answers
+at once is also timed on its own.
+
+  python -m benchmarks.metrics_overhead --requests 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from api.metrics import MetricsMiddleware
+
+
+def build_app(metrics: bool) -> FastAPI:
+  app = FastAPI()
+
+  @app.get('/v1/threads/{thread_id}/messages')
+  async def list_messages(thread_id: str):
+    return {'object': 'list', 'data': [], 'first_id': None, 'last_id': None, 'has_more': False}
+
+  if metrics:
+    app.add_middleware(MetricsMiddleware)
+  return app
+
+
+async def load(app: FastAPI, requests: int, concurrency: int) -> float:
+  async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url='http://bench') as client:
+    remaining = iter(range(requests))
+
+    async def worker():
+      for i in remaining:
+        response = await client.get(f'/v1/threads/thread_{i % 100}/messages')
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def isolated(requests: int) -> float:
+  "Seconds per request the middleware adds around an app that sends a response straight away."
+  route = build_app(False).router.routes[-1]
+
+  async def app(scope, receive, send):
+    scope['route'] = route
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{}'})
+
+  async def receive():
+    return {'type': 'http.request', 'body': b''}
+
+  async def send(message): ...
+
+  timings = []
+  for wrapped in (app, MetricsMiddleware(app)):
+    start = time.perf_counter()
+    for i in range(requests):
+      await wrapped({'type': 'http', 'method': 'GET', 'path': f'/v1/threads/thread_{i % 100}/messages'}, receive, send)
+    timings.append(time.perf_counter() - start)
+  return (timings[1] - timings[0]) / requests
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--requests', type=int, default=20_000)
+  parser.add_argument('--concurrency', type=int, default=50)
+  parser.add_argument('--repeat', type=int, default=3)
+  args = parser.parse_args()
+
+  apps = {'none': build_app(False), 'MetricsMiddleware': build_app(True)}
+  results = {name: float('inf') for name in apps}
+  # Alternating the variants keeps drift in the machine's speed from landing on one of them
+  for _ in range(args.repeat):
+    for name, app in apps.items():
+      results[name] = min(results[name], asyncio.run(load(app, args.requests, args.concurrency)))
+
+  baseline = results['none']
+  print(f'{"middleware":<18} {"requests/s":>12} {"us/request":>12} {"overhead":>10}')
+  for name, seconds in results.items():
+    per_request = seconds / args.requests * 1e6
+    print(f'{name:<18} {args.requests / seconds:>12,.0f} {per_request:>12,.1f} {per_request - baseline / args.requests * 1e6:>+10,.1f}')
+  print(f'\nMetricsMiddleware alone: {asyncio.run(isolated(args.requests)) * 1e6:.1f} us/request')
+
+
+if __name__ == '__main__':
+  main()
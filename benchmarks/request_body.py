@@ -0,0 +1,70 @@
+"""
+Compares peak memory and time of sending a large `Client.chat` request with and without `stream_body`.
+
+The request carries a long history and several images given as file paths. It is sent through an
+in-memory transport that reads and discards the body, so the numbers measure building the body only.
+Images are written to a temporary directory and the image cache is disabled between runs.
+
+  python -m benchmarks.request_body --images 8 --image-mb 4 --turns 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+
+from ollama import Client, ImageCache
+
+
+class DiscardTransport(httpx.BaseTransport):
+  "Reads the request body chunk by chunk and throws it away; `httpx.MockTransport` would buffer it."
+
+  def handle_request(self, request: httpx.Request) -> httpx.Response:
+    size = sum(len(chunk) for chunk in request.stream)
+    return httpx.Response(200, json={'model': 'llava', 'message': {'role': 'assistant', 'content': str(size)}})
+
+
+def run(stream_body: bool, messages, repeat: int):
+  best, peak, size = float('inf'), 0, 0
+  for _ in range(repeat):
+    client = Client(transport=DiscardTransport(), stream_body=stream_body, image_cache=ImageCache(max_bytes=0))
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = int(client.chat('llava', messages=messages)['message']['content'])
+    best = min(best, time.perf_counter() - start)
+    peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+  return size, best, peak
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--images', type=int, default=8)
+  parser.add_argument('--image-mb', type=float, default=4)
+  parser.add_argument('--turns', type=int, default=200)
+  parser.add_argument('--chars', type=int, default=2000)
+  parser.add_argument('--repeat', type=int, default=3)
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as directory:
+    paths = []
+    for i in range(args.images):
+      path = os.path.join(directory, f'{i}.png')
+      with open(path, 'wb') as w:
+        w.write(os.urandom(int(args.image_mb * 1024 * 1024)))
+      paths.append(path)
+
+    messages = [{'role': 'user' if i % 2 else 'assistant', 'content': 'x' * args.chars} for i in range(args.turns)]
+    messages.append({'role': 'user', 'content': 'What do these have in common?', 'images': paths})
+
+    print(f'{"stream_body":<12} {"body MB":>10} {"seconds":>10} {"peak MB":>10}')
+    for stream_body in (False, True):
+      size, seconds, peak = run(stream_body, messages, args.repeat)
+      print(f'{str(stream_body):<12} {size / 1e6:>10,.1f} {seconds:>10,.3f} {peak / 1e6:>10,.1f}')
+
+
+if __name__ == '__main__':
+  main()
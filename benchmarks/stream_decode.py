@@ -0,0 +1,80 @@
+"""
+Compares streamed chat throughput across the installed JSON backends.
+
+Each run replays a synthetic NDJSON chat stream through `Client.chat(stream=True)` using an in-memory
+transport, so the numbers measure line splitting and decoding only.
+
+  python -m benchmarks.stream_decode --tokens 200000
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+from ollama import Client, Decoder
+from ollama._decoder import available_backends
+
+
+def ndjson_chat_stream(tokens: int) -> bytes:
+  lines = []
+  for i in range(tokens):
+    chunk = {
+      'model': 'llama3',
+      'created_at': '2024-08-04T09:47:55.288479Z',
+      'message': {'role': 'assistant', 'content': f'token{i % 97} '},
+      'done': False,
+    }
+    lines.append(json.dumps(chunk))
+
+  lines.append(
+    json.dumps(
+      {
+        'model': 'llama3',
+        'created_at': '2024-08-04T09:47:55.288479Z',
+        'message': {'role': 'assistant', 'content': ''},
+        'done': True,
+        'done_reason': 'stop',
+        'total_duration': 1,
+        'load_duration': 1,
+        'prompt_eval_count': 1,
+        'prompt_eval_duration': 1,
+        'eval_count': tokens,
+        'eval_duration': 1,
+      }
+    )
+  )
+  return ('\n'.join(lines) + '\n').encode()
+
+
+def run(decoder: Decoder, body: bytes, tokens: int, repeat: int) -> float:
+  transport = httpx.MockTransport(lambda _: httpx.Response(200, content=body))
+  client = Client(transport=transport, decoder=decoder)
+
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    for _ in client.chat('llama3', messages=[{'role': 'user', 'content': 'hi'}], stream=True):
+      pass
+    best = min(best, time.perf_counter() - start)
+
+  return tokens / best
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--tokens', type=int, default=100_000)
+  parser.add_argument('--repeat', type=int, default=5)
+  args = parser.parse_args()
+
+  body = ndjson_chat_stream(args.tokens)
+  print(f'{"backend":<10} {"partial":<8} {"tokens/s":>12}')
+  for backend in available_backends():
+    for partial in (False, True):
+      rate = run(Decoder(backend, partial=partial), body, args.tokens, args.repeat)
+      print(f'{backend:<10} {str(partial):<8} {rate:>12,.0f}')
+
+
+if __name__ == '__main__':
+  main()
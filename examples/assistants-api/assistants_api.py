@@ -1,5 +1,6 @@
 import json
 from ollama.new_ollama_client import OllamaClient
+from ollama.new_clients.async_ollama_client import AsyncOllamaClient
 from ollama.new_clients.loggin_service import LoggingUtility
 
 client = OllamaClient()
@@ -40,7 +41,9 @@ import asyncio
 from ollama import AsyncClient
 
 async def streamed_response_helper(messages, thread_id):
+    async_client = AsyncOllamaClient()
     try:
+        full_response = ""
         async for part in await AsyncClient().chat(
             model='llama3.1',
             messages=messages,
@@ -48,14 +51,14 @@ async def streamed_response_helper(messages, thread_id):
             stream=True
         ):
             content = part['message']['content']
+            full_response += content
             print(f" {content}", end='', flush=True)
             yield content
 
         print("\nDEBUG: Finished yielding all chunks")
-        full_response = "".join(part['message']['content'] for part in await AsyncClient().chat(model='llama3.1', messages=messages))
 
         # Save the complete assistant message
-        saved_message = await client.message_service.save_assistant_message_chunk(thread_id, full_response, is_last_chunk=True)
+        saved_message = await async_client.message_service.save_assistant_message_chunk(thread_id, full_response, is_last_chunk=True)
 
         if saved_message:
             print("Assistant message saved successfully.")
@@ -66,6 +69,8 @@ async def streamed_response_helper(messages, thread_id):
         error_message = f"Error in send_new_message: {str(e)}"
         print(f"DEBUG: {error_message}")
         yield json.dumps({"error": "An error occurred while generating the response"})
+    finally:
+        await async_client.aclose()
 
     print("DEBUG: Exiting send_new_message")
 
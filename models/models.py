@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, JSON, DateTime, ForeignKey, Table, Text
+from sqlalchemy import Column, String, Integer, Boolean, JSON, DateTime, ForeignKey, Index, Table, Text
 from sqlalchemy.orm import relationship, declarative_base
 import time
 
@@ -50,6 +50,11 @@ class Message(Base):
     thread_id = Column(String(64), nullable=False)
     sender_id = Column(String(64), nullable=False)
 
+    __table_args__ = (
+        # Serves keyset pagination of a thread's messages in (created_at, id) order
+        Index('ix_messages_thread_id_created_at_id', 'thread_id', 'created_at', 'id'),
+    )
+
 
 class Run(Base):
     __tablename__ = "runs"
@@ -83,6 +88,11 @@ class Run(Base):
     top_p = Column(Integer, nullable=True)
     tool_resources = Column(JSON, nullable=True)
 
+    __table_args__ = (
+        Index('ix_runs_thread_id_status', 'thread_id', 'status'),
+        Index('ix_runs_assistant_id', 'assistant_id'),
+    )
+
 
 class Assistant(Base):
     __tablename__ = "assistants"
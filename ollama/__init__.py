@@ -1,27 +1,67 @@
 from ollama._client import Client, AsyncClient
+from ollama._admission import AdmissionController
+from ollama._blob import DigestCache
+from ollama._cache import EmbeddingCache, ImageCache
+from ollama._decoder import Decoder
+from ollama._flight import SingleFlight
+from ollama._hooks import Call, Hook
+from ollama._otel import OpenTelemetryHook
+from ollama._pool import PooledClient, AsyncPooledClient
+from ollama._retry import RetryPolicy, CircuitBreaker
+from ollama._responses import ResponseCache, MemoryBackend, SQLiteBackend, DirectoryBackend
 from ollama._types import (
   GenerateResponse,
   ChatResponse,
   ProgressResponse,
   Message,
+  Record,
+  ChatRecord,
+  GenerateRecord,
+  MessageRecord,
+  ProgressRecord,
   Options,
   RequestError,
   ResponseError,
+  CircuitOpenError,
 )
 
 __all__ = [
   'Client',
   'AsyncClient',
+  'PooledClient',
+  'AsyncPooledClient',
+  'AdmissionController',
+  'Hook',
+  'Call',
+  'OpenTelemetryHook',
+  'Decoder',
+  'DigestCache',
+  'EmbeddingCache',
+  'ImageCache',
+  'SingleFlight',
+  'ResponseCache',
+  'MemoryBackend',
+  'SQLiteBackend',
+  'DirectoryBackend',
+  'RetryPolicy',
+  'CircuitBreaker',
   'GenerateResponse',
   'ChatResponse',
   'ProgressResponse',
   'Message',
+  'Record',
+  'ChatRecord',
+  'GenerateRecord',
+  'MessageRecord',
+  'ProgressRecord',
   'Options',
   'RequestError',
   'ResponseError',
+  'CircuitOpenError',
   'generate',
   'chat',
   'embed',
+  'embed_many',
   'embeddings',
   'pull',
   'push',
@@ -45,6 +85,7 @@ _client = Client()
 generate = _client.generate
 chat = _client.chat
 embed = _client.embed
+embed_many = _client.embed_many
 embeddings = _client.embeddings
 pull = _client.pull
 push = _client.push
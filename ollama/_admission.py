@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import AsyncIterator, Iterator
+else:
+  from collections.abc import AsyncIterator, Iterator
+
+from ollama._types import RequestError, model_name
+
+
+class _Waiter:
+  __slots__ = ('model', 'enqueued', 'granted', 'cancelled', 'wake')
+
+  def __init__(self, model: str, wake: Callable[[], None]) -> None:
+    self.model = model
+    self.enqueued = time.monotonic()
+    self.granted = False
+    self.cancelled = False
+    self.wake = wake
+
+
+def _resolve(future: 'asyncio.Future[None]') -> None:
+  if not future.done():
+    future.set_result(None)
+
+
+class AdmissionController:
+  """
+  Limits how many requests are in flight at once, in total (`max_concurrency`) and per model
+  (`per_model`, or an entry of `limits` for that model). Requests beyond the limits wait in a
+  queue per model. Whenever a slot frees up it goes to the waiting request with the lowest
+  `priority` among the models under their limit, first come first served within a priority, so
+  interactive requests overtake a batch job's backlog. A request that waits longer than its
+  `timeout` is dropped with a `RequestError` before it is sent. Model names are compared with their
+  tag, so `llama3` and `llama3:latest` share one limit.
+
+  One controller can be shared by any number of `Client` and `AsyncClient` instances, in any
+  threads and event loops of the process.
+
+  >>> admission = AdmissionController(per_model=1)
+  >>> with admission.slot('llama3'):
+  ...   admission.acquire('llama3', timeout=0)
+  Traceback (most recent call last):
+  ...
+  ollama._types.RequestError: llama3 request waited more than 0s to be sent
+  >>> admission.stats()['dropped']
+  1
+  """
+
+  INTERACTIVE = 0
+  BATCH = 10
+
+  def __init__(self, max_concurrency: Optional[int] = None, per_model: Optional[int] = None, limits: Optional[Mapping[str, int]] = None) -> None:
+    self.max_concurrency = max_concurrency
+    self.per_model = per_model
+    self.limits = {model_name(model): limit for model, limit in (limits or {}).items()}
+
+    self._lock = threading.Lock()
+    self._queues: Dict[str, List[Tuple[int, int, _Waiter]]] = {}
+    self._running: Dict[str, int] = {}
+    self._sequence = itertools.count()
+    self._in_flight = self._queued = 0
+    self.admitted = self.dropped = 0
+    self.wait_seconds = self.max_wait_seconds = 0.0
+
+  def _has_room(self, model: str) -> bool:
+    limit = self.limits.get(model, self.per_model)
+    return limit is None or self._running.get(model, 0) < limit
+
+  def _dispatch(self) -> None:
+    # Called with the lock held; grants slots until the limits are reached or nobody can use one
+    while self.max_concurrency is None or self._in_flight < self.max_concurrency:
+      best = None
+      for model in list(self._queues):
+        queue = self._prune(model)
+        if queue and self._has_room(model) and (best is None or queue[0] < best[0]):
+          best = queue
+      if best is None:
+        break
+
+      waiter = heapq.heappop(best)[2]
+      if not best:
+        del self._queues[waiter.model]
+
+      waited = time.monotonic() - waiter.enqueued
+      self.wait_seconds += waited
+      self.max_wait_seconds = max(self.max_wait_seconds, waited)
+      self.admitted += 1
+      self._queued -= 1
+      self._in_flight += 1
+      self._running[waiter.model] = self._running.get(waiter.model, 0) + 1
+      waiter.granted = True
+      waiter.wake()
+
+  def _prune(self, model: str) -> Optional[List[Tuple[int, int, _Waiter]]]:
+    # Called with the lock held; pops cancelled waiters off the head, and the queue once it is empty,
+    # so models that are no longer requested do not keep an entry
+    queue = self._queues[model]
+    while queue and queue[0][2].cancelled:
+      heapq.heappop(queue)
+    if not queue:
+      del self._queues[model]
+      return None
+    return queue
+
+  def _enqueue(self, model: str, priority: int, wake: Callable[[], None]) -> _Waiter:
+    waiter = _Waiter(model, wake)
+    with self._lock:
+      heapq.heappush(self._queues.setdefault(model, []), (priority, next(self._sequence), waiter))
+      self._queued += 1
+      self._dispatch()
+    return waiter
+
+  def _drop(self, waiter: _Waiter, timeout: Optional[float]) -> bool:
+    "Takes `waiter` out of the queue unless it was granted in the meantime; True if it was dropped."
+    with self._lock:
+      if waiter.granted:
+        return False
+      waiter.cancelled = True
+      self._queued -= 1
+      if waiter.model in self._queues:
+        self._prune(waiter.model)
+      if timeout is not None:
+        self.dropped += 1
+      return True
+
+  def acquire(self, model: str, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> None:
+    "Waits for a slot for `model`; `release` hands it back."
+    event = threading.Event()
+    waiter = self._enqueue(model_name(model), priority, event.set)
+    if waiter.granted or event.wait(timeout) or not self._drop(waiter, timeout):
+      return
+    raise RequestError(f'{model} request waited more than {timeout:g}s to be sent')
+
+  async def acquire_async(self, model: str, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> None:
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    waiter = self._enqueue(model_name(model), priority, lambda: loop.call_soon_threadsafe(_resolve, future))
+    if waiter.granted:
+      return
+
+    try:
+      await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+      if self._drop(waiter, timeout):
+        raise RequestError(f'{model} request waited more than {timeout:g}s to be sent') from None
+    except asyncio.CancelledError:
+      if not self._drop(waiter, None):
+        self.release(model)
+      raise
+
+  def release(self, model: str) -> None:
+    model = model_name(model)
+    with self._lock:
+      self._in_flight -= 1
+      self._running[model] -= 1
+      if not self._running[model]:
+        del self._running[model]
+      self._dispatch()
+
+  @contextmanager
+  def slot(self, model: str, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> Iterator[None]:
+    self.acquire(model, priority, timeout)
+    try:
+      yield
+    finally:
+      self.release(model)
+
+  @asynccontextmanager
+  async def aslot(self, model: str, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> AsyncIterator[None]:
+    await self.acquire_async(model, priority, timeout)
+    try:
+      yield
+    finally:
+      self.release(model)
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      return {
+        'in_flight': self._in_flight,
+        'queued': self._queued,
+        'admitted': self.admitted,
+        'dropped': self.dropped,
+        'wait_seconds': self.wait_seconds,
+        'max_wait_seconds': self.max_wait_seconds,
+        'models': dict(self._running),
+      }
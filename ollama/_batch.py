@@ -0,0 +1,137 @@
+from typing import Any, Callable, Iterable, List, Sequence
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import Iterator
+else:
+  from collections.abc import Iterator
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+
+OUTPUTS = ('list', 'numpy')
+
+
+def estimate_tokens(text: str) -> int:
+  """
+  Rough token count used to size batches, about four characters per token.
+
+  >>> estimate_tokens('')
+  1
+  >>> estimate_tokens('a' * 400)
+  101
+  """
+  return len(text) // 4 + 1
+
+
+def batched(texts: Iterable[str], max_size: int = 64, max_tokens: int = 8192) -> Iterator[List[str]]:
+  """
+  Groups texts into batches of at most `max_size` texts and about `max_tokens` estimated tokens,
+  consuming `texts` lazily. A text larger than `max_tokens` on its own becomes a batch of one.
+
+  >>> [len(batch) for batch in batched(['a'] * 5, max_size=2)]
+  [2, 2, 1]
+  >>> [len(batch) for batch in batched(['a' * 40, 'b' * 40, 'c' * 400, 'd'], max_tokens=30)]
+  [2, 1, 1]
+  >>> list(batched([]))
+  []
+  """
+  if max_size < 1 or max_tokens < 1:
+    raise ValueError('max_size and max_tokens must be at least 1')
+
+  batch, tokens = [], 0
+  for text in texts:
+    size = estimate_tokens(text)
+    if batch and (len(batch) >= max_size or tokens + size > max_tokens):
+      yield batch
+      batch, tokens = [], 0
+    batch.append(text)
+    tokens += size
+
+  if batch:
+    yield batch
+
+
+def check_output(output: str) -> None:
+  """
+  >>> check_output('numpy' if numpy is not None else 'list')
+  >>> check_output('pandas')
+  Traceback (most recent call last):
+  ...
+  ValueError: output must be one of ('list', 'numpy'), got 'pandas'
+  """
+  if output not in OUTPUTS:
+    raise ValueError(f'output must be one of {OUTPUTS}, got {output!r}')
+  if output == 'numpy' and numpy is None:
+    raise ImportError("output='numpy' requires numpy, install it with `pip install numpy`")
+
+
+def to_array(embeddings: Sequence[Sequence[float]]) -> Any:
+  """
+  Converts one batch of embeddings to a float32 matrix as soon as it arrives, so the Python float
+  lists of a batch are released before the next one is decoded.
+
+  >>> to_array([[1, 2], [3, 4]]).dtype.name if numpy is not None else 'float32'
+  'float32'
+  """
+  return numpy.asarray(embeddings, dtype=numpy.float32)
+
+
+def concatenate(batches: List[Any], output: str) -> Any:
+  """
+  Joins per-batch results in order: a flat list for `output='list'`, or one contiguous
+  `(n, dimensions)` float32 array for `output='numpy'`.
+
+  >>> concatenate([[[1.0], [2.0]], [[3.0]]], 'list')
+  [[1.0], [2.0], [3.0]]
+  """
+  if output == 'list':
+    return [embedding for batch in batches for embedding in batch]
+
+  if not batches:
+    return numpy.empty((0, 0), dtype=numpy.float32)
+  return numpy.ascontiguousarray(numpy.concatenate(batches, axis=0))
+
+
+def parse_embeddings(content: bytes, decode: Callable[[bytes], Any], rows: int) -> Any:
+  """
+  Decodes an `/api/embed` response body with its `rows` embeddings written one by one into a
+  preallocated float32 array, so at most one row of Python floats is alive at a time instead of
+  the whole matrix. The rest of the body is decoded with `decode`.
+  """
+  key = content.find(b'"embeddings":')
+  start = content.find(b'[', key) if key >= 0 else -1
+  if start < 0 or rows < 1 or content[key + len(b'"embeddings":') : start].strip() or content[start + 1 : start + 2] != b'[':
+    return _decode_embeddings(content, decode)
+
+  embeddings, position = None, start + 1
+  try:
+    for i in range(rows):
+      row_end = content.index(b']', position) + 1
+      row = decode(content[position:row_end])
+      if embeddings is None:
+        embeddings = numpy.empty((rows, len(row)), dtype=numpy.float32)
+      elif len(row) != embeddings.shape[1]:
+        raise ValueError('ragged embeddings')
+      embeddings[i] = row
+      position = row_end + 1
+    if content[row_end:position] != b']':
+      raise ValueError('unexpected number of embeddings')
+  except (TypeError, ValueError):
+    # Not the matrix we expected; take the slow path rather than guess
+    return _decode_embeddings(content, decode)
+
+  response = decode(content[:start] + b'[]' + content[position:])
+  response['embeddings'] = embeddings
+  return response
+
+
+def _decode_embeddings(content: bytes, decode: Callable[[bytes], Any]) -> Any:
+  response = decode(content)
+  embeddings = response['embeddings']
+  response['embeddings'] = to_array(embeddings) if embeddings else numpy.empty((0, 0), dtype=numpy.float32)
+  return response
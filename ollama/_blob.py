@@ -0,0 +1,144 @@
+import asyncio
+import json
+import mmap
+import os
+import threading
+from hashlib import sha256
+from os import PathLike
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import AsyncIterator, Iterator
+else:
+  from collections.abc import AsyncIterator, Iterator
+
+
+# A multiple of the mmap allocation granularity on every platform (4 KiB on Linux, 64 KiB on Windows)
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Upload attempts per blob
+BLOB_RETRIES = 3
+
+Progress = Callable[[Mapping[str, Any]], None]
+
+
+def file_key(path: Union[str, PathLike]) -> Tuple[str, int, int, int]:
+  "Identity of a file's contents as far as the filesystem can tell: resolved path, size, mtime and inode."
+  stat = os.stat(path)
+  return str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class DigestCache:
+  """
+  sha256 digests of local files, one per path, valid while the file's `file_key` is unchanged so
+  an unchanged file is hashed once. When `path` is given the digests are also kept in that JSON
+  file and survive restarts.
+
+  >>> cache = DigestCache()
+  >>> cache.put(('/models/a.gguf', 10, 1, 2), 'sha256:abc')
+  >>> cache.get(('/models/a.gguf', 10, 1, 2))
+  'sha256:abc'
+  >>> cache.get(('/models/a.gguf', 10, 3, 2)) is None
+  True
+  """
+
+  def __init__(self, path: Optional[Union[str, PathLike]] = None) -> None:
+    self.path = Path(path).expanduser() if path is not None else None
+    self._digests: Dict[str, list] = {}
+    self._lock = threading.Lock()
+
+    if self.path is not None and self.path.exists():
+      self._digests = json.loads(self.path.read_text())
+
+  def get(self, key: Tuple[str, int, int, int]) -> Optional[str]:
+    path, *stat = key
+    entry = self._digests.get(path)
+    return entry[-1] if entry and entry[:-1] == stat else None
+
+  def put(self, key: Tuple[str, int, int, int], digest: str) -> None:
+    path, *stat = key
+    with self._lock:
+      self._digests[path] = [*stat, digest]
+      if self.path is not None:
+        partial = self.path.with_name(f'{self.path.name}.partial')
+        partial.write_text(json.dumps(self._digests))
+        os.replace(partial, self.path)
+
+
+def read_chunks(path: Union[str, PathLike], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+  "Reads `path` through a read-only memory map in `chunk_size` pieces."
+  with open(path, 'rb') as r:
+    size = os.fstat(r.fileno()).st_size
+    if size == 0:
+      return
+
+    with mmap.mmap(r.fileno(), 0, access=mmap.ACCESS_READ) as m:
+      for start in range(0, size, chunk_size):
+        yield m[start : start + chunk_size]
+
+
+_EXHAUSTED = object()
+
+
+async def aiter_in_executor(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+  """
+  Steps a blocking iterator in the default executor, one item at a time, so file reads and page
+  faults on a memory map happen off the event loop.
+  """
+  loop = asyncio.get_running_loop()
+  try:
+    while True:
+      chunk = await loop.run_in_executor(None, next, iterator, _EXHAUSTED)
+      if chunk is _EXHAUSTED:
+        return
+      yield chunk
+  finally:
+    # Releases the file and its memory map when the consumer stops early
+    close = getattr(iterator, 'close', None)
+    if close is not None:
+      close()
+
+
+def file_digest(path: Union[str, PathLike], cache: Optional[DigestCache] = None, progress: Optional[Progress] = None) -> str:
+  """
+  sha256 digest of `path` in the `sha256:<hex>` form used by `/api/blobs`. The file is hashed
+  straight from a memory map, and the digest is looked up in and stored to `cache`.
+
+  >>> import tempfile
+  >>> with tempfile.NamedTemporaryFile() as blob:
+  ...   file_digest(blob.name)
+  'sha256:e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+  """
+  key = file_key(path)
+  if cache is not None and (digest := cache.get(key)):
+    return digest
+
+  sha256sum = sha256()
+  with open(path, 'rb') as r:
+    size = os.fstat(r.fileno()).st_size
+    if size:
+      with mmap.mmap(r.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+        for start in range(0, size, CHUNK_SIZE):
+          with view[start : start + CHUNK_SIZE] as chunk:
+            sha256sum.update(chunk)
+          if progress:
+            progress({'status': f'hashing {Path(path).name}', 'total': size, 'completed': min(start + CHUNK_SIZE, size)})
+
+  digest = f'sha256:{sha256sum.hexdigest()}'
+  if cache is not None:
+    cache.put(key, digest)
+  return digest
+
+
+def upload_chunks(path: Union[str, PathLike], digest: str, progress: Optional[Progress] = None) -> Iterator[bytes]:
+  "Chunks of `path` for a blob upload, reporting each one to `progress` as it is handed to the transport."
+  total = os.stat(path).st_size
+  completed = 0
+  for chunk in read_chunks(path):
+    yield chunk
+    completed += len(chunk)
+    if progress:
+      progress({'status': f'uploading {digest}', 'digest': digest, 'total': total, 'completed': completed})
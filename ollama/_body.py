@@ -0,0 +1,113 @@
+import json
+from base64 import b64encode
+from pathlib import Path
+from typing import Any, Mapping, Union
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import AsyncIterator, Iterator
+else:
+  from collections.abc import AsyncIterator, Iterator
+
+from ollama._blob import aiter_in_executor, read_chunks
+
+
+# Request bodies are handed to the transport in pieces of about this size
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Raw bytes per base64 piece; a multiple of 3 so the pieces concatenate into one valid encoding
+_BASE64_CHUNK_SIZE = 3 * 256 * 1024
+
+
+class Base64:
+  """
+  Image bytes or a file path, base64-encoded piece by piece as the request body is written
+  instead of held in memory as one string.
+
+  >>> b''.join(Base64(b'ollama').chunks())
+  b'b2xsYW1h'
+  """
+
+  __slots__ = ('source',)
+
+  def __init__(self, source: Union[bytes, Path]) -> None:
+    self.source = source
+
+  def chunks(self) -> Iterator[bytes]:
+    if isinstance(self.source, Path):
+      for chunk in read_chunks(self.source, _BASE64_CHUNK_SIZE):
+        yield b64encode(chunk)
+      return
+
+    with memoryview(self.source) as view:
+      for start in range(0, len(view), _BASE64_CHUNK_SIZE):
+        yield b64encode(view[start : start + _BASE64_CHUNK_SIZE])
+
+
+def iter_json(value: Any, chunk_size: int = BODY_CHUNK_SIZE) -> Iterator[bytes]:
+  """
+  Serializes `value` as JSON in chunks of about `chunk_size` bytes, so a request body never exists
+  in memory as a whole. Peak memory is bounded by the largest single string or image piece.
+
+  >>> b''.join(iter_json({'messages': [{'content': 'hi', 'images': [Base64(b'ollama')]}], 'options': {}, 'stream': False}))
+  b'{"messages":[{"content":"hi","images":["b2xsYW1h"]}],"options":{},"stream":false}'
+  >>> [len(chunk) for chunk in iter_json(['x' * 10] * 4, chunk_size=16)]
+  [26, 26, 1]
+  """
+  buffer = bytearray()
+  for piece in _pieces(value):
+    buffer += piece
+    if len(buffer) >= chunk_size:
+      yield bytes(buffer)
+      buffer.clear()
+
+  if buffer:
+    yield bytes(buffer)
+
+
+async def aiter_json(value: Any, chunk_size: int = BODY_CHUNK_SIZE) -> AsyncIterator[bytes]:
+  "`iter_json` for async clients. Bodies with images read from files are serialized in the default executor."
+  if _reads_files(value):
+    async for chunk in aiter_in_executor(iter_json(value, chunk_size)):
+      yield chunk
+    return
+
+  for chunk in iter_json(value, chunk_size):
+    yield chunk
+
+
+def _reads_files(value: Any) -> bool:
+  if isinstance(value, Base64):
+    return isinstance(value.source, Path)
+  if isinstance(value, Mapping):
+    return any(_reads_files(item) for item in value.values())
+  if isinstance(value, (list, tuple)):
+    return any(_reads_files(item) for item in value)
+  return False
+
+
+def _dumps(value: Any) -> bytes:
+  return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _pieces(value: Any) -> Iterator[bytes]:
+  if isinstance(value, Mapping):
+    yield b'{'
+    for i, (key, item) in enumerate(value.items()):
+      yield b',' + _dumps(str(key)) + b':' if i else _dumps(str(key)) + b':'
+      yield from _pieces(item)
+    yield b'}'
+  elif isinstance(value, (list, tuple)):
+    yield b'['
+    for i, item in enumerate(value):
+      if i:
+        yield b','
+      yield from _pieces(item)
+    yield b']'
+  elif isinstance(value, Base64):
+    yield b'"'
+    yield from value.chunks()
+    yield b'"'
+  else:
+    yield _dumps(value)
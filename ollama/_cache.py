@@ -0,0 +1,232 @@
+import os
+import json
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b, sha256
+from os import PathLike
+from typing import Any, AnyStr, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from ollama._blob import file_key
+
+
+def cache_key(endpoint: str, model: str, text: AnyStr, truncate: Optional[bool] = None, options: Optional[Mapping[str, Any]] = None) -> str:
+  """
+  Content address of one embedding: the endpoint, model, truncation and options, and the sha256 of the text.
+  `/api/embed` and `/api/embeddings` return differently normalized vectors, so they never share entries.
+
+  >>> cache_key('embed', 'all-minilm', 'hello') == cache_key('embed', 'all-minilm', 'hello', options={})
+  True
+  >>> cache_key('embed', 'all-minilm', 'hello') == cache_key('embeddings', 'all-minilm', 'hello')
+  False
+  >>> cache_key('embed', 'all-minilm', 'hello', options={'a': 1, 'b': 2}) == cache_key('embed', 'all-minilm', 'hello', options={'b': 2, 'a': 1})
+  True
+  """
+  options_hash = sha256(json.dumps(options or {}, sort_keys=True).encode()).hexdigest()
+  text_hash = sha256(text if isinstance(text, bytes) else text.encode()).hexdigest()
+  return sha256(f'{endpoint}\0{model}\0{truncate}\0{options_hash}\0{text_hash}'.encode()).hexdigest()
+
+
+class EmbeddingCache:
+  """
+  Embedding cache with an in-memory LRU of `max_entries` vectors in front of an optional SQLite file at `path`.
+  Vectors are kept as packed doubles, so cached values are returned exactly as Ollama sent them.
+
+  >>> cache = EmbeddingCache(max_entries=1)
+  >>> cache.put_many({'a': [0.5, 1.0], 'b': [2.0]})
+  >>> cache.get_many(['a', 'b'])
+  [None, [2.0]]
+  >>> cache.stats()
+  {'hits': 1, 'misses': 1, 'evictions': 1, 'disk_hits': 0, 'entries': 1}
+  """
+
+  def __init__(self, path: Optional[Union[str, PathLike]] = None, max_entries: int = 10_000) -> None:
+    self.max_entries = max_entries
+    self._memory: 'OrderedDict[str, array]' = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = self.misses = self.evictions = self.disk_hits = 0
+
+    self._db = None
+    if path is not None:
+      self._db = sqlite3.connect(str(path), check_same_thread=False)
+      self._db.execute('PRAGMA journal_mode=WAL')
+      self._db.execute('CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)')
+      self._db.commit()
+
+  def _remember(self, key: str, vector: array) -> None:
+    self._memory[key] = vector
+    self._memory.move_to_end(key)
+    while len(self._memory) > self.max_entries:
+      self._memory.popitem(last=False)
+      self.evictions += 1
+
+  def _load(self, keys: Sequence[str]) -> Dict[str, array]:
+    found = {}
+    for start in range(0, len(keys), 500):
+      chunk = keys[start : start + 500]
+      rows = self._db.execute(f'SELECT key, vector FROM embeddings WHERE key IN ({",".join("?" * len(chunk))})', chunk)
+      for key, blob in rows:
+        vector = array('d')
+        vector.frombytes(blob)
+        found[key] = vector
+    return found
+
+  def get_many(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+    "Cached vectors for `keys`, in order, with None for misses."
+    with self._lock:
+      vectors = [self._memory.get(key) for key in keys]
+      for key, vector in zip(keys, vectors):
+        if vector is not None:
+          self._memory.move_to_end(key)
+
+      missing = [key for key, vector in zip(keys, vectors) if vector is None]
+      if missing and self._db is not None:
+        found = self._load(missing)
+        self.disk_hits += len(found)
+        for key, vector in found.items():
+          self._remember(key, vector)
+        vectors = [found.get(key) if vector is None else vector for key, vector in zip(keys, vectors)]
+
+      hits = sum(vector is not None for vector in vectors)
+      self.hits += hits
+      self.misses += len(keys) - hits
+      return [vector.tolist() if vector is not None else None for vector in vectors]
+
+  def put_many(self, vectors: Mapping[str, Sequence[float]]) -> None:
+    with self._lock:
+      packed = {key: array('d', vector) for key, vector in vectors.items()}
+      for key, vector in packed.items():
+        self._remember(key, vector)
+      if self._db is not None:
+        self._db.executemany('INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)', [(key, vector.tobytes()) for key, vector in packed.items()])
+        self._db.commit()
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'disk_hits': self.disk_hits, 'entries': len(self._memory)}
+
+  def clear(self) -> None:
+    with self._lock:
+      self._memory.clear()
+      if self._db is not None:
+        self._db.execute('DELETE FROM embeddings')
+        self._db.commit()
+
+  def close(self) -> None:
+    if self._db is not None:
+      self._db.close()
+      self._db = None
+
+
+def lookup(cache: EmbeddingCache, keys: Sequence[str]) -> Tuple[List[Optional[List[float]]], Dict[str, int]]:
+  """
+  Cached vectors for `keys` plus the distinct missing keys, each mapped to the first position
+  that needs it, so repeated texts are only sent upstream once.
+
+  >>> cache = EmbeddingCache()
+  >>> cache.put_many({'a': [1.0]})
+  >>> lookup(cache, ['a', 'b', 'c', 'b'])
+  ([[1.0], None, None, None], {'b': 1, 'c': 2})
+  """
+  vectors = cache.get_many(keys)
+  missing = {}
+  for position, (key, vector) in enumerate(zip(keys, vectors)):
+    if vector is None:
+      missing.setdefault(key, position)
+  return vectors, missing
+
+
+def fill(cache: EmbeddingCache, keys: Sequence[str], vectors: List[Optional[List[float]]], missing: Mapping[str, int], fetched: Sequence[Sequence[float]]) -> List[List[float]]:
+  """
+  Store the vectors fetched for `missing` (in its order) and stitch them into `vectors` in input order.
+
+  >>> cache = EmbeddingCache()
+  >>> fill(cache, ['a', 'b', 'a'], [None, [2.0], None], {'a': 0}, [[1.0]])
+  [[1.0], [2.0], [1.0]]
+  """
+  fetched_by_key = dict(zip(missing, fetched))
+  cache.put_many(fetched_by_key)
+  return [fetched_by_key[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+
+def image_key(image: Any) -> Optional[Tuple[Any, ...]]:
+  """
+  Content address of an image: the `file_key` of a path, so an unchanged file is never read again,
+  or the blake2b of raw or base64 data. File-like objects are read once and not cached.
+
+  >>> image_key(b'ollama') == image_key('ollama')
+  True
+  >>> import io
+  >>> image_key(io.BytesIO(b'ollama')) is None
+  True
+  """
+  if isinstance(image, (str, PathLike)):
+    try:
+      if os.path.isfile(image):
+        return ('file', *file_key(image))
+    except (OSError, ValueError):
+      ...
+
+  if isinstance(image, str):
+    image = image.encode()
+  if isinstance(image, bytes):
+    return ('data', blake2b(image).digest())
+  return None
+
+
+class ImageCache:
+  """
+  Base64 encodings of images keyed by `image_key`, in an LRU holding up to `max_bytes` of encoded
+  data, so images repeated across the turns of a chat are read and encoded once.
+
+  >>> cache = ImageCache(max_bytes=8)
+  >>> cache.encode(b'ollama', lambda image: 'b2xsYW1h')
+  'b2xsYW1h'
+  >>> cache.encode(b'ollama', lambda image: 'not called')
+  'b2xsYW1h'
+  >>> cache.stats()
+  {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 8}
+  """
+
+  def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+    self.max_bytes = max_bytes
+    self._encoded: 'OrderedDict[Tuple[Any, ...], str]' = OrderedDict()
+    self._size = 0
+    self._lock = threading.Lock()
+    self.hits = self.misses = self.evictions = 0
+
+  def encode(self, image: Any, encode: Callable[[Any], str]) -> str:
+    key = image_key(image)
+    if key is None:
+      return encode(image)
+
+    with self._lock:
+      if (encoded := self._encoded.get(key)) is not None:
+        self._encoded.move_to_end(key)
+        self.hits += 1
+        return encoded
+      self.misses += 1
+
+    encoded = encode(image)
+    if len(encoded) > self.max_bytes:
+      return encoded
+
+    with self._lock:
+      if key not in self._encoded:
+        self._encoded[key] = encoded
+        self._size += len(encoded)
+      while self._size > self.max_bytes:
+        _, evicted = self._encoded.popitem(last=False)
+        self._size -= len(evicted)
+        self.evictions += 1
+    return encoded
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self._encoded), 'bytes': self._size}
+
+  def clear(self) -> None:
+    with self._lock:
+      self._encoded.clear()
+      self._size = 0
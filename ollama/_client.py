@@ -1,18 +1,21 @@
 # ollama/_client.py
 import os
 import io
-import json
 import httpx
+import time
+import asyncio
 import binascii
+import itertools
 import platform
+import contextlib
 import urllib.parse
 from os import PathLike
 from pathlib import Path
-from copy import deepcopy
-from hashlib import sha256
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from base64 import b64encode, b64decode
 
-from typing import Any, AnyStr, Union, Optional, Sequence, Mapping, Literal, overload
+from typing import Any, AnyStr, Callable, Iterable, List, Tuple, Union, Optional, Sequence, Mapping, Literal, overload
 
 import sys
 
@@ -28,7 +31,26 @@ try:
 except metadata.PackageNotFoundError:
   __version__ = '0.0.0'
 
-from ollama._types import Message, Options, RequestError, ResponseError, Tool
+from ollama._admission import AdmissionController
+from ollama._body import Base64, aiter_json, iter_json
+from ollama._blob import BLOB_RETRIES, DigestCache, Progress, aiter_in_executor, file_digest, upload_chunks
+from ollama._batch import batched, check_output, concatenate, parse_embeddings, to_array
+from ollama._cache import EmbeddingCache, ImageCache, cache_key, fill, lookup
+from ollama._hooks import Call, Hook
+from ollama._flight import SingleFlight, flight_key
+from ollama._responses import ResponseCache, arecord_lines, record_lines
+from ollama._retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from ollama._decoder import Decoder, _as_decoder, iter_lines, aiter_lines
+from ollama._types import (
+  ChatRecord,
+  GenerateRecord,
+  Message,
+  Options,
+  ProgressRecord,
+  RequestError,
+  ResponseError,
+  Tool,
+)
 
 
 class BaseClient:
@@ -38,6 +60,20 @@ class BaseClient:
     host: Optional[str] = None,
     follow_redirects: bool = True,
     timeout: Any = None,
+    decoder: Union[str, Decoder, None] = None,
+    records: bool = False,
+    cache: Optional[EmbeddingCache] = None,
+    digests: Optional[DigestCache] = None,
+    image_cache: Optional[ImageCache] = None,
+    stream_body: bool = False,
+    single_flight: Optional[SingleFlight] = None,
+    response_cache: Optional[ResponseCache] = None,
+    retry: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    admission: Optional[AdmissionController] = None,
+    priority: int = AdmissionController.INTERACTIVE,
+    deadline: Optional[float] = None,
+    hooks: Optional[Sequence[Hook]] = None,
     **kwargs,
   ) -> None:
     """
@@ -45,6 +81,19 @@ class BaseClient:
     except for the following:
     - `follow_redirects`: True
     - `timeout`: None
+    `decoder` selects the JSON backend used to parse responses, either a backend name or a `Decoder`.
+    `records` returns chat, generate and progress responses as slotted `Record` objects instead of dicts.
+    `cache` serves repeated `embed` and `embeddings` texts from an `EmbeddingCache` instead of Ollama.
+    `digests` remembers the sha256 of files uploaded by `create`, shared by all clients in the process by default.
+    `image_cache` keeps base64-encoded images for `chat` and `generate`; without one each image is encoded per request.
+    `stream_body` writes `chat` and `generate` request bodies in chunks, encoding images as they are sent.
+    `single_flight` collapses identical concurrent `generate`, `chat`, `embed` and `embeddings` requests into one.
+    `response_cache` replays `generate` and `chat` responses to requests with a fixed `seed` or `temperature` 0.
+    `retry` sends requests that failed on a transient error again, as a `RetryPolicy` allows.
+    `breaker` fails requests fast while a `CircuitBreaker` holds the host to be down.
+    `admission` queues `generate`, `chat`, `embed` and `embeddings` requests past the limits of an `AdmissionController`,
+    at `priority`, dropping those still queued after `deadline` seconds.
+    `hooks` are `Hook` objects told about each request sent: its start, first byte, first token, chunks, end or error.
     `kwargs` are passed to the httpx client.
     """
 
@@ -53,50 +102,201 @@ class BaseClient:
     headers['Accept'] = 'application/json'
     headers['User-Agent'] = f'ollama-python/{__version__} ({platform.machine()} {platform.system().lower()}) Python/{platform.python_version()}'
 
+    self._host = _parse_host(host or os.getenv('OLLAMA_HOST'))
     self._client = client(
-      base_url=_parse_host(host or os.getenv('OLLAMA_HOST')),
+      base_url=self._host,
       follow_redirects=follow_redirects,
       timeout=timeout,
       headers=headers,
       **kwargs,
     )
 
+    self._decoder = _as_decoder(decoder)
+    self._records = records
+    self._cache = cache
+    self._digests = digests if digests is not None else _digests
+    self._images = image_cache
+    self._stream_body = stream_body
+    self._flights = single_flight
+    self._responses = response_cache
+    self._retry = retry
+    self._breaker = breaker
+    self._admission = admission
+    self._priority = priority
+    self._deadline = deadline
+    self._hooks = list(hooks) if hooks else None
+
+  def _flight_key(self, method: str, url: str, kwargs: Mapping[str, Any]) -> Optional[str]:
+    if self._flights is None or url not in _COALESCED:
+      return None
+    return flight_key(method, url, kwargs.get('json'))
+
+  def _response_keys(self, url: str, kwargs: Mapping[str, Any]) -> Optional[Tuple[str, str]]:
+    if self._responses is None or url not in _CACHED:
+      return None
+    return self._responses.keys(url, kwargs.get('json'))
+
+  def _retry_delay(self, method: str, url: str, attempt: int, error: BaseException) -> Optional[float]:
+    if self._retry is None or not self._retry.retries(method, url):
+      return None
+    return self._retry.delay(attempt, error)
+
+  def _call(self, method: str, url: str, kwargs: Mapping[str, Any], stream: bool) -> Call:
+    return Call(self._hooks, method, self._host, url, kwargs.get('json'), stream)
+
+  def _guard(self):
+    return self._breaker.guard(self._host) if self._breaker is not None else contextlib.nullcontext()
+
+  def _encode_images(self, images: Optional[Sequence[Any]]) -> List[Union[str, Base64]]:
+    if self._stream_body:
+      return [_defer_image(image) for image in images or []]
+    if self._images is None:
+      return [_encode_image(image) for image in images or []]
+    return [self._images.encode(image, _encode_image) for image in images or []]
+
+  def _decode_chunks(self, url: str):
+    decode = self._decoder.decode_chunk if url in ('/api/chat', '/api/generate') else self._decoder.decode
+    if self._records and (record := _RECORDS.get(url)):
+      from_mapping = record.from_mapping
+      return lambda line: from_mapping(decode(line))
+    return decode
+
+  def _decode_response(self, url: str, content: bytes) -> Mapping[str, Any]:
+    data = self._decoder.decode(content)
+    if self._records and (record := _RECORDS.get(url)):
+      return record.from_mapping(data)
+    return data
+
 
 class Client(BaseClient):
   def __init__(self, host: Optional[str] = None, **kwargs) -> None:
     super().__init__(httpx.Client, host, **kwargs)
 
-  def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
-    response = self._client.request(method, url, **kwargs)
+  def _body(self, url: str, kwargs: Mapping[str, Any]) -> Mapping[str, Any]:
+    if self._stream_body and url in _STREAMED_BODIES:
+      kwargs = dict(kwargs)
+      kwargs['content'] = iter_json(kwargs.pop('json'))
+    return kwargs
 
+  def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+    if key := self._flight_key(method, url, kwargs):
+      return self._flights.do(key, lambda: self._send(method, url, **kwargs))
+    return self._send(method, url, **kwargs)
+
+  def _admit(self, url: str, kwargs: Mapping[str, Any]):
+    if self._admission is None or url not in _ADMITTED:
+      return contextlib.nullcontext()
+    return self._admission.slot(kwargs['json']['model'], self._priority, self._deadline)
+
+  def _fetch(self, method: str, url: str, kwargs: Mapping[str, Any], call: Optional[Call]) -> httpx.Response:
+    if call is None:
+      return self._client.request(method, url, **self._body(url, kwargs))
+
+    # Streamed so the headers can be timed apart from the body
+    response = self._client.send(self._client.build_request(method, url, **self._body(url, kwargs)), stream=True)
+    call.byte()
     try:
-      response.raise_for_status()
-    except httpx.HTTPStatusError as e:
-      raise ResponseError(e.response.text, e.response.status_code) from None
-
+      response.read()
+    finally:
+      response.close()
     return response
 
-  def _stream(self, method: str, url: str, **kwargs) -> Iterator[Mapping[str, Any]]:
-    with self._client.stream(method, url, **kwargs) as r:
-      try:
-        r.raise_for_status()
-      except httpx.HTTPStatusError as e:
-        e.response.read()
-        raise ResponseError(e.response.text, e.response.status_code) from None
-
-      for line in r.iter_lines():
-        partial = json.loads(line)
-        if e := partial.get('error'):
-          raise ResponseError(e)
-        yield partial
+  def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+    call = self._call(method, url, kwargs, False) if self._hooks else None
+    try:
+      with self._admit(url, kwargs):
+        for attempt in itertools.count(1):
+          try:
+            with self._guard():
+              response = self._fetch(method, url, kwargs, call)
+
+              try:
+                response.raise_for_status()
+              except httpx.HTTPStatusError as e:
+                raise _response_error(e.response) from None
+
+              if call:
+                call.done(response.content)
+              return response
+          except (httpx.TransportError, ResponseError) as e:
+            if (delay := self._retry_delay(method, url, attempt, e)) is None:
+              raise
+            time.sleep(delay)
+    except BaseException as e:
+      if call:
+        call.fail(e)
+      raise
+
+  def _stream(self, method: str, url: str, store: Optional[Callable[[bytes], None]] = None, **kwargs) -> Iterator[Mapping[str, Any]]:
+    call = self._call(method, url, kwargs, True) if self._hooks else None
+    try:
+      with self._admit(url, kwargs):
+        for attempt in itertools.count(1):
+          started = False
+          try:
+            with self._guard(), self._client.stream(method, url, **self._body(url, kwargs)) as r:
+              try:
+                r.raise_for_status()
+              except httpx.HTTPStatusError as e:
+                e.response.read()
+                raise _response_error(e.response) from None
+
+              if call:
+                call.byte()
+
+              lines = iter_lines(r.iter_bytes())
+              if store:
+                lines = record_lines(lines, store)
+
+              decode = self._decode_chunks(url)
+              for line in lines:
+                partial = decode(line)
+                if e := partial.get('error'):
+                  raise ResponseError(e)
+                started = True
+                if call:
+                  call.chunk(partial)
+                yield partial
+
+              if call:
+                call.done()
+              return
+          except (httpx.TransportError, ResponseError) as e:
+            # Once a chunk was handed out the stream cannot be taken back, so only failures before it are retried
+            if started or (delay := self._retry_delay(method, url, attempt, e)) is None:
+              raise
+            time.sleep(delay)
+    except BaseException as e:
+      if call:
+        call.fail(e)
+      raise
 
   def _request_stream(
     self,
-    *args,
+    method: str,
+    url: str,
     stream: bool = False,
     **kwargs,
   ) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
-    return self._stream(*args, **kwargs) if stream else self._request(*args, **kwargs).json()
+    keys = self._response_keys(url, kwargs)
+    if keys and (cached := self._responses.get(*(keys[::-1] if stream else keys[:1]))) is not None:
+      return self._replay(url, cached) if stream else self._decode_response(url, cached)
+
+    if stream:
+      store = (lambda content: self._responses.put(keys[1], content)) if keys else None
+      if key := self._flight_key(method, url, kwargs):
+        return self._flights.stream(key, lambda: self._stream(method, url, store, **kwargs))
+      return self._stream(method, url, store, **kwargs)
+
+    content = self._request(method, url, **kwargs).content
+    if keys:
+      self._responses.put(keys[0], content)
+    return self._decode_response(url, content)
+
+  def _replay(self, url: str, content: bytes) -> Iterator[Mapping[str, Any]]:
+    decode = self._decode_chunks(url)
+    for line in content.splitlines():
+      yield decode(line)
 
   @overload
   def generate(
@@ -172,7 +372,7 @@ class Client(BaseClient):
         'context': context or [],
         'stream': stream,
         'raw': raw,
-        'images': [_encode_image(image) for image in images or []],
+        'images': self._encode_images(images),
         'format': format,
         'options': options or {},
         'keep_alive': keep_alive,
@@ -227,11 +427,7 @@ class Client(BaseClient):
     if not model:
       raise RequestError('must provide a model')
 
-    messages = deepcopy(messages)
-
-    for message in messages or []:
-      if images := message.get('images'):
-        message['images'] = [_encode_image(image) for image in images]
+    messages = _encode_message_images(messages, self._encode_images)
 
     return self._request_stream(
       'POST',
@@ -255,11 +451,25 @@ class Client(BaseClient):
     truncate: bool = True,
     options: Optional[Options] = None,
     keep_alive: Optional[Union[float, str]] = None,
+    output: Literal['list', 'numpy'] = 'list',
   ) -> Mapping[str, Any]:
+    """
+    `output='numpy'` returns `embeddings` as a float32 array of shape `(len(input), dimensions)`,
+    decoded one row at a time instead of as a list of Python floats.
+    """
     if not model:
       raise RequestError('must provide a model')
+    check_output(output)
 
-    return self._request(
+    if self._cache is not None:
+      texts = [input] if isinstance(input, (str, bytes)) else list(input)
+      keys = [cache_key('embed', model, text, truncate, options) for text in texts]
+      vectors, missing = lookup(self._cache, keys)
+      if not missing:
+        return {'model': model, 'embeddings': to_array(vectors) if output == 'numpy' else vectors}
+      input = [texts[position] for position in missing.values()]
+
+    response = self._request(
       'POST',
       '/api/embed',
       json={
@@ -269,7 +479,57 @@ class Client(BaseClient):
         'options': options or {},
         'keep_alive': keep_alive,
       },
-    ).json()
+    )
+
+    if self._cache is None:
+      if output == 'numpy':
+        return parse_embeddings(response.content, self._decoder.decode, 1 if isinstance(input, (str, bytes)) else len(input))
+      return self._decoder.decode(response.content)
+
+    result = self._decoder.decode(response.content)
+    embeddings = fill(self._cache, keys, vectors, missing, result['embeddings'])
+    result['embeddings'] = to_array(embeddings) if output == 'numpy' else embeddings
+    return result
+
+  def embed_many(
+    self,
+    model: str = '',
+    input: Iterable[str] = (),
+    truncate: bool = True,
+    options: Optional[Options] = None,
+    keep_alive: Optional[Union[float, str]] = None,
+    batch_size: int = 64,
+    batch_tokens: int = 8192,
+    concurrency: int = 4,
+    output: Literal['list', 'numpy'] = 'list',
+  ) -> Any:
+    """
+    Embeds any number of texts, consumed lazily from `input`, as `/api/embed` batches of at most
+    `batch_size` texts and about `batch_tokens` tokens, with up to `concurrency` requests in flight
+    on a thread pool.
+
+    Returns the embeddings in input order, as a list or, with `output='numpy'`, one contiguous
+    float32 array of shape `(len(input), dimensions)`. A single string is one text, as with `embed`.
+    """
+    if not model:
+      raise RequestError('must provide a model')
+    check_output(output)
+    if isinstance(input, str):
+      input = [input]
+
+    def embed_batch(batch):
+      return self.embed(model, batch, truncate=truncate, options=options, keep_alive=keep_alive, output=output)['embeddings']
+
+    results, pending = [], deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+      for batch in batched(input, batch_size, batch_tokens):
+        # Keep the next batches queued without reading the whole input ahead
+        if len(pending) >= 2 * concurrency:
+          results.append(pending.popleft().result())
+        pending.append(executor.submit(embed_batch, batch))
+      results.extend(future.result() for future in pending)
+
+    return concatenate(results, output)
 
   def embeddings(
     self,
@@ -278,7 +538,13 @@ class Client(BaseClient):
     options: Optional[Options] = None,
     keep_alive: Optional[Union[float, str]] = None,
   ) -> Mapping[str, Sequence[float]]:
-    return self._request(
+    if self._cache is not None:
+      keys = [cache_key('embeddings', model, prompt, options=options)]
+      vectors, missing = lookup(self._cache, keys)
+      if not missing:
+        return {'embedding': vectors[0]}
+
+    response = self._request(
       'POST',
       '/api/embeddings',
       json={
@@ -287,7 +553,12 @@ class Client(BaseClient):
         'options': options or {},
         'keep_alive': keep_alive,
       },
-    ).json()
+    )
+
+    result = self._decoder.decode(response.content)
+    if self._cache is not None:
+      fill(self._cache, keys, vectors, missing, [result['embedding']])
+    return result
 
   @overload
   def pull(
@@ -373,6 +644,8 @@ class Client(BaseClient):
     modelfile: Optional[str] = None,
     quantize: Optional[str] = None,
     stream: Literal[False] = False,
+    progress: Optional[Progress] = None,
+    concurrency: int = 4,
   ) -> Mapping[str, Any]: ...
 
   @overload
@@ -383,6 +656,8 @@ class Client(BaseClient):
     modelfile: Optional[str] = None,
     quantize: Optional[str] = None,
     stream: Literal[True] = True,
+    progress: Optional[Progress] = None,
+    concurrency: int = 4,
   ) -> Iterator[Mapping[str, Any]]: ...
 
   def create(
@@ -392,16 +667,21 @@ class Client(BaseClient):
     modelfile: Optional[str] = None,
     quantize: Optional[str] = None,
     stream: bool = False,
+    progress: Optional[Progress] = None,
+    concurrency: int = 4,
   ) -> Union[Mapping[str, Any], Iterator[Mapping[str, Any]]]:
     """
     Raises `ResponseError` if the request could not be fulfilled.
 
+    Local files referenced by the modelfile are hashed and uploaded up to `concurrency` at a time.
+    `progress` is called with `ProgressResponse`-shaped dicts while they are.
+
     Returns `ProgressResponse` if `stream` is `False`, otherwise returns a `ProgressResponse` generator.
     """
     if (realpath := _as_path(path)) and realpath.exists():
-      modelfile = self._parse_modelfile(realpath.read_text(), base=realpath.parent)
+      modelfile = self._parse_modelfile(realpath.read_text(), base=realpath.parent, progress=progress, concurrency=concurrency)
     elif modelfile:
-      modelfile = self._parse_modelfile(modelfile)
+      modelfile = self._parse_modelfile(modelfile, progress=progress, concurrency=concurrency)
     else:
       raise RequestError('must provide either path or modelfile')
 
@@ -417,106 +697,208 @@ class Client(BaseClient):
       stream=stream,
     )
 
-  def _parse_modelfile(self, modelfile: str, base: Optional[Path] = None) -> str:
-    base = Path.cwd() if base is None else base
+  def _parse_modelfile(self, modelfile: str, base: Optional[Path] = None, progress: Optional[Progress] = None, concurrency: int = 4) -> str:
+    parts = _split_modelfile(modelfile, Path.cwd() if base is None else base)
+    paths = list(dict.fromkeys(part[1] for part in parts if isinstance(part, tuple)))
 
-    out = io.StringIO()
-    for line in io.StringIO(modelfile):
-      command, _, args = line.partition(' ')
-      if command.upper() not in ['FROM', 'ADAPTER']:
-        print(line, end='', file=out)
-        continue
-
-      path = Path(args.strip()).expanduser()
-      path = path if path.is_absolute() else base / path
-      if path.exists():
-        args = f'@{self._create_blob(path)}\n'
-      print(command, args, end='', file=out)
-
-    return out.getvalue()
+    if len(paths) > 1:
+      with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        digests = list(executor.map(lambda path: self._create_blob(path, progress), paths))
+    else:
+      digests = [self._create_blob(path, progress) for path in paths]
 
-  def _create_blob(self, path: Union[str, Path]) -> str:
-    sha256sum = sha256()
-    with open(path, 'rb') as r:
-      while True:
-        chunk = r.read(32 * 1024)
-        if not chunk:
-          break
-        sha256sum.update(chunk)
+    return _join_modelfile(parts, dict(zip(paths, digests)))
 
-    digest = f'sha256:{sha256sum.hexdigest()}'
+  def _create_blob(self, path: Union[str, Path], progress: Optional[Progress] = None) -> str:
+    """
+    Uploads `path` unless the server already has it. The digest has to be known before the upload
+    starts, since it is part of the URL, so an unchanged file is only hashed once per `DigestCache`.
+    Ollama cannot resume a partial blob, so an upload that fails mid-way is retried from the start
+    unless the server turns out to have received it.
+    """
+    digest = file_digest(path, self._digests, progress)
+    if self._has_blob(digest):
+      return digest
 
+    for attempt in range(1, BLOB_RETRIES + 1):
+      try:
+        self._request('POST', f'/api/blobs/{digest}', content=upload_chunks(path, digest, progress))
+        return digest
+      except httpx.TransportError:
+        if attempt == BLOB_RETRIES:
+          raise
+        time.sleep(0.5 * attempt)
+        if self._has_blob(digest):
+          return digest
+
+  def _has_blob(self, digest: str) -> bool:
     try:
       self._request('HEAD', f'/api/blobs/{digest}')
     except ResponseError as e:
       if e.status_code != 404:
         raise
-
-      with open(path, 'rb') as r:
-        self._request('POST', f'/api/blobs/{digest}', content=r)
-
-    return digest
+      return False
+    return True
 
   def delete(self, model: str) -> Mapping[str, Any]:
     response = self._request('DELETE', '/api/delete', json={'name': model})
     return {'status': 'success' if response.status_code == 200 else 'error'}
 
   def list(self) -> Mapping[str, Any]:
-    return self._request('GET', '/api/tags').json()
+    return self._decoder.decode(self._request('GET', '/api/tags').content)
 
   def copy(self, source: str, destination: str) -> Mapping[str, Any]:
     response = self._request('POST', '/api/copy', json={'source': source, 'destination': destination})
     return {'status': 'success' if response.status_code == 200 else 'error'}
 
   def show(self, model: str) -> Mapping[str, Any]:
-    return self._request('POST', '/api/show', json={'name': model}).json()
+    return self._decoder.decode(self._request('POST', '/api/show', json={'name': model}).content)
 
   def ps(self) -> Mapping[str, Any]:
-    return self._request('GET', '/api/ps').json()
+    return self._decoder.decode(self._request('GET', '/api/ps').content)
 
 
 class AsyncClient(BaseClient):
   def __init__(self, host: Optional[str] = None, **kwargs) -> None:
     super().__init__(httpx.AsyncClient, host, **kwargs)
 
+  def _body(self, url: str, kwargs: Mapping[str, Any]) -> Mapping[str, Any]:
+    if self._stream_body and url in _STREAMED_BODIES:
+      kwargs = dict(kwargs)
+      kwargs['content'] = aiter_json(kwargs.pop('json'))
+    return kwargs
+
   async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
-    response = await self._client.request(method, url, **kwargs)
+    if key := self._flight_key(method, url, kwargs):
+      return await self._flights.do_async(key, lambda: self._send(method, url, **kwargs))
+    return await self._send(method, url, **kwargs)
 
-    try:
-      response.raise_for_status()
-    except httpx.HTTPStatusError as e:
-      raise ResponseError(e.response.text, e.response.status_code) from None
+  @contextlib.asynccontextmanager
+  async def _admit(self, url: str, kwargs: Mapping[str, Any]) -> AsyncIterator[None]:
+    if self._admission is None or url not in _ADMITTED:
+      yield
+      return
+
+    async with self._admission.aslot(kwargs['json']['model'], self._priority, self._deadline):
+      yield
 
+  async def _fetch(self, method: str, url: str, kwargs: Mapping[str, Any], call: Optional[Call]) -> httpx.Response:
+    if call is None:
+      return await self._client.request(method, url, **self._body(url, kwargs))
+
+    response = await self._client.send(self._client.build_request(method, url, **self._body(url, kwargs)), stream=True)
+    call.byte()
+    try:
+      await response.aread()
+    finally:
+      await response.aclose()
     return response
 
-  async def _stream(self, method: str, url: str, **kwargs) -> AsyncIterator[Mapping[str, Any]]:
+  async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+    call = self._call(method, url, kwargs, False) if self._hooks else None
+    try:
+      async with self._admit(url, kwargs):
+        for attempt in itertools.count(1):
+          try:
+            with self._guard():
+              response = await self._fetch(method, url, kwargs, call)
+
+              try:
+                response.raise_for_status()
+              except httpx.HTTPStatusError as e:
+                raise _response_error(e.response) from None
+
+              if call:
+                call.done(response.content)
+              return response
+          except (httpx.TransportError, ResponseError) as e:
+            if (delay := self._retry_delay(method, url, attempt, e)) is None:
+              raise
+            await asyncio.sleep(delay)
+    except BaseException as e:
+      if call:
+        call.fail(e)
+      raise
+
+  async def _stream(self, method: str, url: str, store: Optional[Callable[[bytes], None]] = None, **kwargs) -> AsyncIterator[Mapping[str, Any]]:
     async def inner():
-      async with self._client.stream(method, url, **kwargs) as r:
-        try:
-          r.raise_for_status()
-        except httpx.HTTPStatusError as e:
-          e.response.read()
-          raise ResponseError(e.response.text, e.response.status_code) from None
-
-        async for line in r.aiter_lines():
-          partial = json.loads(line)
-          if e := partial.get('error'):
-            raise ResponseError(e)
-          yield partial
+      call = self._call(method, url, kwargs, True) if self._hooks else None
+      try:
+        async with self._admit(url, kwargs):
+          for attempt in itertools.count(1):
+            started = False
+            try:
+              with self._guard():
+                async with self._client.stream(method, url, **self._body(url, kwargs)) as r:
+                  try:
+                    r.raise_for_status()
+                  except httpx.HTTPStatusError as e:
+                    await e.response.aread()
+                    raise _response_error(e.response) from None
+
+                  if call:
+                    call.byte()
+
+                  lines = aiter_lines(r.aiter_bytes())
+                  if store:
+                    lines = arecord_lines(lines, store)
+
+                  decode = self._decode_chunks(url)
+                  async for line in lines:
+                    partial = decode(line)
+                    if e := partial.get('error'):
+                      raise ResponseError(e)
+                    started = True
+                    if call:
+                      call.chunk(partial)
+                    yield partial
+
+                  if call:
+                    call.done()
+                  return
+            except (httpx.TransportError, ResponseError) as e:
+              if started or (delay := self._retry_delay(method, url, attempt, e)) is None:
+                raise
+              await asyncio.sleep(delay)
+      except BaseException as e:
+        if call:
+          call.fail(e)
+        raise
 
     return inner()
 
   async def _request_stream(
     self,
-    *args,
+    method: str,
+    url: str,
     stream: bool = False,
     **kwargs,
   ) -> Union[Mapping[str, Any], AsyncIterator[Mapping[str, Any]]]:
+    keys = self._response_keys(url, kwargs)
+    if keys and (cached := self._responses.get(*(keys[::-1] if stream else keys[:1]))) is not None:
+      return self._replay(url, cached) if stream else self._decode_response(url, cached)
+
+    store = (lambda content: self._responses.put(keys[1], content)) if keys and stream else None
+    if stream and (key := self._flight_key(method, url, kwargs)):
+
+      async def chunks():
+        async for chunk in await self._stream(method, url, store, **kwargs):
+          yield chunk
+
+      return self._flights.astream(key, chunks)
+
     if stream:
-      return await self._stream(*args, **kwargs)
+      return await self._stream(method, url, store, **kwargs)
+
+    content = (await self._request(method, url, **kwargs)).content
+    if keys:
+      self._responses.put(keys[0], content)
+    return self._decode_response(url, content)
 
-    response = await self._request(*args, **kwargs)
-    return response.json()
+  async def _replay(self, url: str, content: bytes) -> AsyncIterator[Mapping[str, Any]]:
+    decode = self._decode_chunks(url)
+    for line in content.splitlines():
+      yield decode(line)
 
   @overload
   async def generate(
@@ -591,7 +973,7 @@ class AsyncClient(BaseClient):
         'context': context or [],
         'stream': stream,
         'raw': raw,
-        'images': [_encode_image(image) for image in images or []],
+        'images': self._encode_images(images),
         'format': format,
         'options': options or {},
         'keep_alive': keep_alive,
@@ -645,11 +1027,7 @@ class AsyncClient(BaseClient):
     if not model:
       raise RequestError('must provide a model')
 
-    messages = deepcopy(messages)
-
-    for message in messages or []:
-      if images := message.get('images'):
-        message['images'] = [_encode_image(image) for image in images]
+    messages = _encode_message_images(messages, self._encode_images)
 
     return await self._request_stream(
       'POST',
@@ -673,9 +1051,23 @@ class AsyncClient(BaseClient):
     truncate: bool = True,
     options: Optional[Options] = None,
     keep_alive: Optional[Union[float, str]] = None,
+    output: Literal['list', 'numpy'] = 'list',
   ) -> Mapping[str, Any]:
+    """
+    `output='numpy'` returns `embeddings` as a float32 array of shape `(len(input), dimensions)`,
+    decoded one row at a time instead of as a list of Python floats.
+    """
     if not model:
       raise RequestError('must provide a model')
+    check_output(output)
+
+    if self._cache is not None:
+      texts = [input] if isinstance(input, (str, bytes)) else list(input)
+      keys = [cache_key('embed', model, text, truncate, options) for text in texts]
+      vectors, missing = lookup(self._cache, keys)
+      if not missing:
+        return {'model': model, 'embeddings': to_array(vectors) if output == 'numpy' else vectors}
+      input = [texts[position] for position in missing.values()]
 
     response = await self._request(
       'POST',
@@ -689,7 +1081,61 @@ class AsyncClient(BaseClient):
       },
     )
 
-    return response.json()
+    if self._cache is None:
+      if output == 'numpy':
+        return parse_embeddings(response.content, self._decoder.decode, 1 if isinstance(input, (str, bytes)) else len(input))
+      return self._decoder.decode(response.content)
+
+    result = self._decoder.decode(response.content)
+    embeddings = fill(self._cache, keys, vectors, missing, result['embeddings'])
+    result['embeddings'] = to_array(embeddings) if output == 'numpy' else embeddings
+    return result
+
+  async def embed_many(
+    self,
+    model: str = '',
+    input: Iterable[str] = (),
+    truncate: bool = True,
+    options: Optional[Options] = None,
+    keep_alive: Optional[Union[float, str]] = None,
+    batch_size: int = 64,
+    batch_tokens: int = 8192,
+    concurrency: int = 4,
+    output: Literal['list', 'numpy'] = 'list',
+  ) -> Any:
+    """
+    Embeds any number of texts, consumed lazily from `input`, as `/api/embed` batches of at most
+    `batch_size` texts and about `batch_tokens` tokens, with up to `concurrency` requests in flight.
+
+    Returns the embeddings in input order, as a list or, with `output='numpy'`, one contiguous
+    float32 array of shape `(len(input), dimensions)`. A single string is one text, as with `embed`.
+    """
+    if not model:
+      raise RequestError('must provide a model')
+    check_output(output)
+    if isinstance(input, str):
+      input = [input]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed_batch(batch):
+      async with semaphore:
+        return (await self.embed(model, batch, truncate=truncate, options=options, keep_alive=keep_alive, output=output))['embeddings']
+
+    results, pending = [], deque()
+    try:
+      for batch in batched(input, batch_size, batch_tokens):
+        # Keep the next batches queued without reading the whole input ahead
+        if len(pending) >= 2 * concurrency:
+          results.append(await pending.popleft())
+        pending.append(asyncio.ensure_future(embed_batch(batch)))
+      while pending:
+        results.append(await pending.popleft())
+    finally:
+      for task in pending:
+        task.cancel()
+
+    return concatenate(results, output)
 
   async def embeddings(
     self,
@@ -698,6 +1144,12 @@ class AsyncClient(BaseClient):
     options: Optional[Options] = None,
     keep_alive: Optional[Union[float, str]] = None,
   ) -> Mapping[str, Sequence[float]]:
+    if self._cache is not None:
+      keys = [cache_key('embeddings', model, prompt, options=options)]
+      vectors, missing = lookup(self._cache, keys)
+      if not missing:
+        return {'embedding': vectors[0]}
+
     response = await self._request(
       'POST',
       '/api/embeddings',
@@ -709,7 +1161,10 @@ class AsyncClient(BaseClient):
       },
     )
 
-    return response.json()
+    result = self._decoder.decode(response.content)
+    if self._cache is not None:
+      fill(self._cache, keys, vectors, missing, [result['embedding']])
+    return result
 
   @overload
   async def pull(
@@ -795,6 +1250,8 @@ class AsyncClient(BaseClient):
     modelfile: Optional[str] = None,
     quantize: Optional[str] = None,
     stream: Literal[False] = False,
+    progress: Optional[Progress] = None,
+    concurrency: int = 4,
   ) -> Mapping[str, Any]: ...
 
   @overload
@@ -805,6 +1262,8 @@ class AsyncClient(BaseClient):
     modelfile: Optional[str] = None,
     quantize: Optional[str] = None,
     stream: Literal[True] = True,
+    progress: Optional[Progress] = None,
+    concurrency: int = 4,
   ) -> AsyncIterator[Mapping[str, Any]]: ...
 
   async def create(
@@ -814,16 +1273,21 @@ class AsyncClient(BaseClient):
     modelfile: Optional[str] = None,
     quantize: Optional[str] = None,
     stream: bool = False,
+    progress: Optional[Progress] = None,
+    concurrency: int = 4,
   ) -> Union[Mapping[str, Any], AsyncIterator[Mapping[str, Any]]]:
     """
     Raises `ResponseError` if the request could not be fulfilled.
 
+    Local files referenced by the modelfile are hashed and uploaded up to `concurrency` at a time.
+    `progress` is called with `ProgressResponse`-shaped dicts while they are.
+
     Returns `ProgressResponse` if `stream` is `False`, otherwise returns a `ProgressResponse` generator.
     """
     if (realpath := _as_path(path)) and realpath.exists():
-      modelfile = await self._parse_modelfile(realpath.read_text(), base=realpath.parent)
+      modelfile = await self._parse_modelfile(realpath.read_text(), base=realpath.parent, progress=progress, concurrency=concurrency)
     elif modelfile:
-      modelfile = await self._parse_modelfile(modelfile)
+      modelfile = await self._parse_modelfile(modelfile, progress=progress, concurrency=concurrency)
     else:
       raise RequestError('must provide either path or modelfile')
 
@@ -839,52 +1303,47 @@ class AsyncClient(BaseClient):
       stream=stream,
     )
 
-  async def _parse_modelfile(self, modelfile: str, base: Optional[Path] = None) -> str:
-    base = Path.cwd() if base is None else base
-
-    out = io.StringIO()
-    for line in io.StringIO(modelfile):
-      command, _, args = line.partition(' ')
-      if command.upper() not in ['FROM', 'ADAPTER']:
-        print(line, end='', file=out)
-        continue
-
-      path = Path(args.strip()).expanduser()
-      path = path if path.is_absolute() else base / path
-      if path.exists():
-        args = f'@{await self._create_blob(path)}\n'
-      print(command, args, end='', file=out)
+  async def _parse_modelfile(self, modelfile: str, base: Optional[Path] = None, progress: Optional[Progress] = None, concurrency: int = 4) -> str:
+    parts = _split_modelfile(modelfile, Path.cwd() if base is None else base)
+    paths = list(dict.fromkeys(part[1] for part in parts if isinstance(part, tuple)))
+    semaphore = asyncio.Semaphore(concurrency)
 
-    return out.getvalue()
+    async def create_blob(path: Path) -> str:
+      async with semaphore:
+        return await self._create_blob(path, progress)
 
-  async def _create_blob(self, path: Union[str, Path]) -> str:
-    sha256sum = sha256()
-    with open(path, 'rb') as r:
-      while True:
-        chunk = r.read(32 * 1024)
-        if not chunk:
-          break
-        sha256sum.update(chunk)
+    digests = await asyncio.gather(*[create_blob(path) for path in paths])
+    return _join_modelfile(parts, dict(zip(paths, digests)))
 
-    digest = f'sha256:{sha256sum.hexdigest()}'
+  async def _create_blob(self, path: Union[str, Path], progress: Optional[Progress] = None) -> str:
+    """
+    Uploads `path` unless the server already has it. Hashing and reading the upload run in the
+    default executor, so `progress` may be called from another thread. See `Client._create_blob`.
+    """
+    loop = asyncio.get_running_loop()
+    digest = await loop.run_in_executor(None, file_digest, path, self._digests, progress)
+    if await self._has_blob(digest):
+      return digest
 
+    for attempt in range(1, BLOB_RETRIES + 1):
+      try:
+        await self._request('POST', f'/api/blobs/{digest}', content=aiter_in_executor(upload_chunks(path, digest, progress)))
+        return digest
+      except httpx.TransportError:
+        if attempt == BLOB_RETRIES:
+          raise
+        await asyncio.sleep(0.5 * attempt)
+        if await self._has_blob(digest):
+          return digest
+
+  async def _has_blob(self, digest: str) -> bool:
     try:
       await self._request('HEAD', f'/api/blobs/{digest}')
     except ResponseError as e:
       if e.status_code != 404:
         raise
-
-      async def upload_bytes():
-        with open(path, 'rb') as r:
-          while True:
-            chunk = r.read(32 * 1024)
-            if not chunk:
-              break
-            yield chunk
-
-      await self._request('POST', f'/api/blobs/{digest}', content=upload_bytes())
-
-    return digest
+      return False
+    return True
 
   async def delete(self, model: str) -> Mapping[str, Any]:
     response = await self._request('DELETE', '/api/delete', json={'name': model})
@@ -892,7 +1351,7 @@ class AsyncClient(BaseClient):
 
   async def list(self) -> Mapping[str, Any]:
     response = await self._request('GET', '/api/tags')
-    return response.json()
+    return self._decoder.decode(response.content)
 
   async def copy(self, source: str, destination: str) -> Mapping[str, Any]:
     response = await self._request('POST', '/api/copy', json={'source': source, 'destination': destination})
@@ -900,11 +1359,104 @@ class AsyncClient(BaseClient):
 
   async def show(self, model: str) -> Mapping[str, Any]:
     response = await self._request('POST', '/api/show', json={'name': model})
-    return response.json()
+    return self._decoder.decode(response.content)
 
   async def ps(self) -> Mapping[str, Any]:
     response = await self._request('GET', '/api/ps')
-    return response.json()
+    return self._decoder.decode(response.content)
+
+
+_STREAMED_BODIES = ('/api/chat', '/api/generate')
+
+_CACHED = ('/api/chat', '/api/generate')
+
+_ADMITTED = ('/api/chat', '/api/generate', '/api/embed', '/api/embeddings')
+
+_COALESCED = ('/api/chat', '/api/generate', '/api/embed', '/api/embeddings')
+
+_digests = DigestCache()
+
+_RECORDS = {
+  '/api/chat': ChatRecord,
+  '/api/generate': GenerateRecord,
+  '/api/pull': ProgressRecord,
+  '/api/push': ProgressRecord,
+  '/api/create': ProgressRecord,
+}
+
+
+def _split_modelfile(modelfile: str, base: Path) -> List[Union[str, Tuple[str, Path]]]:
+  """
+  Splits a modelfile into lines kept as they are and `(command, path)` pairs for `FROM` and
+  `ADAPTER` lines that refer to an existing local file, which are uploaded as blobs.
+
+  >>> _split_modelfile('FROM llama3\\nSYSTEM hi\\n', Path.cwd())
+  ['FROM llama3\\n', 'SYSTEM hi\\n']
+  """
+  parts = []
+  for line in io.StringIO(modelfile):
+    command, _, args = line.partition(' ')
+    if command.upper() in ['FROM', 'ADAPTER']:
+      path = Path(args.strip()).expanduser()
+      path = path if path.is_absolute() else base / path
+      if path.exists():
+        parts.append((command, path))
+        continue
+    parts.append(line)
+  return parts
+
+
+def _join_modelfile(parts: Sequence[Union[str, Tuple[str, Path]]], digests: Mapping[Path, str]) -> str:
+  """
+  >>> _join_modelfile(['SYSTEM hi\\n', ('FROM', Path('a.gguf'))], {Path('a.gguf'): 'sha256:abc'})
+  'SYSTEM hi\\nFROM @sha256:abc\\n'
+  """
+  return ''.join(part if isinstance(part, str) else f'{part[0]} @{digests[part[1]]}\n' for part in parts)
+
+
+def _encode_message_images(messages: Optional[Sequence[Message]], encode_images: Any) -> Optional[Sequence[Message]]:
+  """
+  Messages with their images encoded by `encode_images`. Only the messages that carry images, and
+  mappings that are not dicts such as a `MessageRecord` sent back from a previous turn, are copied,
+  shallowly, into dicts the request body can be serialized from. The caller's messages are never modified.
+
+  >>> messages = [{'role': 'user', 'content': 'hi'}, {'role': 'user', 'content': 'look', 'images': [b'ollama']}]
+  >>> encoded = _encode_message_images(messages, lambda images: [_encode_image(image) for image in images])
+  >>> encoded[0] is messages[0], encoded[1]['images'], messages[1]['images']
+  (True, ['b2xsYW1h'], [b'ollama'])
+  >>> from ollama._types import MessageRecord
+  >>> _encode_message_images([MessageRecord.from_mapping({'role': 'assistant', 'content': 'hi'})], None)
+  [{'content': 'hi', 'role': 'assistant'}]
+  """
+  if not messages or not any(message.get('images') or not isinstance(message, dict) for message in messages):
+    return messages
+  return [
+    {**message, 'images': encode_images(images)} if (images := message.get('images')) else message if isinstance(message, dict) else dict(message)
+    for message in messages
+  ]
+
+
+def _defer_image(image) -> Union[str, Base64]:
+  """
+  Like `_encode_image`, except that paths and raw bytes are left to be encoded while the request
+  body is written.
+
+  >>> _defer_image(b'ollama').source
+  b'ollama'
+  >>> _defer_image(b'YWJj')
+  'YWJj'
+  """
+  if p := _as_path(image):
+    return Base64(p)
+
+  if isinstance(image, bytes):
+    try:
+      b64decode(image, validate=True)
+      return image.decode('utf-8')
+    except binascii.Error:
+      return Base64(image)
+
+  return _encode_image(image)
 
 
 def _encode_image(image) -> str:
@@ -956,6 +1508,10 @@ def _as_bytesio(s: Any) -> Union[io.BytesIO, None]:
   return None
 
 
+def _response_error(response: httpx.Response) -> ResponseError:
+  return ResponseError(response.text, response.status_code, parse_retry_after(response.headers.get('retry-after')))
+
+
 def _parse_host(host: Optional[str]) -> str:
   """
   >>> _parse_host(None)
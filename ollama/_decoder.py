@@ -0,0 +1,168 @@
+import json
+from typing import Any, Callable, List, Mapping, Optional, Tuple, Union
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import Iterator, AsyncIterator
+else:
+  from collections.abc import Iterator, AsyncIterator
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  import msgspec
+except ImportError:
+  msgspec = None
+
+
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+
+if msgspec is not None:
+
+  class _PartialMessage(msgspec.Struct):
+    content: str = ''
+
+  class _PartialChunk(msgspec.Struct):
+    response: Optional[str] = None
+    message: Optional[_PartialMessage] = None
+    done: bool = False
+    error: Optional[str] = None
+
+
+def available_backends() -> Tuple[str, ...]:
+  """
+  Returns the installed JSON backends, fastest first.
+
+  >>> available_backends()[-1]
+  'json'
+  """
+  installed = {'orjson': orjson is not None, 'msgspec': msgspec is not None, 'json': True}
+  return tuple(name for name in BACKENDS if installed[name])
+
+
+def _loads(backend: str) -> Callable[[Union[bytes, str]], Any]:
+  if backend == 'orjson' and orjson is not None:
+    return orjson.loads
+  if backend == 'msgspec' and msgspec is not None:
+    return msgspec.json.Decoder().decode
+  if backend == 'json':
+    return json.loads
+  raise ValueError(f'JSON backend {backend!r} is not installed, choose one of {available_backends()}')
+
+
+class Decoder:
+  """
+  Decodes JSON bodies and NDJSON stream lines returned by the Ollama API.
+
+  `backend` is one of `orjson`, `msgspec`, `json` or `auto`. `auto` picks the fastest backend installed
+  and falls back to the standard library.
+
+  If `partial` is `True`, streamed chat and generate chunks are reduced to the fields needed to follow a
+  stream: `response`, `message.content`, `done` and `error`. With `msgspec` the other fields are skipped
+  by the parser; with the other backends the chunk is decoded in full and trimmed, which only saves memory
+  for callers that hold on to chunks.
+  """
+
+  def __init__(self, backend: str = 'auto', partial: bool = False) -> None:
+    self.backend = available_backends()[0] if backend == 'auto' else backend
+    self.partial = partial
+    self.decode = _loads(self.backend)
+
+    self.decode_chunk = self.decode
+    if partial and self.backend == 'msgspec':
+      self.decode_chunk = self._decode_partial_struct
+      self._partial_decoder = msgspec.json.Decoder(_PartialChunk)
+    elif partial:
+      self.decode_chunk = self._decode_partial
+
+  def __repr__(self) -> str:
+    return f'Decoder(backend={self.backend!r}, partial={self.partial!r})'
+
+  def _decode_partial(self, data: Union[bytes, str]) -> Mapping[str, Any]:
+    """
+    >>> Decoder('json', partial=True).decode_chunk(b'{"model": "m", "message": {"role": "assistant", "content": "hi"}, "done": false}')
+    {'message': {'content': 'hi'}, 'done': False}
+    >>> Decoder('json', partial=True).decode_chunk(b'{"model": "m", "response": "", "done": true, "context": [1, 2, 3]}')
+    {'response': '', 'done': True}
+    """
+    full = self.decode(data)
+    partial = {}
+    if 'response' in full:
+      partial['response'] = full['response']
+    if message := full.get('message'):
+      partial['message'] = {'content': message.get('content', '')}
+    partial['done'] = full.get('done', False)
+    if error := full.get('error'):
+      partial['error'] = error
+    return partial
+
+  def _decode_partial_struct(self, data: Union[bytes, str]) -> Mapping[str, Any]:
+    chunk = self._partial_decoder.decode(data)
+    partial = {}
+    if chunk.response is not None:
+      partial['response'] = chunk.response
+    if chunk.message is not None:
+      partial['message'] = {'content': chunk.message.content}
+    partial['done'] = chunk.done
+    if chunk.error:
+      partial['error'] = chunk.error
+    return partial
+
+
+def _as_decoder(decoder: Union[str, Decoder, None]) -> Decoder:
+  if isinstance(decoder, Decoder):
+    return decoder
+  return Decoder(decoder or 'auto')
+
+
+def iter_lines(chunks: Iterator[bytes]) -> Iterator[bytes]:
+  """
+  Splits a byte stream into NDJSON lines without decoding them to text. The unterminated end of a
+  chunk is kept as a list of pieces joined once its line ends, so a long line arriving in many
+  chunks is copied once rather than on every chunk.
+
+  >>> list(iter_lines(iter([b'{"a": 1}\\n{"b"', b': 2}\\r\\n', b'\\n{"c": 3}'])))
+  [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+  >>> list(iter_lines(iter([b'{"a": "', b'x', b'y', b'"}\\n', b'{"b"', b': 2}'])))
+  [b'{"a": "xy"}', b'{"b": 2}']
+  """
+  pending: List[bytes] = []
+  for chunk in chunks:
+    *lines, rest = chunk.split(b'\n')
+    if lines:
+      if pending:
+        pending.append(lines[0])
+        lines[0] = b''.join(pending)
+        pending.clear()
+      for line in lines:
+        if line := line.rstrip(b'\r'):
+          yield line
+    if rest:
+      pending.append(rest)
+
+  if buffer := b''.join(pending).rstrip(b'\r'):
+    yield buffer
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+  pending: List[bytes] = []
+  async for chunk in chunks:
+    *lines, rest = chunk.split(b'\n')
+    if lines:
+      if pending:
+        pending.append(lines[0])
+        lines[0] = b''.join(pending)
+        pending.clear()
+      for line in lines:
+        if line := line.rstrip(b'\r'):
+          yield line
+    if rest:
+      pending.append(rest)
+
+  if buffer := b''.join(pending).rstrip(b'\r'):
+    yield buffer
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import threading
+from hashlib import blake2b, sha256
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, TypeVar
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import AsyncIterator, Iterator
+else:
+  from collections.abc import AsyncIterator, Iterator
+
+from ollama._body import Base64
+
+T = TypeVar('T')
+
+
+def flight_key(method: str, url: str, payload: Optional[Mapping[str, Any]]) -> str:
+  """
+  Deterministic identity of a request: the same method, endpoint and payload give the same key
+  whatever the order of keys in the payload.
+
+  >>> flight_key('POST', '/api/generate', {'model': 'llama3', 'options': {'seed': 1, 'temperature': 0}}) == flight_key('POST', '/api/generate', {'options': {'temperature': 0, 'seed': 1}, 'model': 'llama3'})
+  True
+  >>> flight_key('POST', '/api/generate', {'model': 'llama3'}) == flight_key('POST', '/api/chat', {'model': 'llama3'})
+  False
+  """
+  return sha256(json.dumps([method, url, payload], sort_keys=True, separators=(',', ':'), default=_default).encode()).hexdigest()
+
+
+def _default(value: Any) -> Any:
+  if isinstance(value, Base64):
+    source = value.source
+    return str(source) if isinstance(source, Path) else blake2b(source).hexdigest()
+  raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class _Call:
+  __slots__ = ('done', 'result', 'error')
+
+  def __init__(self) -> None:
+    self.done = threading.Event()
+    self.result: Any = None
+    self.error: Optional[BaseException] = None
+
+
+class _Tee:
+  """
+  Replays one upstream iterator to any number of readers. Whichever reader is furthest ahead pulls
+  the next item; the others read it from the buffer, so each gets every item from the start.
+  `readers` is kept by `SingleFlight`; when the last reader stops before the end, `on_release`
+  returns True and the source is closed, releasing its connection.
+  """
+
+  def __init__(self, source: Iterator[Any], on_done: Callable[[], None], on_release: Callable[[], bool]) -> None:
+    self.source = source
+    self.on_done = on_done
+    self.on_release = on_release
+    self.readers = 0
+    self.items: List[Any] = []
+    self.done = False
+    self.error: Optional[BaseException] = None
+    self.lock = threading.Lock()
+
+  def __iter__(self) -> Iterator[Any]:
+    i = 0
+    try:
+      while True:
+        if i < len(self.items):
+          yield self.items[i]
+          i += 1
+          continue
+
+        with self.lock:
+          if i == len(self.items) and not self.done:
+            try:
+              self.items.append(next(self.source))
+            except StopIteration:
+              self._finish(None)
+            except BaseException as e:
+              self._finish(e)
+
+        if i == len(self.items) and self.done:
+          if self.error is not None:
+            raise self.error
+          return
+    finally:
+      if self.on_release() and not self.done:
+        self.done = True
+        if (close := getattr(self.source, 'close', None)) is not None:
+          close()
+
+  def _finish(self, error: Optional[BaseException]) -> None:
+    self.done, self.error = True, error
+    self.on_done()
+
+
+class _AsyncTee:
+  "`_Tee` for async iterators."
+
+  def __init__(self, source: AsyncIterator[Any], on_done: Callable[[], None], on_release: Callable[[], bool]) -> None:
+    self.source = source
+    self.on_done = on_done
+    self.on_release = on_release
+    self.readers = 0
+    self.items: List[Any] = []
+    self.done = False
+    self.error: Optional[BaseException] = None
+    self.lock = asyncio.Lock()
+
+  async def __aiter__(self) -> AsyncIterator[Any]:
+    i = 0
+    try:
+      while True:
+        if i < len(self.items):
+          yield self.items[i]
+          i += 1
+          continue
+
+        async with self.lock:
+          if i == len(self.items) and not self.done:
+            try:
+              self.items.append(await self.source.__anext__())
+            except StopAsyncIteration:
+              self._finish(None)
+            except BaseException as e:
+              self._finish(e)
+
+        if i == len(self.items) and self.done:
+          if self.error is not None:
+            raise self.error
+          return
+    finally:
+      if self.on_release() and not self.done:
+        self.done = True
+        if (aclose := getattr(self.source, 'aclose', None)) is not None:
+          await aclose()
+
+  def _finish(self, error: Optional[BaseException]) -> None:
+    self.done, self.error = True, error
+    self.on_done()
+
+
+class SingleFlight:
+  """
+  Collapses identical requests that are in flight at the same time into one upstream call. Every
+  caller waiting on the same key gets the outcome of that call: the same response or the same
+  error for `do` and `do_async`, and every item of the same stream for `stream` and `astream`.
+  Only concurrent calls are shared; once a call finishes the next one goes upstream again.
+
+  One instance can serve threads and tasks alike, and be shared by several clients.
+
+  >>> flights = SingleFlight()
+  >>> flights.do('key', lambda: 'response')
+  'response'
+  >>> flights.stats()
+  {'hits': 0, 'misses': 1, 'in_flight': 0}
+  """
+
+  def __init__(self) -> None:
+    self._lock = threading.Lock()
+    self._calls: Dict[Any, Any] = {}
+    self.hits = self.misses = 0
+
+  def _join(self, key: Any, start: Callable[[], Any]) -> Any:
+    with self._lock:
+      if (call := self._calls.get(key)) is not None:
+        self.hits += 1
+        return call, False
+      self.misses += 1
+      call = self._calls[key] = start()
+      return call, True
+
+  def _join_stream(self, key: Any, start: Callable[[], Any]) -> Any:
+    # Readers are counted under the lock, so a stream is never closed between a caller joining and reading it
+    with self._lock:
+      if (tee := self._calls.get(key)) is not None:
+        self.hits += 1
+      else:
+        self.misses += 1
+        tee = self._calls[key] = start()
+      tee.readers += 1
+      return tee
+
+  def _release(self, key: Any, tee: Any) -> bool:
+    "Drops a reader of `tee`; True if it was the last, in which case later calls go upstream again."
+    with self._lock:
+      tee.readers -= 1
+      if tee.readers:
+        return False
+      if self._calls.get(key) is tee:
+        del self._calls[key]
+      return True
+
+  def _leave(self, key: Any, call: Any) -> None:
+    with self._lock:
+      if self._calls.get(key) is call:
+        del self._calls[key]
+
+  def do(self, key: str, fn: Callable[[], T]) -> T:
+    call, leader = self._join(key, _Call)
+    if leader:
+      try:
+        call.result = fn()
+      except BaseException as e:
+        call.error = e
+        raise
+      finally:
+        self._leave(key, call)
+        call.done.set()
+      return call.result
+
+    call.done.wait()
+    if call.error is not None:
+      raise call.error
+    return call.result
+
+  async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+    # The call runs as its own task, so a waiter being cancelled does not cancel it for the others
+    loop_key = (id(asyncio.get_running_loop()), key)
+    task, leader = self._join(loop_key, lambda: asyncio.ensure_future(fn()))
+    if leader:
+      task.add_done_callback(lambda _: self._leave(loop_key, task))
+    return await asyncio.shield(task)
+
+  def stream(self, key: str, fn: Callable[[], Iterator[T]]) -> Iterator[T]:
+    tee = self._join_stream(key, lambda: _Tee(fn(), lambda: self._leave(key, tee), lambda: self._release(key, tee)))
+    return iter(tee)
+
+  def astream(self, key: str, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+    loop_key = (id(asyncio.get_running_loop()), key)
+    tee = self._join_stream(loop_key, lambda: _AsyncTee(fn(), lambda: self._leave(loop_key, tee), lambda: self._release(loop_key, tee)))
+    return tee.__aiter__()
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {'hits': self.hits, 'misses': self.misses, 'in_flight': len(self._calls)}
@@ -0,0 +1,133 @@
+import json
+import time
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+
+class Call:
+  """
+  One request to the server as hooks see it. Times are `time.perf_counter()` seconds; `final` is
+  the last chunk of a streamed response or the decoded body of any other. `context` is free for
+  hooks to keep their own state in, such as a span.
+  """
+
+  __slots__ = ('hooks', 'method', 'host', 'url', 'model', 'stream', 'started', 'first_byte', 'first_token', 'finished', 'chunks', 'error', 'context', '_final', '_content')
+
+  def __init__(self, hooks: Sequence['Hook'], method: str, host: str, url: str, payload: Any, stream: bool) -> None:
+    self.hooks = hooks
+    self.method = method
+    self.host = host
+    self.url = url
+    self.model: Optional[str] = payload.get('model') if isinstance(payload, Mapping) else None
+    self.stream = stream
+    self.started = time.perf_counter()
+    self.first_byte: Optional[float] = None
+    self.first_token: Optional[float] = None
+    self.finished: Optional[float] = None
+    self.chunks = 0
+    self.error: Optional[BaseException] = None
+    self.context: Dict[Any, Any] = {}
+    self._final: Optional[Mapping[str, Any]] = None
+    self._content: Optional[bytes] = None
+
+    for hook in hooks:
+      hook.on_request(self)
+
+  @property
+  def final(self) -> Optional[Mapping[str, Any]]:
+    if self._final is None and self._content:
+      try:
+        self._final = json.loads(self._content)
+      except ValueError:
+        ...
+    return self._final
+
+  @property
+  def duration(self) -> Optional[float]:
+    return None if self.finished is None else self.finished - self.started
+
+  @property
+  def time_to_first_byte(self) -> Optional[float]:
+    return None if self.first_byte is None else self.first_byte - self.started
+
+  @property
+  def time_to_first_token(self) -> Optional[float]:
+    return None if self.first_token is None else self.first_token - self.started
+
+  @property
+  def tokens_per_second(self) -> Optional[float]:
+    """
+    Generation speed as the server measured it, or else as the client saw the chunks arrive.
+
+    >>> call = Call([], 'POST', 'http://127.0.0.1:11434', '/api/generate', {'model': 'llama3'}, True)
+    >>> call._final = {'done': True, 'eval_count': 50, 'eval_duration': 2_000_000_000}
+    >>> call.tokens_per_second
+    25.0
+    """
+    final = self.final or {}
+    if final.get('eval_count') and final.get('eval_duration'):
+      return final['eval_count'] / (final['eval_duration'] / 1e9)
+    if self.first_token is not None and self.finished is not None and self.chunks > 1 and self.finished > self.first_token:
+      return (self.chunks - 1) / (self.finished - self.first_token)
+    return None
+
+  def byte(self) -> None:
+    self.first_byte = time.perf_counter()
+    for hook in self.hooks:
+      hook.on_first_byte(self)
+
+  def chunk(self, chunk: Mapping[str, Any]) -> None:
+    self.chunks += 1
+    self._final = chunk
+    if self.first_token is None and (chunk.get('response') or (chunk.get('message') or {}).get('content')):
+      self.first_token = time.perf_counter()
+      for hook in self.hooks:
+        hook.on_first_token(self)
+
+    for hook in self.hooks:
+      hook.on_chunk(self, chunk)
+
+  def done(self, content: Optional[bytes] = None) -> None:
+    self.finished = time.perf_counter()
+    self._content = content
+    for hook in self.hooks:
+      hook.on_done(self)
+
+  def fail(self, error: BaseException) -> None:
+    self.finished = time.perf_counter()
+    self.error = error
+    for hook in self.hooks:
+      hook.on_error(self, error)
+
+
+class Hook:
+  """
+  Base class for client instrumentation. Subclasses override the events they need, and are given
+  to a client with `hooks=[...]`. Events fire for requests sent to the server, in the thread or
+  task making the request, so they should return quickly. Responses from a `ResponseCache` and
+  requests coalesced by a `SingleFlight` are not seen.
+
+  >>> class Timer(Hook):
+  ...   def on_done(self, call):
+  ...     print(call.url, call.final['response'], call.duration >= 0)
+  >>> call = Call([Timer()], 'POST', 'http://127.0.0.1:11434', '/api/generate', {'model': 'llama3'}, False)
+  >>> call.done(b'{"response": "hi", "done": true}')
+  /api/generate hi True
+  """
+
+  def on_request(self, call: Call) -> None:
+    "The request is about to be sent."
+
+  def on_first_byte(self, call: Call) -> None:
+    "The response headers arrived."
+
+  def on_first_token(self, call: Call) -> None:
+    "The first streamed chunk carrying generated text arrived."
+
+  def on_chunk(self, call: Call, chunk: Mapping[str, Any]) -> None:
+    "A streamed chunk arrived."
+
+  def on_done(self, call: Call) -> None:
+    "The response was read to the end."
+
+  def on_error(self, call: Call, error: BaseException) -> None:
+    "The request failed, after any retries, or a stream was closed before its end."
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Dict, Mapping
+
+try:
+  from opentelemetry import metrics, trace
+  from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+  metrics = trace = None
+
+from ollama._client import __version__
+from ollama._hooks import Call, Hook
+
+_OPERATIONS = {
+  '/api/chat': 'chat',
+  '/api/generate': 'text_completion',
+  '/api/embed': 'embeddings',
+  '/api/embeddings': 'embeddings',
+}
+
+# Server-reported timings of a final chunk, in nanoseconds
+_DURATIONS = ('total_duration', 'load_duration', 'prompt_eval_duration', 'eval_duration')
+
+
+class OpenTelemetryHook(Hook):
+  """
+  Records a client span for each request to the server and these histograms, in seconds unless noted:
+  - `gen_ai.client.operation.duration`
+  - `ollama.client.time_to_first_token`, for streamed responses
+  - `ollama.client.tokens_per_second`, in tokens per second
+  - `ollama.server.total_duration`, `ollama.server.load_duration`, `ollama.server.prompt_eval_duration`
+    and `ollama.server.eval_duration`, as reported in the final `chat` and `generate` response
+  - `gen_ai.client.token.usage`, in tokens, split by `gen_ai.token.type`
+
+  Uses the global tracer and meter providers unless others are given. Requires `opentelemetry-api`,
+  and an SDK for anything to be exported.
+  """
+
+  def __init__(self, tracer_provider: Any = None, meter_provider: Any = None) -> None:
+    if trace is None:
+      raise ImportError('OpenTelemetryHook requires opentelemetry-api, install it with `pip install opentelemetry-api`')
+
+    self.tracer = trace.get_tracer('ollama', __version__, tracer_provider=tracer_provider)
+    meter = metrics.get_meter('ollama', __version__, meter_provider=meter_provider)
+
+    self.operation_duration = meter.create_histogram('gen_ai.client.operation.duration', unit='s', description='Duration of requests to Ollama')
+    self.time_to_first_token = meter.create_histogram('ollama.client.time_to_first_token', unit='s', description='Time until the first generated text of a streamed response')
+    self.tokens_per_second = meter.create_histogram('ollama.client.tokens_per_second', unit='{token}/s', description='Generation speed')
+    self.token_usage = meter.create_histogram('gen_ai.client.token.usage', unit='{token}', description='Prompt and generated tokens')
+    self.server_durations = {name: meter.create_histogram(f'ollama.server.{name}', unit='s', description=f'Server-reported {name.replace("_", " ")}') for name in _DURATIONS}
+
+  def _attributes(self, call: Call) -> Dict[str, Any]:
+    attributes = {'gen_ai.system': 'ollama', 'gen_ai.operation.name': _OPERATIONS.get(call.url, call.url), 'server.address': call.host}
+    if call.model:
+      attributes['gen_ai.request.model'] = call.model
+    return attributes
+
+  def on_request(self, call: Call) -> None:
+    attributes = self._attributes(call)
+    attributes['http.request.method'] = call.method
+    attributes['url.path'] = call.url
+    call.context[self] = self.tracer.start_span(f'ollama {attributes["gen_ai.operation.name"]}', kind=SpanKind.CLIENT, attributes=attributes)
+
+  def on_first_token(self, call: Call) -> None:
+    call.context[self].add_event('gen_ai.first_token')
+
+  def on_done(self, call: Call) -> None:
+    span = call.context.pop(self)
+    attributes = self._attributes(call)
+    self.operation_duration.record(call.duration, attributes)
+    if (ttft := call.time_to_first_token) is not None:
+      self.time_to_first_token.record(ttft, attributes)
+      span.set_attribute('ollama.time_to_first_token', ttft)
+
+    if call.url in ('/api/chat', '/api/generate'):
+      self._record_final(span, call.final or {}, attributes)
+      if (speed := call.tokens_per_second) is not None:
+        self.tokens_per_second.record(speed, attributes)
+
+    span.end()
+
+  def _record_final(self, span: Any, final: Mapping[str, Any], attributes: Dict[str, Any]) -> None:
+    for name, histogram in self.server_durations.items():
+      if (value := final.get(name)) is not None:
+        histogram.record(value / 1e9, attributes)
+        span.set_attribute(f'ollama.{name}', value / 1e9)
+
+    for key, kind in (('prompt_eval_count', 'input'), ('eval_count', 'output')):
+      if (value := final.get(key)) is not None:
+        self.token_usage.record(value, {**attributes, 'gen_ai.token.type': kind})
+        span.set_attribute(f'gen_ai.usage.{kind}_tokens', value)
+
+  def on_error(self, call: Call, error: BaseException) -> None:
+    span = call.context.pop(self)
+    attributes = self._attributes(call)
+    # A stream closed early or a cancelled task is not a failure of the server
+    if not isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+      attributes['error.type'] = type(error).__name__
+      span.record_exception(error)
+      span.set_status(Status(StatusCode.ERROR, str(error)))
+    self.operation_duration.record(call.duration, attributes)
+    span.end()
@@ -0,0 +1,338 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Literal, Mapping, Optional, Sequence, Set
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import AsyncIterator, Iterator
+else:
+  from collections.abc import AsyncIterator, Iterator
+
+import httpx
+
+from ollama._client import AsyncClient, BaseClient, Client, _parse_host
+from ollama._types import CircuitOpenError, ResponseError, model_name
+
+# Errors raised before a request reaches the server, so it can be sent to another host instead
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, CircuitOpenError)
+
+
+class Host:
+  "One server of a pool: its client, the requests it has in flight and the models it has loaded."
+
+  __slots__ = ('url', 'client', 'outstanding', 'requests', 'failures', 'down_until', 'models')
+
+  def __init__(self, url: str, client: Any) -> None:
+    self.url = url
+    self.client = client
+    self.outstanding = 0
+    self.requests = 0
+    self.failures = 0
+    self.down_until = 0.0
+    self.models: Set[str] = set()
+
+
+class HostPool:
+  """
+  Routing state shared by the threads or tasks of one pooled client.
+
+  With the `affinity` strategy a request goes to the least busy host that has its model loaded,
+  unless that host has `spill` or more requests in flight beyond the least busy host overall.
+  Otherwise, and with the `least_outstanding` strategy, it goes to the host with the fewest
+  requests in flight. A host that fails `max_failures` times in a row, or a health check, is left
+  out for `cooldown` seconds.
+
+  >>> pool = HostPool([Host('a', None), Host('b', None)])
+  >>> pool.up(pool.hosts[1], ['llama3:latest'])
+  >>> [pool.pick(None).url for _ in range(3)]
+  ['a', 'b', 'a']
+  >>> pool.pick('llama3:latest').url
+  'b'
+  """
+
+  def __init__(
+    self,
+    hosts: Sequence[Host],
+    strategy: Literal['affinity', 'least_outstanding'] = 'affinity',
+    spill: int = 4,
+    max_failures: int = 3,
+    cooldown: float = 30.0,
+    check_interval: Optional[float] = 10.0,
+  ) -> None:
+    if not hosts:
+      raise ValueError('at least one host is required')
+
+    self.hosts = list(hosts)
+    self.strategy = strategy
+    self.spill = spill
+    self.max_failures = max_failures
+    self.cooldown = cooldown
+    self.check_interval = check_interval
+    self._checked: Optional[float] = None
+    self._lock = threading.Lock()
+
+  def pick(self, model: Optional[str] = None, exclude: Sequence[Host] = ()) -> Host:
+    now = time.monotonic()
+    with self._lock:
+      hosts = [host for host in self.hosts if host not in exclude]
+      # When every host is out, try them anyway rather than failing without a request
+      hosts = [host for host in hosts if host.down_until <= now] or hosts
+
+      host = min(hosts, key=lambda host: (host.outstanding, host.requests))
+      if self.strategy == 'affinity' and model:
+        warm = [candidate for candidate in hosts if model in candidate.models]
+        if warm and (best := min(warm, key=lambda host: (host.outstanding, host.requests))).outstanding - host.outstanding < self.spill:
+          host = best
+
+      host.requests += 1
+      return host
+
+  def due(self) -> bool:
+    "Whether a health check is due; only the first caller to ask gets True."
+    if self.check_interval is None:
+      return False
+
+    now = time.monotonic()
+    with self._lock:
+      if self._checked is not None and now - self._checked < self.check_interval:
+        return False
+      self._checked = now
+      return True
+
+  @contextmanager
+  def track(self, host: Host, model: Optional[str] = None) -> Iterator[None]:
+    "Counts a request to `host` as in flight, and as a failure if it raises a transport or server error."
+    with self._lock:
+      host.outstanding += 1
+
+    try:
+      yield
+    except (httpx.TransportError, ResponseError) as e:
+      with self._lock:
+        host.outstanding -= 1
+      if isinstance(e, httpx.TransportError) or e.status_code >= 500:
+        self.fail(host)
+      raise
+    except BaseException:
+      with self._lock:
+        host.outstanding -= 1
+      raise
+    else:
+      with self._lock:
+        host.outstanding -= 1
+        host.failures = 0
+        if model:
+          host.models.add(model)
+
+  def fail(self, host: Host) -> None:
+    with self._lock:
+      host.failures += 1
+      if host.failures >= self.max_failures:
+        host.down_until = time.monotonic() + self.cooldown
+
+  def up(self, host: Host, models: Sequence[str]) -> None:
+    with self._lock:
+      host.failures = 0
+      host.down_until = 0.0
+      host.models = set(models)
+
+  def down(self, host: Host) -> None:
+    with self._lock:
+      host.failures = max(host.failures, self.max_failures)
+      host.down_until = time.monotonic() + self.cooldown
+      host.models = set()
+
+  def stats(self) -> List[Dict[str, Any]]:
+    now = time.monotonic()
+    with self._lock:
+      return [
+        {
+          'host': host.url,
+          'up': host.down_until <= now,
+          'outstanding': host.outstanding,
+          'requests': host.requests,
+          'failures': host.failures,
+          'models': sorted(host.models),
+        }
+        for host in self.hosts
+      ]
+
+
+def _model(kwargs: Mapping[str, Any]) -> Optional[str]:
+  payload = kwargs.get('json')
+  model = payload.get('model') if isinstance(payload, Mapping) else None
+  return model_name(model) if model else None
+
+
+def _split_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+  # Caches and coalescing apply to the pool as a whole, so the clients of each host go without them
+  return {key: kwargs.pop(key) for key in ('cache', 'single_flight', 'response_cache') if key in kwargs}
+
+
+def _loaded(content: Mapping[str, Any]) -> List[str]:
+  return [model_name(model['name']) for model in content.get('models') or []]
+
+
+class PooledClient(Client):
+  """
+  A `Client` that spreads requests over several Ollama servers; see `HostPool` for how a host is
+  picked. Every `check_interval` seconds one request first polls `/api/ps` on all hosts, which both
+  learns the models each has loaded and brings back or leaves out hosts; `check` does it at will.
+  A request that cannot connect, or whose host has an open `CircuitBreaker`, is sent to the next host.
+
+  `create` runs on one host. `clients` maps each host to its own `Client`, for calls such as `pull`
+  or `create` that should reach every host.
+  """
+
+  def __init__(
+    self,
+    hosts: Sequence[str],
+    strategy: Literal['affinity', 'least_outstanding'] = 'affinity',
+    spill: int = 4,
+    max_failures: int = 3,
+    cooldown: float = 30.0,
+    check_interval: Optional[float] = 10.0,
+    check_timeout: float = 2.0,
+    **kwargs,
+  ) -> None:
+    shared = _split_kwargs(kwargs)
+    self.clients = {_parse_host(host): Client(host, **kwargs) for host in hosts}
+    self._pool = HostPool([Host(url, client) for url, client in self.clients.items()], strategy, spill, max_failures, cooldown, check_interval)
+    self._check_timeout = check_timeout
+
+    # Requests go through the clients of each host, so the pool has no httpx client of its own
+    BaseClient.__init__(self, lambda **_: None, **kwargs, **shared)
+
+  def check(self) -> None:
+    "Polls `/api/ps` on every host at once."
+    with ThreadPoolExecutor(max_workers=len(self._pool.hosts)) as executor:
+      list(executor.map(self._check, self._pool.hosts))
+
+  def _check(self, host: Host) -> None:
+    try:
+      response = host.client._send('GET', '/api/ps', timeout=self._check_timeout)
+      models = _loaded(self._decoder.decode(response.content))
+    except (httpx.HTTPError, ResponseError, ValueError):
+      self._pool.down(host)
+    else:
+      self._pool.up(host, models)
+
+  def stats(self) -> List[Dict[str, Any]]:
+    return self._pool.stats()
+
+  def _pick(self, model: Optional[str], exclude: Sequence[Host] = ()) -> Host:
+    if self._pool.due():
+      self.check()
+    return self._pool.pick(model, exclude)
+
+  def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+    model, tried = _model(kwargs), []
+    while True:
+      host = self._pick(model, tried)
+      try:
+        with self._pool.track(host, model):
+          return host.client._send(method, url, **kwargs)
+      except _CONNECT_ERRORS:
+        tried.append(host)
+        # A streamed upload cannot be read twice
+        if 'content' in kwargs or len(tried) == len(self._pool.hosts):
+          raise
+
+  def _stream(self, method: str, url: str, store=None, **kwargs) -> Iterator[Mapping[str, Any]]:
+    model = _model(kwargs)
+    return self._stream_from(self._pick(model), model, method, url, store, kwargs)
+
+  def _stream_from(self, host: Host, model: Optional[str], method: str, url: str, store, kwargs) -> Iterator[Mapping[str, Any]]:
+    tried = []
+    while True:
+      try:
+        with self._pool.track(host, model):
+          yield from host.client._stream(method, url, store, **kwargs)
+        return
+      except _CONNECT_ERRORS:
+        tried.append(host)
+        if 'content' in kwargs or len(tried) == len(self._pool.hosts):
+          raise
+        host = self._pick(model, tried)
+
+  def create(self, *args, **kwargs):
+    return self._pick(None).client.create(*args, **kwargs)
+
+
+class AsyncPooledClient(AsyncClient):
+  "`PooledClient` for asyncio."
+
+  def __init__(
+    self,
+    hosts: Sequence[str],
+    strategy: Literal['affinity', 'least_outstanding'] = 'affinity',
+    spill: int = 4,
+    max_failures: int = 3,
+    cooldown: float = 30.0,
+    check_interval: Optional[float] = 10.0,
+    check_timeout: float = 2.0,
+    **kwargs,
+  ) -> None:
+    shared = _split_kwargs(kwargs)
+    self.clients = {_parse_host(host): AsyncClient(host, **kwargs) for host in hosts}
+    self._pool = HostPool([Host(url, client) for url, client in self.clients.items()], strategy, spill, max_failures, cooldown, check_interval)
+    self._check_timeout = check_timeout
+
+    BaseClient.__init__(self, lambda **_: None, **kwargs, **shared)
+
+  async def check(self) -> None:
+    await asyncio.gather(*(self._check(host) for host in self._pool.hosts))
+
+  async def _check(self, host: Host) -> None:
+    try:
+      response = await host.client._send('GET', '/api/ps', timeout=self._check_timeout)
+      models = _loaded(self._decoder.decode(response.content))
+    except (httpx.HTTPError, ResponseError, ValueError):
+      self._pool.down(host)
+    else:
+      self._pool.up(host, models)
+
+  def stats(self) -> List[Dict[str, Any]]:
+    return self._pool.stats()
+
+  async def _pick(self, model: Optional[str], exclude: Sequence[Host] = ()) -> Host:
+    if self._pool.due():
+      await self.check()
+    return self._pool.pick(model, exclude)
+
+  async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+    model, tried = _model(kwargs), []
+    while True:
+      host = await self._pick(model, tried)
+      try:
+        with self._pool.track(host, model):
+          return await host.client._send(method, url, **kwargs)
+      except _CONNECT_ERRORS:
+        tried.append(host)
+        if 'content' in kwargs or len(tried) == len(self._pool.hosts):
+          raise
+
+  async def _stream(self, method: str, url: str, store=None, **kwargs) -> AsyncIterator[Mapping[str, Any]]:
+    model = _model(kwargs)
+    return self._stream_from(await self._pick(model), model, method, url, store, kwargs)
+
+  async def _stream_from(self, host: Host, model: Optional[str], method: str, url: str, store, kwargs) -> AsyncIterator[Mapping[str, Any]]:
+    tried = []
+    while True:
+      try:
+        with self._pool.track(host, model):
+          async for part in await host.client._stream(method, url, store, **kwargs):
+            yield part
+        return
+      except _CONNECT_ERRORS:
+        tried.append(host)
+        if 'content' in kwargs or len(tried) == len(self._pool.hosts):
+          raise
+        host = await self._pick(model, tried)
+
+  async def create(self, *args, **kwargs):
+    return await (await self._pick(None)).client.create(*args, **kwargs)
@@ -0,0 +1,281 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from os import PathLike
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import AsyncIterator, Iterator
+else:
+  from collections.abc import AsyncIterator, Iterator
+
+from ollama._flight import flight_key
+
+
+def cacheable(payload: Optional[Mapping[str, Any]]) -> bool:
+  """
+  Whether a `generate` or `chat` payload is reproducible: it fixes a `seed` or sets `temperature` to 0.
+
+  >>> cacheable({'model': 'llama3', 'options': {'seed': 42}})
+  True
+  >>> cacheable({'model': 'llama3', 'options': {'temperature': 0}})
+  True
+  >>> cacheable({'model': 'llama3', 'options': {'temperature': 0.8}})
+  False
+  """
+  options = (payload or {}).get('options') or {}
+  return options.get('seed') is not None or options.get('temperature') == 0
+
+
+class MemoryBackend:
+  "An in-memory LRU of up to `max_bytes` of responses, each kept for at most `ttl` seconds."
+
+  def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None) -> None:
+    self.max_bytes = max_bytes
+    self.ttl = ttl
+    self._entries: 'OrderedDict[str, Tuple[Optional[float], bytes]]' = OrderedDict()
+    self._size = 0
+    self._lock = threading.Lock()
+
+  def get(self, key: str) -> Optional[bytes]:
+    with self._lock:
+      if (entry := self._entries.get(key)) is None:
+        return None
+
+      expires, value = entry
+      if expires is not None and expires < time.time():
+        self._remove(key)
+        return None
+
+      self._entries.move_to_end(key)
+      return value
+
+  def put(self, key: str, value: bytes) -> None:
+    if len(value) > self.max_bytes:
+      return
+
+    with self._lock:
+      if key in self._entries:
+        self._remove(key)
+      self._entries[key] = (time.time() + self.ttl if self.ttl is not None else None, value)
+      self._size += len(value)
+      while self._size > self.max_bytes:
+        self._remove(next(iter(self._entries)))
+
+  def _remove(self, key: str) -> None:
+    _, value = self._entries.pop(key)
+    self._size -= len(value)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+      self._size = 0
+
+
+class SQLiteBackend:
+  "Responses in a SQLite file, least recently used first out past `max_bytes`, each kept for at most `ttl` seconds."
+
+  def __init__(self, path: Union[str, PathLike], max_bytes: int = 1024 * 1024 * 1024, ttl: Optional[float] = None) -> None:
+    self.max_bytes = max_bytes
+    self.ttl = ttl
+    self._lock = threading.Lock()
+    self._db = sqlite3.connect(str(Path(path).expanduser()), check_same_thread=False)
+    self._db.execute('PRAGMA journal_mode=WAL')
+    self._db.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, expires REAL, used REAL NOT NULL)')
+    self._db.execute('CREATE INDEX IF NOT EXISTS responses_used ON responses (used)')
+    self._db.commit()
+
+  def get(self, key: str) -> Optional[bytes]:
+    now = time.time()
+    with self._lock:
+      row = self._db.execute('SELECT value, expires FROM responses WHERE key = ?', (key,)).fetchone()
+      if row is None:
+        return None
+
+      value, expires = row
+      if expires is not None and expires < now:
+        self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+        self._db.commit()
+        return None
+
+      self._db.execute('UPDATE responses SET used = ? WHERE key = ?', (now, key))
+      self._db.commit()
+      return value
+
+  def put(self, key: str, value: bytes) -> None:
+    if len(value) > self.max_bytes:
+      return
+
+    now = time.time()
+    with self._lock:
+      self._db.execute('DELETE FROM responses WHERE expires < ?', (now,))
+      self._db.execute(
+        'INSERT OR REPLACE INTO responses (key, value, size, expires, used) VALUES (?, ?, ?, ?, ?)',
+        (key, value, len(value), now + self.ttl if self.ttl is not None else None, now),
+      )
+
+      excess = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0] - self.max_bytes
+      if excess > 0:
+        evicted = []
+        for evict, size in self._db.execute('SELECT key, size FROM responses ORDER BY used'):
+          if excess <= 0:
+            break
+          evicted.append((evict,))
+          excess -= size
+        self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+      self._db.commit()
+
+  def clear(self) -> None:
+    with self._lock:
+      self._db.execute('DELETE FROM responses')
+      self._db.commit()
+
+  def close(self) -> None:
+    self._db.close()
+
+
+class DirectoryBackend:
+  """
+  One file per response under `path`, which several processes can share. Files older than `ttl`
+  seconds are ignored and removed, and least recently read files are removed past `max_bytes`.
+  """
+
+  def __init__(self, path: Union[str, PathLike], max_bytes: int = 1024 * 1024 * 1024, ttl: Optional[float] = None) -> None:
+    self.path = Path(path).expanduser()
+    self.path.mkdir(parents=True, exist_ok=True)
+    self.max_bytes = max_bytes
+    self.ttl = ttl
+    self._size: Optional[int] = None
+    self._lock = threading.Lock()
+
+  def _file(self, key: str) -> Path:
+    return self.path / key[:2] / key
+
+  def get(self, key: str) -> Optional[bytes]:
+    path = self._file(key)
+    try:
+      stat = path.stat()
+      if self.ttl is not None and stat.st_mtime + self.ttl < time.time():
+        path.unlink()
+        return None
+      value = path.read_bytes()
+      # Reads are tracked in the access time so eviction can go least recently used first
+      os.utime(path, (time.time(), stat.st_mtime))
+      return value
+    except FileNotFoundError:
+      return None
+
+  def put(self, key: str, value: bytes) -> None:
+    if len(value) > self.max_bytes:
+      return
+
+    path = self._file(key)
+    path.parent.mkdir(exist_ok=True)
+    partial = path.with_name(f'{key}.{os.getpid()}.{threading.get_ident()}.partial')
+    partial.write_bytes(value)
+    os.replace(partial, path)
+
+    with self._lock:
+      if self._size is not None:
+        self._size += len(value)
+      if self._size is None or self._size > self.max_bytes:
+        self._evict()
+
+  def _evict(self) -> None:
+    files = [(entry.stat().st_atime, entry.stat().st_size, entry.path) for directory in os.scandir(self.path) if directory.is_dir() for entry in os.scandir(directory.path) if not entry.name.endswith('.partial')]
+    self._size = sum(size for _, size, _ in files)
+
+    # Evict down to 90% so the directory is not scanned again on every put
+    for _, size, path in sorted(files):
+      if self._size <= self.max_bytes * 0.9:
+        break
+      try:
+        os.unlink(path)
+      except FileNotFoundError:
+        ...
+      self._size -= size
+
+  def clear(self) -> None:
+    with self._lock:
+      for directory in os.scandir(self.path):
+        if directory.is_dir():
+          for entry in os.scandir(directory.path):
+            os.unlink(entry.path)
+      self._size = 0
+
+
+class ResponseCache:
+  """
+  Replays `generate` and `chat` responses for reproducible requests (see `cacheable`) from a
+  backend: a `MemoryBackend` by default, a `SQLiteBackend` or `DirectoryBackend`, or any object
+  with the same `get`, `put` and `clear` methods. Entries are keyed by the request payload with
+  sorted keys, without `stream` and `keep_alive`.
+
+  Responses are stored as the bytes Ollama sent. A streamed response is stored whole once the
+  stream is read to the end, and replayed as the same chunks. A stored non-streamed response is
+  replayed to a streaming request as one final chunk.
+
+  >>> cache = ResponseCache()
+  >>> keys = cache.keys('/api/generate', {'model': 'llama3', 'prompt': 'hi', 'options': {'seed': 1}, 'stream': False})
+  >>> cache.put(keys[0], b'{"response":"hello","done":true}')
+  >>> cache.get(*cache.keys('/api/generate', {'model': 'llama3', 'prompt': 'hi', 'options': {'seed': 1}, 'stream': True})[::-1])
+  b'{"response":"hello","done":true}'
+  >>> cache.keys('/api/generate', {'model': 'llama3', 'prompt': 'hi'}) is None
+  True
+  """
+
+  def __init__(self, backend: Any = None) -> None:
+    self.backend = backend if backend is not None else MemoryBackend()
+    self._lock = threading.Lock()
+    self.hits = self.misses = 0
+
+  def keys(self, url: str, payload: Optional[Mapping[str, Any]]) -> Optional[Tuple[str, str]]:
+    "Keys of the non-streamed and the streamed response to `payload`, or None if it is not cacheable."
+    if not cacheable(payload):
+      return None
+    key = flight_key('POST', url, {k: v for k, v in payload.items() if k not in ('stream', 'keep_alive')})
+    return f'{key}.json', f'{key}.ndjson'
+
+  def get(self, *keys: str) -> Optional[bytes]:
+    "The first of `keys` that is stored."
+    for key in keys:
+      if (value := self.backend.get(key)) is not None:
+        with self._lock:
+          self.hits += 1
+        return value
+
+    with self._lock:
+      self.misses += 1
+    return None
+
+  def put(self, key: str, value: bytes) -> None:
+    self.backend.put(key, value)
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {'hits': self.hits, 'misses': self.misses}
+
+  def clear(self) -> None:
+    self.backend.clear()
+
+
+def record_lines(lines: Iterator[bytes], store: Callable[[bytes], None]) -> Iterator[bytes]:
+  "Passes `lines` through and hands them to `store` once all were read."
+  recorded = []
+  for line in lines:
+    recorded.append(line)
+    yield line
+  store(b'\n'.join(recorded))
+
+
+async def arecord_lines(lines: AsyncIterator[bytes], store: Callable[[bytes], None]) -> AsyncIterator[bytes]:
+  recorded = []
+  async for line in lines:
+    recorded.append(line)
+    yield line
+  store(b'\n'.join(recorded))
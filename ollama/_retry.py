@@ -0,0 +1,211 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Sequence
+
+import sys
+
+if sys.version_info < (3, 9):
+  from typing import Iterator
+else:
+  from collections.abc import Iterator
+
+import httpx
+
+from ollama._types import CircuitOpenError, ResponseError
+
+# Errors where the request may not have reached the server, or the connection dropped before a response
+_TRANSIENT_ERRORS = (httpx.NetworkError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+  """
+  Seconds to wait from a `Retry-After` header, given either as seconds or as an HTTP date.
+
+  >>> parse_retry_after('3')
+  3.0
+  >>> parse_retry_after('Thu, 01 Jan 1970 00:00:00 GMT')
+  0.0
+  >>> parse_retry_after('soon') is None
+  True
+  """
+  if not value:
+    return None
+
+  try:
+    return max(float(value), 0.0)
+  except ValueError:
+    ...
+
+  try:
+    return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+  except (TypeError, ValueError):
+    return None
+
+
+class RetryPolicy:
+  """
+  Which failed requests to send again and how long to wait first.
+
+  A request is retried when its method is idempotent, or when it goes to one of `urls`, which
+  only read. Streamed responses are retried only before their first chunk. Retried failures are
+  connection errors, responses with one of `statuses`, and errors whose message contains one of
+  `messages`, such as a server still loading the model.
+
+  The wait before attempt `n + 1` is drawn uniformly between 0 and `backoff * 2 ** (n - 1)`,
+  capped at `max_backoff`, so clients that failed together do not come back together. A
+  `Retry-After` header is honoured instead; a request is not retried if it asks for more than
+  `max_backoff`.
+
+  >>> policy = RetryPolicy(jitter=False)
+  >>> policy.retries('POST', '/api/chat'), policy.retries('POST', '/api/pull')
+  (True, False)
+  >>> policy.delay(2, ResponseError('server busy, please try again', 503))
+  1.0
+  >>> policy.delay(3, ResponseError('server busy, please try again', 503)) is None
+  True
+  >>> policy.delay(1, ResponseError('server busy, please try again', 503, retry_after=5))
+  5
+  >>> policy.delay(1, ResponseError('model not found', 404)) is None
+  True
+  """
+
+  def __init__(
+    self,
+    attempts: int = 3,
+    backoff: float = 0.5,
+    max_backoff: float = 30.0,
+    jitter: bool = True,
+    statuses: Sequence[int] = (429, 502, 503, 504),
+    messages: Sequence[str] = ('server busy', 'loading model', 'try again'),
+    methods: Sequence[str] = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'),
+    urls: Sequence[str] = ('/api/chat', '/api/generate', '/api/embed', '/api/embeddings', '/api/show'),
+  ) -> None:
+    self.attempts = attempts
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.jitter = jitter
+    self.statuses = statuses
+    self.messages = messages
+    self.methods = methods
+    self.urls = urls
+
+  def retries(self, method: str, url: str) -> bool:
+    return method in self.methods or url in self.urls
+
+  def retryable(self, error: BaseException) -> bool:
+    if isinstance(error, CircuitOpenError):
+      return False
+    if isinstance(error, _TRANSIENT_ERRORS):
+      return True
+    if isinstance(error, ResponseError):
+      message = str(error.error).lower()
+      return error.status_code in self.statuses or any(m in message for m in self.messages)
+    return False
+
+  def delay(self, attempt: int, error: BaseException) -> Optional[float]:
+    "Seconds to wait before the attempt after `attempt`, or None if the request should not be retried."
+    if attempt >= self.attempts or not self.retryable(error):
+      return None
+
+    if (retry_after := getattr(error, 'retry_after', None)) is not None:
+      return retry_after if retry_after <= self.max_backoff else None
+
+    cap = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+    return random.uniform(0, cap) if self.jitter else cap
+
+
+class _Circuit:
+  __slots__ = ('failures', 'opened', 'trial')
+
+  def __init__(self) -> None:
+    self.failures = 0
+    self.opened: Optional[float] = None
+    self.trial = False
+
+
+class CircuitBreaker:
+  """
+  Fails requests to a host fast once `failures` requests in a row met a connection error or a
+  server error. After `reset` seconds one request is let through: the circuit closes if it
+  succeeds and opens again if not. One breaker can be shared by several clients; each host has
+  its own circuit.
+
+  >>> breaker = CircuitBreaker(failures=1)
+  >>> breaker.failure('http://gpu-1:11434')
+  >>> breaker.state('http://gpu-1:11434'), breaker.state('http://gpu-2:11434')
+  ('open', 'closed')
+  """
+
+  def __init__(self, failures: int = 5, reset: float = 30.0) -> None:
+    self.failures = failures
+    self.reset = reset
+    self._circuits: Dict[str, _Circuit] = {}
+    self._lock = threading.Lock()
+
+  def _circuit(self, host: str) -> _Circuit:
+    if (circuit := self._circuits.get(host)) is None:
+      circuit = self._circuits[host] = _Circuit()
+    return circuit
+
+  def state(self, host: str) -> str:
+    with self._lock:
+      circuit = self._circuit(host)
+      if circuit.opened is None:
+        return 'closed'
+      return 'half_open' if circuit.trial or time.monotonic() - circuit.opened >= self.reset else 'open'
+
+  def check(self, host: str) -> None:
+    "Raises `CircuitOpenError` unless a request to `host` may go ahead."
+    with self._lock:
+      circuit = self._circuit(host)
+      if circuit.opened is None:
+        return
+
+      wait = circuit.opened + self.reset - time.monotonic()
+      if wait <= 0 and not circuit.trial:
+        circuit.trial = True
+        return
+
+    raise CircuitOpenError(f'circuit open for {host}', 503, retry_after=max(wait, 0.0))
+
+  def success(self, host: str) -> None:
+    with self._lock:
+      circuit = self._circuit(host)
+      circuit.failures, circuit.opened, circuit.trial = 0, None, False
+
+  def failure(self, host: str) -> None:
+    with self._lock:
+      circuit = self._circuit(host)
+      circuit.failures += 1
+      if circuit.trial or circuit.failures >= self.failures:
+        circuit.opened, circuit.trial = time.monotonic(), False
+
+  def release(self, host: str) -> None:
+    "Lets another request try a half-open circuit, when the last one ended without an outcome."
+    with self._lock:
+      self._circuit(host).trial = False
+
+  @contextmanager
+  def guard(self, host: str) -> Iterator[None]:
+    "Checks the circuit of `host`, then counts the request inside the block as a success or a failure."
+    self.check(host)
+    try:
+      yield
+    except (httpx.TransportError, ResponseError) as e:
+      if isinstance(e, httpx.TransportError) or e.status_code >= 500:
+        self.failure(host)
+      else:
+        self.success(host)
+      raise
+    except BaseException:
+      self.release(host)
+      raise
+    else:
+      self.success(host)
+
+  def stats(self) -> Dict[str, Any]:
+    return {host: self.state(host) for host in list(self._circuits)}
@@ -1,5 +1,6 @@
 import json
-from typing import Any, TypedDict, Sequence, Literal, Mapping
+from collections.abc import Mapping as MappingABC
+from typing import Any, Optional, TypedDict, Sequence, Literal, Mapping
 
 import sys
 
@@ -142,6 +143,126 @@ class ProgressResponse(TypedDict):
   digest: str
 
 
+def model_name(name: str) -> str:
+  """
+  Name of a model as `/api/ps` reports it, with the implicit `latest` tag.
+
+  >>> model_name('llama3')
+  'llama3:latest'
+  >>> model_name('llama3:8b')
+  'llama3:8b'
+  >>> model_name('localhost:5000/llama3')
+  'localhost:5000/llama3:latest'
+  """
+  return name if ':' in name.rpartition('/')[2] else f'{name}:latest'
+
+
+class Record(MappingABC):
+  """
+  Compact, read-only response object that stores fields in `__slots__` instead of a per-instance dict.
+
+  Records behave like the mappings returned by default: fields are read with `record['field']` or
+  `record.field`, fields missing from the response raise `KeyError` and `AttributeError` respectively,
+  and a record compares equal to a dict with the same items. Fields that are not declared are kept
+  in a small overflow dict so new server fields are never dropped.
+
+  >>> message = MessageRecord.from_mapping({'role': 'assistant', 'content': 'hi', 'extra': 1})
+  >>> message['content'], message.role, message['extra']
+  ('hi', 'assistant', 1)
+  >>> 'images' in message, message.get('images')
+  (False, None)
+  >>> message == {'role': 'assistant', 'content': 'hi', 'extra': 1}
+  True
+  >>> import pickle
+  >>> pickle.loads(pickle.dumps(message)) == message
+  True
+  """
+
+  __slots__ = ('_extra',)
+
+  @classmethod
+  def from_mapping(cls, data: Mapping[str, Any]):
+    record = cls.__new__(cls)
+    fields = cls._fields
+    extra = None
+    for key, value in data.items():
+      if key in fields:
+        object.__setattr__(record, key, value)
+      else:
+        if extra is None:
+          extra = {}
+        extra[key] = value
+
+    object.__setattr__(record, '_extra', extra)
+    return record
+
+  def __setattr__(self, key: str, value: Any) -> None:
+    raise AttributeError(f'{type(self).__name__} is read-only')
+
+  def __reduce__(self):
+    # Rebuilt through `from_mapping`, as `copy` and `pickle` would otherwise set the slots one by one
+    return type(self).from_mapping, (dict(self),)
+
+  def __getitem__(self, key: str) -> Any:
+    if key in self._fields:
+      try:
+        return getattr(self, key)
+      except AttributeError:
+        raise KeyError(key) from None
+
+    if self._extra is not None and key in self._extra:
+      return self._extra[key]
+    raise KeyError(key)
+
+  def __iter__(self):
+    for key in self.__slots__:
+      if hasattr(self, key):
+        yield key
+    if self._extra is not None:
+      yield from self._extra
+
+  def __len__(self) -> int:
+    return sum(1 for _ in self)
+
+  def __repr__(self) -> str:
+    return f'{type(self).__name__}({", ".join(f"{k}={v!r}" for k, v in self.items())})'
+
+
+class MessageRecord(Record):
+  "Slotted counterpart of `Message`."
+
+  _fields = frozenset(('role', 'content', 'images', 'tool_calls'))
+  __slots__ = tuple(sorted(_fields))
+
+
+class GenerateRecord(Record):
+  "Slotted counterpart of `GenerateResponse`."
+
+  _fields = frozenset(BaseGenerateResponse.__annotations__) | {'response', 'context'}
+  __slots__ = tuple(sorted(_fields))
+
+
+class ChatRecord(Record):
+  "Slotted counterpart of `ChatResponse`. The `message` field is a `MessageRecord`."
+
+  _fields = frozenset(BaseGenerateResponse.__annotations__) | {'message'}
+  __slots__ = tuple(sorted(_fields))
+
+  @classmethod
+  def from_mapping(cls, data: Mapping[str, Any]):
+    record = super().from_mapping(data)
+    if isinstance(message := data.get('message'), Mapping):
+      object.__setattr__(record, 'message', MessageRecord.from_mapping(message))
+    return record
+
+
+class ProgressRecord(Record):
+  "Slotted counterpart of `ProgressResponse`."
+
+  _fields = frozenset(ProgressResponse.__annotations__)
+  __slots__ = tuple(sorted(_fields))
+
+
 class Options(TypedDict, total=False):
   # load time options
   numa: bool
@@ -194,7 +315,7 @@ class ResponseError(Exception):
   Common class for response errors.
   """
 
-  def __init__(self, error: str, status_code: int = -1):
+  def __init__(self, error: str, status_code: int = -1, retry_after: Optional[float] = None):
     try:
       # try to parse content as JSON and extract 'error'
       # fallback to raw content if JSON parsing fails
@@ -208,3 +329,12 @@ class ResponseError(Exception):
 
     self.status_code = status_code
     'HTTP status code of the response.'
+
+    self.retry_after = retry_after
+    'Seconds the server asked to wait before retrying, from the `Retry-After` header.'
+
+
+class CircuitOpenError(ResponseError):
+  """
+  Raised without a request while the circuit breaker of a host is open.
+  """
@@ -1,5 +1,5 @@
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import ValidationError
 from ollama.new_clients.loggin_service import LoggingUtility
 
@@ -10,10 +10,10 @@ logging_utility = LoggingUtility()
 
 
 class AssistantService:
-    def __init__(self, base_url="http://localhost:9000/", api_key="api-key"):
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.Client] = None):
         self.base_url = base_url
         self.api_key = api_key
-        self.client = httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
+        self.client = client or httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
         logging_utility.info("AssistantService initialized with base_url: %s", self.base_url)
 
     def create_assistant(self, user_id: str, model: str, name: str = "", description: str = "", instructions: str = "",
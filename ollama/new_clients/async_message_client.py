@@ -0,0 +1,280 @@
+# new_clients/message_client.py
+from typing import List, Dict, Any, Optional
+
+import httpx
+from pydantic import ValidationError
+
+from api.v1.schemas import MessageCreate, MessageList, MessageRead, MessageUpdate, ThreadContext
+from ollama.new_clients.loggin_service import LoggingUtility
+
+
+# Initialize logging utility
+logging_utility = LoggingUtility()
+
+
+class AsyncMessageService:
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url.rstrip('/')  # Remove trailing slash if present
+        self.api_key = api_key
+        self.client = client or httpx.AsyncClient(base_url=self.base_url, headers={"Authorization": f"Bearer {api_key}"})
+        self.message_chunks: Dict[str, List[str]] = {}  # Temporary storage for message chunks
+        logging_utility.info("AsyncMessageService initialized with base_url: %s", self.base_url)
+
+    async def create_message(self, thread_id: str, content: str, sender_id: str, role: str = 'user',
+                       meta_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if meta_data is None:
+            meta_data = {}
+
+        message_data = {
+            "thread_id": thread_id,
+            "content": content,
+            "role": role,
+            "sender_id": sender_id,
+            "meta_data": meta_data
+        }
+
+        logging_utility.info("Creating message for thread_id: %s, role: %s", thread_id, role)
+        logging_utility.debug("Message data: %s", message_data)
+
+        try:
+            validated_data = MessageCreate(**message_data)  # Validate data using Pydantic model
+            url = "/v1/messages"
+            logging_utility.debug("Sending POST request to: %s%s", self.base_url, url)
+            logging_utility.debug("Request payload: %s", validated_data.model_dump())
+
+            response = await self.client.post(url, json=validated_data.model_dump())
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            created_message = response.json()
+            logging_utility.info("Message created successfully with id: %s", created_message.get('id'))
+            return created_message
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while creating message: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while creating message: %s", str(e))
+            raise
+
+    async def retrieve_message(self, message_id: str) -> MessageRead:
+        logging_utility.info("Retrieving message with id: %s", message_id)
+        try:
+            url = f"/v1/messages/{message_id}"
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
+
+            response = await self.client.get(url)
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            message = response.json()
+            validated_message = MessageRead(**message)  # Validate data using Pydantic model
+            logging_utility.info("Message retrieved successfully")
+            return validated_message
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while retrieving message: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while retrieving message: %s", str(e))
+            raise
+
+    async def update_message(self, message_id: str, **updates) -> MessageRead:
+        logging_utility.info("Updating message with id: %s", message_id)
+        logging_utility.debug("Update data: %s", updates)
+        try:
+            validated_data = MessageUpdate(**updates)  # Validate data using Pydantic model
+            url = f"/v1/messages/{message_id}"
+            logging_utility.debug("Sending PUT request to: %s%s", self.base_url, url)
+            logging_utility.debug("Request payload: %s", validated_data.model_dump(exclude_unset=True))
+
+            response = await self.client.put(url, json=validated_data.model_dump(exclude_unset=True))
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            updated_message = response.json()
+            validated_response = MessageRead(**updated_message)  # Validate response using Pydantic model
+            logging_utility.info("Message updated successfully")
+            return validated_response
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while updating message: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while updating message: %s", str(e))
+            raise
+
+    async def list_messages(self, thread_id: str, limit: int = 20, order: str = "asc",
+                            after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
+        logging_utility.info("Listing messages for thread_id: %s, limit: %d, order: %s", thread_id, limit, order)
+        params = {
+            "limit": limit,
+            "order": order
+        }
+        if after:
+            params["after"] = after
+        if before:
+            params["before"] = before
+        try:
+            url = f"/v1/threads/{thread_id}/messages"
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
+
+            response = await self.client.get(url, params=params)
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            page = MessageList(**response.json())  # Validate response using Pydantic model
+            logging_utility.info("Retrieved %d messages, has_more: %s", len(page.data), page.has_more)
+            return page.model_dump()  # Pass page.last_id as `after` to fetch the next page
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while listing messages: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while listing messages: %s", str(e))
+            raise
+
+    async def get_context(self, thread_id: str, max_tokens: int = 4096,
+                          system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """Newest messages of the thread that fit in `max_tokens`, built and cached by the server."""
+        logging_utility.info("Getting context for thread_id: %s, max_tokens: %d", thread_id, max_tokens)
+        params = {"max_tokens": max_tokens}
+        if system_prompt:
+            params["system_prompt"] = system_prompt
+        try:
+            url = f"/v1/threads/{thread_id}/context"
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
+
+            response = await self.client.get(url, params=params)
+            logging_utility.debug("Response status code: %s", response.status_code)
+
+            response.raise_for_status()
+            context = ThreadContext(**response.json())  # Validate response using Pydantic model
+            logging_utility.info("Retrieved %d context messages (%d tokens, truncated: %s)",
+                                 len(context.messages), context.token_count, context.truncated)
+            return context.model_dump()
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while getting context: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while getting context: %s", str(e))
+            raise
+
+    async def get_formatted_messages(self, thread_id: str, system_message: str = "") -> List[Dict[str, Any]]:
+        logging_utility.info("Getting formatted messages for thread_id: %s", thread_id)
+        logging_utility.info("Using system message: %s", system_message)
+        try:
+            url = f"/v1/threads/{thread_id}/formatted_messages"
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
+
+            response = await self.client.get(url)
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            formatted_messages = response.json()
+
+            if not isinstance(formatted_messages, list):
+                raise ValueError("Expected a list of messages")
+
+            logging_utility.debug("Initial formatted messages: %s", formatted_messages)
+
+            # Replace the system message if one already exists, otherwise insert it at the beginning
+            if formatted_messages and formatted_messages[0].get('role') == 'system':
+                formatted_messages[0]['content'] = system_message
+                logging_utility.debug("Replaced existing system message with: %s", system_message)
+            else:
+                formatted_messages.insert(0, {
+                    "role": "system",
+                    "content": system_message
+                })
+                logging_utility.debug("Inserted new system message: %s", system_message)
+
+            logging_utility.info("Formatted messages after insertion: %s", formatted_messages)
+            logging_utility.info("Retrieved %d formatted messages", len(formatted_messages))
+            return formatted_messages
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                logging_utility.error("Thread not found: %s", thread_id)
+                raise ValueError(f"Thread not found: {thread_id}") from e
+            else:
+                logging_utility.error("HTTP error occurred: %s", str(e))
+                logging_utility.error("Response content: %s", e.response.text)
+                raise RuntimeError(f"HTTP error occurred: {e}") from e
+        except Exception as e:
+            logging_utility.error("An error occurred: %s", str(e))
+            raise RuntimeError(f"An error occurred: {str(e)}") from e
+
+    async def delete_message(self, message_id: str) -> Dict[str, Any]:
+        logging_utility.info("Deleting message with id: %s", message_id)
+        try:
+            url = f"/v1/messages/{message_id}"
+            logging_utility.debug("Sending DELETE request to: %s%s", self.base_url, url)
+
+            response = await self.client.delete(url)
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            result = response.json()
+            logging_utility.info("Message deleted successfully")
+            return result
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while deleting message: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while deleting message: %s", str(e))
+            raise
+
+    async def save_assistant_message_chunk(self, thread_id: str, content: str, is_last_chunk: bool = False) -> Optional[Dict[str, Any]]:
+        logging_utility.info("Saving assistant message chunk for thread_id: %s, is_last_chunk: %s", thread_id, is_last_chunk)
+        message_data = {
+            "thread_id": thread_id,
+            "content": content,
+            "role": "assistant",
+            "sender_id": "assistant",
+            "meta_data": {}
+        }
+        logging_utility.debug("Message data: %s", message_data)
+
+        try:
+            url = "/v1/messages/assistant"
+            logging_utility.debug("Sending POST request to: %s%s", self.base_url, url)
+            logging_utility.debug("Request payload: %s", message_data)
+
+            response = await self.client.post(url, json=message_data)
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
+
+            response.raise_for_status()
+            saved_message = response.json()
+            logging_utility.info("Assistant message chunk saved successfully")
+            return saved_message
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while saving assistant message chunk: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            return None
+        except Exception as e:
+            logging_utility.error("An error occurred while saving assistant message chunk: %s", str(e))
+            return None
@@ -0,0 +1,131 @@
+# new_clients/async_ollama_client.py
+import json
+import os
+
+from dotenv import load_dotenv
+
+from ollama.new_clients.async_assistant_client import AsyncAssistantService
+from ollama.new_clients.async_message_client import AsyncMessageService
+from ollama.new_clients.async_run_client import AsyncRunService
+from ollama.new_clients.async_thread_client import AsyncThreadService
+from ollama.new_clients.async_user_client import AsyncUserService
+from ollama.new_clients.http_client import create_async_http_client
+from ollama import AsyncClient
+from ollama.new_clients.loggin_service import LoggingUtility
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Initialize logging utility
+logging_utility = LoggingUtility()
+
+
+class AsyncOllamaClient:
+    def __init__(self, base_url="http://localhost:9000/", api_key='your api key', max_connections=100,
+                 max_keepalive_connections=20, keepalive_expiry=30.0, http2=False):
+        self.base_url = base_url or os.getenv('ASSISTANTS_BASE_URL')
+        self.api_key = api_key or os.getenv('API_KEY')
+
+        # All services share one connection pool
+        self.http_client = create_async_http_client(self.base_url, self.api_key,
+                                                    max_connections=max_connections,
+                                                    max_keepalive_connections=max_keepalive_connections,
+                                                    keepalive_expiry=keepalive_expiry,
+                                                    http2=http2)
+        self.user_service = AsyncUserService(self.base_url, self.api_key, client=self.http_client)
+        self.assistant_service = AsyncAssistantService(self.base_url, self.api_key, client=self.http_client)
+        self.thread_service = AsyncThreadService(self.base_url, self.api_key, client=self.http_client)
+        self.message_service = AsyncMessageService(self.base_url, self.api_key, client=self.http_client)
+        self.run_service = AsyncRunService(self.base_url, self.api_key, client=self.http_client)
+        self.ollama_client = AsyncClient()
+        logging_utility.info("AsyncOllamaClient initialized with base_url: %s", self.base_url)
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def create_thread(self):
+        logging_utility.info("Creating new thread")
+        thread = await self.thread_service.create_thread(participant_ids=None, meta_data=None)
+        logging_utility.info("Thread created with ID: %s", thread['id'])
+        return thread
+
+    async def create_message(self, thread_id, content, role, sender_id):
+        logging_utility.info("Creating message for thread_id: %s, role: %s", thread_id, role)
+        message = await self.message_service.create_message(thread_id=thread_id, content=content, role=role,
+                                                            sender_id=sender_id)
+        logging_utility.info("Message created with ID: %s", message['id'])
+        return message
+
+    async def create_run(self, thread_id, assistant_id, instructions):
+        logging_utility.info("Creating run for thread_id: %s, assistant_id: %s", thread_id, assistant_id)
+        run = await self.run_service.create_run(assistant_id=assistant_id,
+                                                thread_id=thread_id,
+                                                instructions=instructions)
+        logging_utility.info("Run created with ID: %s", run['id'])
+        return run
+
+    async def streamed_response_helper(self, messages, thread_id, run_id, model='llama3.1:70b', num_ctx=4096):
+        logging_utility.info("Starting streamed response for thread_id: %s, run_id: %s, model: %s", thread_id, run_id, model)
+        try:
+            response = await self.ollama_client.chat(
+                model=model,
+                messages=messages,
+                options={'num_ctx': num_ctx},
+                stream=True
+            )
+
+            logging_utility.info("Response received from Ollama client")
+            full_response = ""
+            chunks = 0
+            async for chunk in response:
+                content = chunk['message']['content']
+                full_response += content
+                chunks += 1
+                yield content
+
+            logging_utility.info("Finished yielding %d chunks", chunks)
+            logging_utility.debug("Full response: %s", full_response)
+
+            saved_message = await self.message_service.save_assistant_message_chunk(thread_id, full_response,
+                                                                                    is_last_chunk=True)
+
+            if saved_message:
+                logging_utility.info("Assistant message saved successfully")
+            else:
+                logging_utility.warning("Failed to save assistant message")
+
+            updated_run = await self.run_service.update_run_status(run_id, "completed")
+            if updated_run:
+                logging_utility.info("Run status updated to completed for run_id: %s", run_id)
+            else:
+                logging_utility.warning("Failed to update run status for run_id: %s", run_id)
+
+        except Exception as e:
+            logging_utility.error("Error in streamed_response_helper: %s", str(e), exc_info=True)
+            yield json.dumps({"error": "An error occurred while generating the response"})
+
+        logging_utility.info("Exiting streamed_response_helper")
+
+    async def process_conversation(self, thread_id, run_id, assistant_id, model='llama3.1', num_ctx=4096,
+                                   response_tokens=1024):
+        logging_utility.info("Processing conversation for thread_id: %s, run_id: %s, model: %s", thread_id, run_id,
+                             model)
+
+        assistant = await self.assistant_service.retrieve_assistant(assistant_id=assistant_id)
+
+        logging_utility.info("Retrieved assistant: id=%s, name=%s, model=%s",
+                             assistant.id, assistant.name, assistant.model)
+
+        # The server trims the thread to the newest messages that leave `response_tokens` of the window free
+        context = await self.message_service.get_context(thread_id, max_tokens=num_ctx - response_tokens,
+                                                       system_prompt=assistant.instructions)
+        messages = context['messages']
+        logging_utility.debug("Context messages: %s", messages)
+        async for chunk in self.streamed_response_helper(messages, thread_id, run_id, model, num_ctx):
+            yield chunk
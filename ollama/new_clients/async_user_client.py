@@ -0,0 +1,90 @@
+import httpx
+from typing import Optional
+from ollama.new_clients.loggin_service import LoggingUtility
+from pydantic import ValidationError
+from api.v1.schemas import UserRead, UserCreate, UserUpdate, UserDeleteResponse
+
+# Initialize logging utility
+logging_utility = LoggingUtility()
+
+
+class AsyncUserService:
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.client = client or httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
+        logging_utility.info("AsyncUserService initialized with base_url: %s", self.base_url)
+
+    async def create_user(self, name: str) -> UserRead:
+        logging_utility.info("Creating user with name: %s", name)
+        user_data = UserCreate(name=name)
+        try:
+            response = await self.client.post("/v1/users", json=user_data.model_dump())
+            response.raise_for_status()
+            created_user = response.json()
+            validated_user = UserRead(**created_user)
+            logging_utility.info("User created successfully with id: %s", validated_user.id)
+            return validated_user
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while creating user: %s", str(e))
+            logging_utility.error("Status code: %d, Response text: %s", e.response.status_code, e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while creating user: %s", str(e))
+            raise
+
+    async def retrieve_user(self, user_id: str) -> UserRead:
+        logging_utility.info("Retrieving user with id: %s", user_id)
+        try:
+            response = await self.client.get(f"/v1/users/{user_id}")
+            response.raise_for_status()
+            user = response.json()
+            validated_user = UserRead(**user)
+            logging_utility.info("User retrieved successfully")
+            return validated_user
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while retrieving user: %s", str(e))
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while retrieving user: %s", str(e))
+            raise
+
+    async def update_user(self, user_id: str, **updates) -> UserRead:
+        logging_utility.info("Updating user with id: %s", user_id)
+        try:
+            current_user = await self.retrieve_user(user_id)
+            user_data = current_user.model_dump()
+            user_data.update(updates)
+
+            validated_data = UserUpdate(**user_data)  # Validate data using Pydantic model
+            response = await self.client.put(f"/v1/users/{user_id}", json=validated_data.model_dump(exclude_unset=True))
+            response.raise_for_status()
+            updated_user = response.json()
+            validated_response = UserRead(**updated_user)  # Validate response using Pydantic model
+            logging_utility.info("User updated successfully")
+            return validated_response
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while updating user: %s", str(e))
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while updating user: %s", str(e))
+            raise
+
+    async def delete_user(self, user_id: str) -> UserDeleteResponse:
+        logging_utility.info("Deleting user with id: %s", user_id)
+        try:
+            response = await self.client.delete(f"/v1/users/{user_id}")
+            response.raise_for_status()
+            result = response.json()
+            validated_result = UserDeleteResponse(**result)
+            logging_utility.info("User deleted successfully")
+            return validated_result
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while deleting user: %s", str(e))
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while deleting user: %s", str(e))
+            raise
@@ -0,0 +1,52 @@
+import httpx
+
+from ollama.new_clients.loggin_service import LoggingUtility
+
+# Initialize logging utility
+logging_utility = LoggingUtility()
+
+
+def create_http_client(base_url="http://localhost:9000/", api_key="api-key", max_connections=100,
+                       max_keepalive_connections=20, keepalive_expiry=30.0, http2=False, timeout=5.0) -> httpx.Client:
+    """
+    Build the httpx client shared by all assistants API services.
+
+    One client means one connection pool and one TLS session cache per SDK instance instead of one
+    per service. HTTP/2 multiplexes concurrent requests over a single connection and requires the
+    `h2` package; without it the client falls back to HTTP/1.1. `timeout` keeps httpx's default of
+    5 seconds, as the services had with their own clients.
+    """
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_keepalive_connections,
+                          keepalive_expiry=keepalive_expiry)
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    try:
+        client = httpx.Client(base_url=base_url, headers=headers, limits=limits, timeout=timeout, http2=http2)
+    except ImportError:
+        logging_utility.warning("HTTP/2 requested but the h2 package is not installed, falling back to HTTP/1.1")
+        client = httpx.Client(base_url=base_url, headers=headers, limits=limits, timeout=timeout)
+
+    logging_utility.info("HTTP client created for %s (max_connections=%d, keepalive=%d, http2=%s)",
+                         base_url, max_connections, max_keepalive_connections, http2)
+    return client
+
+
+def create_async_http_client(base_url="http://localhost:9000/", api_key="api-key", max_connections=100,
+                             max_keepalive_connections=20, keepalive_expiry=30.0, http2=False,
+                             timeout=5.0) -> httpx.AsyncClient:
+    """Async counterpart of `create_http_client`, shared by the async assistants API services."""
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_keepalive_connections,
+                          keepalive_expiry=keepalive_expiry)
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    try:
+        client = httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=timeout, http2=http2)
+    except ImportError:
+        logging_utility.warning("HTTP/2 requested but the h2 package is not installed, falling back to HTTP/1.1")
+        client = httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=timeout)
+
+    logging_utility.info("Async HTTP client created for %s (max_connections=%d, keepalive=%d, http2=%s)",
+                         base_url, max_connections, max_keepalive_connections, http2)
+    return client
@@ -1,29 +1,143 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from numbers import Number
+
+# Attributes every LogRecord has; anything else on a record was given with `extra=` and becomes a field
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def truncate(value: str, limit: int) -> str:
+    """Cut `value` to `limit` characters, saying how many were left out. A limit of 0 keeps everything."""
+    if limit <= 0 or len(value) <= limit:
+        return value
+    return f"{value[:limit]}... ({len(value) - limit} more characters)"
+
+
+def parse_levels(value: str) -> dict:
+    """Logger levels from `LOG_LEVELS`, e.g. `httpx=WARNING,sqlalchemy.engine=INFO`."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the time, level, logger, message, any exception and the `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Puts records on a queue for a `QueueListener` to format and write in its own thread. The message
+    is rendered here, as the objects in its arguments may change before the listener gets to them,
+    but arguments longer than `limit` characters are cut first so large payloads cost little.
+    Numbers and other short arguments reach the format string unchanged, so `%.2f` and `%r` still apply.
+    """
+
+    def __init__(self, handler_queue, limit: int = 2000):
+        super().__init__(handler_queue)
+        self.limit = limit
+
+    def shorten(self, arg):
+        if isinstance(arg, str):
+            return truncate(arg, self.limit)
+        if self.limit <= 0 or isinstance(arg, Number):
+            return arg
+        text = str(arg)
+        return truncate(text, self.limit) if len(text) > self.limit else arg
+
+    def prepare(self, record):
+        # Other handlers of the logger get the same record, so it is left as it was
+        record = copy.copy(record)
+        args = record.args
+        if args:
+            if isinstance(args, tuple):
+                args = tuple(self.shorten(arg) for arg in args)
+            record.msg = str(record.msg) % args
+        else:
+            record.msg = truncate(str(record.msg), self.limit)
+        record.args = None
+        return record
+
+
+_lock = threading.Lock()
+_queue_handler = None
+
+
+def configure_logging():
+    """
+    Starts the process-wide log writer on first use and returns the handler that feeds it. Settings
+    come from the environment:
+
+    - `LOG_LEVEL` (default `INFO`): level of the loggers using `LoggingUtility`.
+    - `LOG_LEVELS`: levels of other loggers, e.g. `httpx=WARNING,sqlalchemy.engine=INFO`.
+    - `LOG_FORMAT` (`json` or `text`, default `json`): one JSON object per line, or the plain format.
+    - `LOG_MAX_LENGTH` (default `2000`, `0` for no limit): characters kept of each message argument.
+    - `LOG_PROPAGATE` (default `true`): `false` stops records of the loggers using `LoggingUtility` from
+      also reaching the root logger's handlers, so an application that configures those does not print them twice.
+    """
+    global _queue_handler
+    with _lock:
+        if _queue_handler is None:
+            stream_handler = logging.StreamHandler(sys.stderr)
+            if os.getenv("LOG_FORMAT", "json").lower() == "text":
+                stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+            else:
+                stream_handler.setFormatter(JsonFormatter())
+
+            # Unbounded, so a slow stderr delays the listener rather than the code that logs
+            handler_queue = queue.SimpleQueue()
+            listener = QueueListener(handler_queue, stream_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+
+            for name, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+                logging.getLogger(name).setLevel(level)
+            _queue_handler = TruncatingQueueHandler(handler_queue, int(os.getenv("LOG_MAX_LENGTH", "2000")))
+    return _queue_handler
 
 
 class LoggingUtility:
-    def __init__(self, app=None):
+    def __init__(self, app=None, name=None):
         self.app = app
-        self.logger = logging.getLogger(__name__)
-        self.formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        self.logger = logging.getLogger(name or __name__)
+        self.handler = configure_logging()
 
-        # Configure console handler
-        self.console_handler = logging.StreamHandler()
-        self.console_handler.setLevel(logging.DEBUG)  # Capture all log levels for the console
-        self.console_handler.setFormatter(self.formatter)
+        # One handler per logger, however many modules create a LoggingUtility for it
+        if self.handler not in self.logger.handlers:
+            self.logger.addHandler(self.handler)
+            if os.getenv("LOG_PROPAGATE", "true").lower() in ("0", "false", "no"):
+                self.logger.propagate = False
+            if self.logger.level == logging.NOTSET:
+                self.logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
-        # Clear existing handlers
-        if not self.logger.handlers:
-            self.logger.addHandler(self.console_handler)
-
-        # Set the logger's level
-        self.logger.setLevel(logging.DEBUG)  # Set the logger to capture all log levels
-
-        # Set the handler attribute
-        self.handler = self.console_handler
-
-        # Set the level attribute
-        self.level = logging.DEBUG
+        self.level = self.logger.level
 
         if app is not None:
             self.init_app(app)
@@ -31,6 +145,8 @@ class LoggingUtility:
     def init_app(self, app):
         app.logger = self.logger
 
+    # Arguments are only formatted when the level is enabled, so pass them separately
+    # (`info("Run %s", run_id)`) rather than as an f-string
     def debug(self, message, *args, **kwargs):
         self.logger.debug(message, *args, **kwargs)
 
@@ -42,26 +158,13 @@ class LoggingUtility:
 
     def error(self, message, *args, **kwargs):
         self.logger.error(message, *args, **kwargs)
-        self.intercept_error_log(message, *args, **kwargs)
 
     def critical(self, message, *args, **kwargs):
         self.logger.critical(message, *args, **kwargs)
-        self.intercept_critical_log(message, *args, **kwargs)
 
     def exception(self, message, *args, **kwargs):
         self.logger.exception(message, *args, **kwargs)
 
-    def intercept_error_log(self, message, *args, **kwargs):
-        # Perform actions or send notifications for error logs
-        print("Intercepted Error Log:")
-        print(message % args)
-        # Add your custom logic here
-
-    def intercept_critical_log(self, message, *args, **kwargs):
-        # Perform actions or send notifications for critical logs
-        print("Intercepted Critical Log:")
-        print(message % args)
-
 
 if __name__ == "__main__":
     logging_utility = LoggingUtility()
@@ -4,7 +4,7 @@ from typing import List, Dict, Any, Optional
 import httpx
 from pydantic import ValidationError
 
-from api.v1.schemas import MessageCreate, MessageRead, MessageUpdate
+from api.v1.schemas import MessageCreate, MessageList, MessageRead, MessageUpdate, ThreadContext
 from ollama.new_clients.loggin_service import LoggingUtility
 
 
@@ -13,10 +13,10 @@ logging_utility = LoggingUtility()
 
 
 class MessageService:
-    def __init__(self, base_url="http://localhost:9000/", api_key="api-key"):
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.Client] = None):
         self.base_url = base_url.rstrip('/')  # Remove trailing slash if present
         self.api_key = api_key
-        self.client = httpx.Client(base_url=self.base_url, headers={"Authorization": f"Bearer {api_key}"})
+        self.client = client or httpx.Client(base_url=self.base_url, headers={"Authorization": f"Bearer {api_key}"})
         self.message_chunks: Dict[str, List[str]] = {}  # Temporary storage for message chunks
         logging_utility.info("MessageService initialized with base_url: %s", self.base_url)
 
@@ -34,17 +34,17 @@ class MessageService:
         }
 
         logging_utility.info("Creating message for thread_id: %s, role: %s", thread_id, role)
-        logging_utility.debug(f"Message data: {message_data}")
+        logging_utility.debug("Message data: %s", message_data)
 
         try:
             validated_data = MessageCreate(**message_data)  # Validate data using Pydantic model
             url = "/v1/messages"
-            logging_utility.debug(f"Sending POST request to: {self.base_url}{url}")
-            logging_utility.debug(f"Request payload: {validated_data.model_dump()}")
+            logging_utility.debug("Sending POST request to: %s%s", self.base_url, url)
+            logging_utility.debug("Request payload: %s", validated_data.model_dump())
 
             response = self.client.post(url, json=validated_data.model_dump())
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
             created_message = response.json()
@@ -55,7 +55,7 @@ class MessageService:
             raise ValueError(f"Validation error: {e}")
         except httpx.HTTPStatusError as e:
             logging_utility.error("HTTP error occurred while creating message: %s", str(e))
-            logging_utility.error(f"Response content: {e.response.text}")
+            logging_utility.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
             logging_utility.error("An error occurred while creating message: %s", str(e))
@@ -65,11 +65,11 @@ class MessageService:
         logging_utility.info("Retrieving message with id: %s", message_id)
         try:
             url = f"/v1/messages/{message_id}"
-            logging_utility.debug(f"Sending GET request to: {self.base_url}{url}")
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
 
             response = self.client.get(url)
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
             message = response.json()
@@ -81,7 +81,7 @@ class MessageService:
             raise ValueError(f"Validation error: {e}")
         except httpx.HTTPStatusError as e:
             logging_utility.error("HTTP error occurred while retrieving message: %s", str(e))
-            logging_utility.error(f"Response content: {e.response.text}")
+            logging_utility.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
             logging_utility.error("An error occurred while retrieving message: %s", str(e))
@@ -89,16 +89,16 @@ class MessageService:
 
     def update_message(self, message_id: str, **updates) -> MessageRead:
         logging_utility.info("Updating message with id: %s", message_id)
-        logging_utility.debug(f"Update data: {updates}")
+        logging_utility.debug("Update data: %s", updates)
         try:
             validated_data = MessageUpdate(**updates)  # Validate data using Pydantic model
             url = f"/v1/messages/{message_id}"
-            logging_utility.debug(f"Sending PUT request to: {self.base_url}{url}")
-            logging_utility.debug(f"Request payload: {validated_data.model_dump(exclude_unset=True)}")
+            logging_utility.debug("Sending PUT request to: %s%s", self.base_url, url)
+            logging_utility.debug("Request payload: %s", validated_data.model_dump(exclude_unset=True))
 
             response = self.client.put(url, json=validated_data.model_dump(exclude_unset=True))
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
             updated_message = response.json()
@@ -110,52 +110,86 @@ class MessageService:
             raise ValueError(f"Validation error: {e}")
         except httpx.HTTPStatusError as e:
             logging_utility.error("HTTP error occurred while updating message: %s", str(e))
-            logging_utility.error(f"Response content: {e.response.text}")
+            logging_utility.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
             logging_utility.error("An error occurred while updating message: %s", str(e))
             raise
 
-    def list_messages(self, thread_id: str, limit: int = 20, order: str = "asc") -> List[Dict[str, Any]]:
+    def list_messages(self, thread_id: str, limit: int = 20, order: str = "asc",
+                      after: Optional[str] = None, before: Optional[str] = None) -> Dict[str, Any]:
         logging_utility.info("Listing messages for thread_id: %s, limit: %d, order: %s", thread_id, limit, order)
         params = {
             "limit": limit,
             "order": order
         }
+        if after:
+            params["after"] = after
+        if before:
+            params["before"] = before
         try:
             url = f"/v1/threads/{thread_id}/messages"
-            logging_utility.debug(f"Sending GET request to: {self.base_url}{url}")
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
 
             response = self.client.get(url, params=params)
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
-            messages = response.json()
-            validated_messages = [MessageRead(**message) for message in messages]  # Validate response using Pydantic model
-            logging_utility.info("Retrieved %d messages", len(validated_messages))
-            return [message.model_dump() for message in validated_messages]  # Convert Pydantic models to dictionaries
+            page = MessageList(**response.json())  # Validate response using Pydantic model
+            logging_utility.info("Retrieved %d messages, has_more: %s", len(page.data), page.has_more)
+            return page.model_dump()  # Pass page.last_id as `after` to fetch the next page
         except ValidationError as e:
             logging_utility.error("Validation error: %s", e.json())
             raise ValueError(f"Validation error: {e}")
         except httpx.HTTPStatusError as e:
             logging_utility.error("HTTP error occurred while listing messages: %s", str(e))
-            logging_utility.error(f"Response content: {e.response.text}")
+            logging_utility.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
             logging_utility.error("An error occurred while listing messages: %s", str(e))
             raise
 
+    def get_context(self, thread_id: str, max_tokens: int = 4096,
+                    system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """Newest messages of the thread that fit in `max_tokens`, built and cached by the server."""
+        logging_utility.info("Getting context for thread_id: %s, max_tokens: %d", thread_id, max_tokens)
+        params = {"max_tokens": max_tokens}
+        if system_prompt:
+            params["system_prompt"] = system_prompt
+        try:
+            url = f"/v1/threads/{thread_id}/context"
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
+
+            response = self.client.get(url, params=params)
+            logging_utility.debug("Response status code: %s", response.status_code)
+
+            response.raise_for_status()
+            context = ThreadContext(**response.json())  # Validate response using Pydantic model
+            logging_utility.info("Retrieved %d context messages (%d tokens, truncated: %s)",
+                                 len(context.messages), context.token_count, context.truncated)
+            return context.model_dump()
+        except ValidationError as e:
+            logging_utility.error("Validation error: %s", e.json())
+            raise ValueError(f"Validation error: {e}") from e
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while getting context: %s", str(e))
+            logging_utility.error("Response content: %s", e.response.text)
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while getting context: %s", str(e))
+            raise
+
     def get_formatted_messages(self, thread_id: str, system_message: str = "") -> List[Dict[str, Any]]:
         logging_utility.info("Getting formatted messages for thread_id: %s", thread_id)
         logging_utility.info("Using system message: %s", system_message)
         try:
             url = f"/v1/threads/{thread_id}/formatted_messages"
-            logging_utility.debug(f"Sending GET request to: {self.base_url}{url}")
+            logging_utility.debug("Sending GET request to: %s%s", self.base_url, url)
 
             response = self.client.get(url)
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
             formatted_messages = response.json()
@@ -185,7 +219,7 @@ class MessageService:
                 raise ValueError(f"Thread not found: {thread_id}")
             else:
                 logging_utility.error("HTTP error occurred: %s", str(e))
-                logging_utility.error(f"Response content: {e.response.text}")
+                logging_utility.error("Response content: %s", e.response.text)
                 raise RuntimeError(f"HTTP error occurred: {e}")
         except Exception as e:
             logging_utility.error("An error occurred: %s", str(e))
@@ -195,11 +229,11 @@ class MessageService:
         logging_utility.info("Deleting message with id: %s", message_id)
         try:
             url = f"/v1/messages/{message_id}"
-            logging_utility.debug(f"Sending DELETE request to: {self.base_url}{url}")
+            logging_utility.debug("Sending DELETE request to: %s%s", self.base_url, url)
 
             response = self.client.delete(url)
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
             result = response.json()
@@ -207,7 +241,7 @@ class MessageService:
             return result
         except httpx.HTTPStatusError as e:
             logging_utility.error("HTTP error occurred while deleting message: %s", str(e))
-            logging_utility.error(f"Response content: {e.response.text}")
+            logging_utility.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
             logging_utility.error("An error occurred while deleting message: %s", str(e))
@@ -222,16 +256,16 @@ class MessageService:
             "sender_id": "assistant",
             "meta_data": {}
         }
-        logging_utility.debug(f"Message data: {message_data}")
+        logging_utility.debug("Message data: %s", message_data)
 
         try:
             url = "/v1/messages/assistant"
-            logging_utility.debug(f"Sending POST request to: {self.base_url}{url}")
-            logging_utility.debug(f"Request payload: {message_data}")
+            logging_utility.debug("Sending POST request to: %s%s", self.base_url, url)
+            logging_utility.debug("Request payload: %s", message_data)
 
             response = self.client.post(url, json=message_data)
-            logging_utility.debug(f"Response status code: {response.status_code}")
-            logging_utility.debug(f"Response content: {response.text}")
+            logging_utility.debug("Response status code: %s", response.status_code)
+            logging_utility.debug("Response content: %s", response.text)
 
             response.raise_for_status()
             saved_message = response.json()
@@ -239,7 +273,7 @@ class MessageService:
             return saved_message
         except httpx.HTTPStatusError as e:
             logging_utility.error("HTTP error occurred while saving assistant message chunk: %s", str(e))
-            logging_utility.error(f"Response content: {e.response.text}")
+            logging_utility.error("Response content: %s", e.response.text)
             return None
         except Exception as e:
             logging_utility.error("An error occurred while saving assistant message chunk: %s", str(e))
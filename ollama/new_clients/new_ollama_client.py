@@ -5,6 +5,7 @@ import os
 from dotenv import load_dotenv
 
 from ollama.new_clients.assistant_client import AssistantService
+from ollama.new_clients.http_client import create_http_client
 from ollama.new_clients.message_client import MessageService
 from ollama.new_clients.run_client import RunService
 from ollama.new_clients.thread_client import ThreadService
@@ -20,17 +21,34 @@ logging_utility = LoggingUtility()
 
 
 class OllamaClient:
-    def __init__(self, base_url="http://localhost:9000/", api_key='your api key'):
+    def __init__(self, base_url="http://localhost:9000/", api_key='your api key', max_connections=100,
+                 max_keepalive_connections=20, keepalive_expiry=30.0, http2=False):
         self.base_url = base_url or os.getenv('ASSISTANTS_BASE_URL')
         self.api_key = api_key or os.getenv('API_KEY')
-        self.user_service = UserService(self.base_url, self.api_key)
-        self.assistant_service = AssistantService(self.base_url, self.api_key)
-        self.thread_service = ThreadService(self.base_url, self.api_key)
-        self.message_service = MessageService(self.base_url, self.api_key)
-        self.run_service = RunService(self.base_url, self.api_key)
+
+        # All services share one connection pool
+        self.http_client = create_http_client(self.base_url, self.api_key,
+                                              max_connections=max_connections,
+                                              max_keepalive_connections=max_keepalive_connections,
+                                              keepalive_expiry=keepalive_expiry,
+                                              http2=http2)
+        self.user_service = UserService(self.base_url, self.api_key, client=self.http_client)
+        self.assistant_service = AssistantService(self.base_url, self.api_key, client=self.http_client)
+        self.thread_service = ThreadService(self.base_url, self.api_key, client=self.http_client)
+        self.message_service = MessageService(self.base_url, self.api_key, client=self.http_client)
+        self.run_service = RunService(self.base_url, self.api_key, client=self.http_client)
         self.ollama_client = Client()
         logging_utility.info("OllamaClient initialized with base_url: %s", self.base_url)
 
+    def close(self):
+        self.http_client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def create_thread(self):
         logging_utility.info("Creating new thread")
         thread = self.thread_service.create_thread(participant_ids=None, meta_data=None)
@@ -52,25 +70,26 @@ class OllamaClient:
         logging_utility.info("Run created with ID: %s", run['id'])
         return run
 
-    def streamed_response_helper(self, messages, thread_id, run_id, model='llama3.1:70b'):
+    def streamed_response_helper(self, messages, thread_id, run_id, model='llama3.1:70b', num_ctx=4096):
         logging_utility.info("Starting streamed response for thread_id: %s, run_id: %s, model: %s", thread_id, run_id, model)
         try:
             response = self.ollama_client.chat(
                 model=model,
                 messages=messages,
-                options={'num_ctx': 4096},
+                options={'num_ctx': num_ctx},
                 stream=True
             )
 
             logging_utility.info("Response received from Ollama client")
             full_response = ""
+            chunks = 0
             for chunk in response:
                 content = chunk['message']['content']
                 full_response += content
-                logging_utility.debug("Received chunk: %s", content)
+                chunks += 1
                 yield content
 
-            logging_utility.info("Finished yielding all chunks")
+            logging_utility.info("Finished yielding %d chunks", chunks)
             logging_utility.debug("Full response: %s", full_response)
 
             saved_message = self.message_service.save_assistant_message_chunk(thread_id, full_response,
@@ -93,7 +112,8 @@ class OllamaClient:
 
         logging_utility.info("Exiting streamed_response_helper")
 
-    def process_conversation(self, thread_id, run_id, assistant_id, model='llama3.1'):
+    def process_conversation(self, thread_id, run_id, assistant_id, model='llama3.1', num_ctx=4096,
+                             response_tokens=1024):
         logging_utility.info("Processing conversation for thread_id: %s, run_id: %s, model: %s", thread_id, run_id,
                              model)
 
@@ -102,9 +122,12 @@ class OllamaClient:
         logging_utility.info("Retrieved assistant: id=%s, name=%s, model=%s",
                              assistant.id, assistant.name, assistant.model)
 
-        messages = self.message_service.get_formatted_messages(thread_id, system_message=assistant.instructions)
-        logging_utility.debug("Formatted messages: %s", messages)
-        return self.streamed_response_helper(messages, thread_id, run_id, model)
+        # The server trims the thread to the newest messages that leave `response_tokens` of the window free
+        context = self.message_service.get_context(thread_id, max_tokens=num_ctx - response_tokens,
+                                                 system_prompt=assistant.instructions)
+        messages = context['messages']
+        logging_utility.debug("Context messages: %s", messages)
+        return self.streamed_response_helper(messages, thread_id, run_id, model, num_ctx)
 
 
 if __name__ == "__main__":
@@ -58,7 +58,7 @@ class Client(BaseClient):
         super().__init__(httpx.Client, host, **kwargs)
 
     def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
-        logging_utility.info("Sending request: %s %s", method, url)
+        logging_utility.debug("Sending request: %s %s", method, url)
         response = self._client.request(method, url, **kwargs)
 
         try:
@@ -67,11 +67,11 @@ class Client(BaseClient):
             logging_utility.error("HTTPStatusError: %s", e)
             raise ResponseError(e.response.text, e.response.status_code) from None
 
-        logging_utility.info("Received response: %s", response.text)
+        logging_utility.debug("Received response: %s %s, %d bytes", response.status_code, url, len(response.content))
         return response
 
     def _stream(self, method: str, url: str, **kwargs) -> Iterator[Mapping[str, Any]]:
-        logging_utility.info("Starting stream: %s %s", method, url)
+        logging_utility.debug("Starting stream: %s %s", method, url)
         with self._client.stream(method, url, **kwargs) as r:
             try:
                 r.raise_for_status()
@@ -1,6 +1,7 @@
 import httpx
+import json
 import time
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from pydantic import ValidationError
 from services.identifier_service import IdentifierService
 from ollama.new_clients.loggin_service import LoggingUtility
@@ -10,11 +11,30 @@ from api.v1.schemas import Run, RunStatusUpdate  # Import the relevant Pydantic
 logging_utility = LoggingUtility()
 
 
+class SSEParser:
+    """Incremental Server-Sent Events parser: feed it response lines, it returns (event, data) per complete event."""
+
+    def __init__(self):
+        self.event = "message"
+        self.data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        if line.startswith("event:"):
+            self.event = line[6:].strip()
+        elif line.startswith("data:"):
+            self.data.append(line[5:].strip())
+        elif not line and self.data:
+            event, data = self.event, json.loads("\n".join(self.data))
+            self.event, self.data = "message", []
+            return event, data
+        return None
+
+
 class RunService:
-    def __init__(self, base_url="http://localhost:9000/", api_key="api-key"):
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.Client] = None):
         self.base_url = base_url
         self.api_key = api_key
-        self.client = httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
+        self.client = client or httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
         logging_utility.info("RunService initialized with base_url: %s", self.base_url)
 
     def create_run(self, assistant_id: str, thread_id: str, instructions: Optional[str] = "",
@@ -199,3 +219,40 @@ class RunService:
         except Exception as e:
             logging_utility.error("An error occurred during chat: %s", str(e))
             raise
+
+    def stream_run(self, thread_id: str, run_id: str, model: Optional[str] = None, num_ctx: int = 4096,
+                   response_tokens: int = 1024, options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Execute the run on the server and yield the reply as it is generated. The server stores the
+        assistant message and the run status itself once the stream ends.
+        """
+        logging_utility.info("Streaming run_id: %s for thread_id: %s", run_id, thread_id)
+        payload = {
+            "model": model,
+            "num_ctx": num_ctx,
+            "response_tokens": response_tokens,
+            "options": options or {}
+        }
+        parser = SSEParser()
+        try:
+            # No read timeout: the first token can take as long as the model takes to load
+            with self.client.stream("POST", f"/v1/threads/{thread_id}/runs/{run_id}/stream",
+                                    json=payload, timeout=httpx.Timeout(10.0, read=None)) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    parsed = parser.feed(line)
+                    if parsed is None:
+                        continue
+                    event, data = parsed
+                    if event == "message.delta":
+                        yield data["content"]
+                    elif event == "run.completed":
+                        logging_utility.info("Run %s completed with message id: %s", run_id, data.get("message_id"))
+                    elif event == "run.failed":
+                        raise RuntimeError(f"Run {run_id} failed: {data.get('error')}")
+        except httpx.HTTPStatusError as e:
+            logging_utility.error("HTTP error occurred while streaming run: %s", str(e))
+            raise
+        except Exception as e:
+            logging_utility.error("An error occurred while streaming run: %s", str(e))
+            raise
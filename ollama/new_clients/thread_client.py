@@ -11,10 +11,10 @@ logging_utility = LoggingUtility()
 
 
 class ThreadService:
-    def __init__(self, base_url="http://localhost:9000/", api_key="api-key"):
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.Client] = None):
         self.base_url = base_url
         self.api_key = api_key
-        self.client = httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
+        self.client = client or httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
         logging_utility.info("ThreadService initialized with base_url: %s", self.base_url)
 
     def create_user(self, name: str) -> UserRead:
@@ -1,4 +1,5 @@
 import httpx
+from typing import Optional
 from ollama.new_clients.loggin_service import LoggingUtility
 from pydantic import ValidationError
 from api.v1.schemas import UserRead, UserCreate, UserUpdate, UserDeleteResponse
@@ -8,10 +9,10 @@ logging_utility = LoggingUtility()
 
 
 class UserService:
-    def __init__(self, base_url="http://localhost:9000/", api_key="api-key"):
+    def __init__(self, base_url="http://localhost:9000/", api_key="api-key", client: Optional[httpx.Client] = None):
         self.base_url = base_url
         self.api_key = api_key
-        self.client = httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
+        self.client = client or httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {api_key}"})
         logging_utility.info("UserService initialized with base_url: %s", self.base_url)
 
     def create_user(self, name: str) -> UserRead:
@@ -1,12 +1,14 @@
 from http.client import HTTPException
 from sqlalchemy.orm import Session
 from models.models import Assistant, User
+from api.metrics import instrument_service
 from api.v1.schemas import AssistantCreate, AssistantRead, AssistantUpdate
 from services.identifier_service import IdentifierService
 import json
 import time
 
 
+@instrument_service
 class AssistantService:
     def __init__(self, db: Session):
         self.db = db
@@ -0,0 +1,76 @@
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Assistant, User
+from api.metrics import instrument_service
+from api.v1.schemas import AssistantCreate, AssistantRead, AssistantUpdate
+from services.identifier_service import IdentifierService
+import json
+import time
+
+
+@instrument_service
+class AsyncAssistantService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _get_db_assistant(self, assistant_id: str) -> Assistant:
+        result = await self.db.execute(select(Assistant).where(Assistant.id == assistant_id))
+        db_assistant = result.scalars().first()
+        if not db_assistant:
+            raise HTTPException(status_code=404, detail="Assistant not found")
+        return db_assistant
+
+    async def create_assistant(self, assistant: AssistantCreate) -> AssistantRead:
+        # Check if the user exists
+        result = await self.db.execute(select(User.id).where(User.id == assistant.user_id))
+        if result.first() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        assistant_id = IdentifierService.generate_assistant_id()
+        tools_json = json.dumps([tool.dict(exclude_unset=True) for tool in assistant.tools])  # Convert list of Tool objects to JSON
+        db_assistant = Assistant(
+            id=assistant_id,
+            user_id=assistant.user_id,
+            object="assistant",  # Set the object field
+            created_at=int(time.time()),
+            name=assistant.name,
+            description=assistant.description,
+            model=assistant.model,
+            instructions=assistant.instructions,
+            tools=tools_json,  # Store JSON string
+            meta_data=json.dumps(assistant.meta_data),  # Convert dict to JSON string
+            top_p=assistant.top_p,
+            temperature=assistant.temperature,
+            response_format=assistant.response_format
+        )
+        self.db.add(db_assistant)
+        await self.db.commit()
+
+        return self._to_assistant_read(db_assistant)
+
+    async def get_assistant(self, assistant_id: str) -> AssistantRead:
+        return self._to_assistant_read(await self._get_db_assistant(assistant_id))
+
+    async def update_assistant(self, assistant_id: str, assistant_update: AssistantUpdate) -> AssistantRead:
+        db_assistant = await self._get_db_assistant(assistant_id)
+
+        update_data = assistant_update.dict(exclude_unset=True)
+        if 'tools' in update_data:
+            update_data['tools'] = json.dumps([tool.dict(exclude_unset=True) for tool in assistant_update.tools])
+        if 'meta_data' in update_data:
+            update_data['meta_data'] = json.dumps(assistant_update.meta_data)
+
+        for key, value in update_data.items():
+            setattr(db_assistant, key, value)
+
+        await self.db.commit()
+
+        return self._to_assistant_read(db_assistant)
+
+    def _to_assistant_read(self, db_assistant: Assistant) -> AssistantRead:
+        """Convert JSON fields back to their original types without touching the ORM object."""
+        data = {column.name: getattr(db_assistant, column.name) for column in Assistant.__table__.columns}
+        data['tools'] = json.loads(db_assistant.tools)
+        data['meta_data'] = json.loads(db_assistant.meta_data)
+        return AssistantRead(**data)
@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Thread
+from api.metrics import instrument_service
+from api.v1.schemas import ThreadContext
+from services.context_builder import (
+    CONTEXT_BATCH_SIZE, ThreadWindow, appended_messages_query, build_context, context_cache, estimate_tokens,
+    message_budget, newest_messages_query
+)
+
+
+@instrument_service
+class AsyncContextService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _load_window(self, thread_id: str, budget: int) -> ThreadWindow:
+        rows, tokens, before, exhausted = [], 0, None, False
+        while True:
+            batch = (await self.db.execute(newest_messages_query(thread_id, before))).all()
+            rows.extend(batch)
+            tokens += sum(estimate_tokens(row.content) for row in batch)
+            if len(batch) < CONTEXT_BATCH_SIZE:
+                exhausted = True
+                break
+            if tokens > budget:
+                break
+            before = (batch[-1].created_at, batch[-1].id)
+        return ThreadWindow.from_newest(rows, budget, exhausted)
+
+    async def get_context(self, thread_id: str, max_tokens: int, system_prompt: Optional[str] = None) -> ThreadContext:
+        result = await self.db.execute(select(Thread.id).where(Thread.id == thread_id))
+        if result.first() is None:
+            raise HTTPException(status_code=404, detail="Thread not found")
+
+        budget = message_budget(max_tokens, system_prompt)
+        if budget <= 0:
+            raise HTTPException(status_code=400, detail="System prompt does not fit in max_tokens")
+
+        window = context_cache.get(thread_id)
+        if window is None or not window.covers(budget):
+            window = await self._load_window(thread_id, budget)
+            context_cache.put(thread_id, window)
+        else:
+            rows = (await self.db.execute(appended_messages_query(thread_id, window.newest))).all()
+            context_cache.append(window, rows, budget)
+
+        messages, tokens, truncated = context_cache.select(window, budget)
+        return ThreadContext(**build_context(messages, tokens, truncated, thread_id, system_prompt))
@@ -0,0 +1,169 @@
+from typing import List, Optional, Dict, Any, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Message, Thread, User
+from api.metrics import instrument_service
+from api.v1.schemas import MessageCreate, MessageList, MessageRead
+from services.identifier_service import IdentifierService
+from services.pagination import keyset_page, to_message_list
+import json
+import time
+
+
+def to_message_read(db_message: Message) -> MessageRead:
+    return MessageRead(
+        id=db_message.id,
+        assistant_id=db_message.assistant_id,
+        attachments=db_message.attachments,
+        completed_at=db_message.completed_at,
+        content=db_message.content,
+        created_at=db_message.created_at,
+        incomplete_at=db_message.incomplete_at,
+        incomplete_details=db_message.incomplete_details,
+        meta_data=json.loads(db_message.meta_data),
+        object=db_message.object,
+        role=db_message.role,
+        run_id=db_message.run_id,
+        status=db_message.status,
+        thread_id=db_message.thread_id,
+        sender_id=db_message.sender_id
+    )
+
+
+@instrument_service
+class AsyncMessageService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.message_chunks: Dict[str, List[str]] = {}  # Temporary storage for message chunks
+
+    async def _ensure_thread(self, thread_id: str) -> None:
+        result = await self.db.execute(select(Thread.id).where(Thread.id == thread_id))
+        if result.first() is None:
+            raise HTTPException(status_code=404, detail="Thread not found")
+
+    async def create_message(self, message: MessageCreate) -> MessageRead:
+        # Check if thread exists
+        await self._ensure_thread(message.thread_id)
+
+        # Check if sender exists
+        result = await self.db.execute(select(User.id).where(User.id == message.sender_id))
+        if result.first() is None:
+            raise HTTPException(status_code=404, detail="Sender not found")
+
+        db_message = Message(
+            id=IdentifierService.generate_message_id(),
+            assistant_id=None,
+            attachments=[],
+            completed_at=None,
+            content=message.content,
+            created_at=int(time.time()),
+            incomplete_at=None,
+            incomplete_details=None,
+            meta_data=json.dumps(message.meta_data),
+            object="message",
+            role=message.role,
+            run_id=None,
+            status=None,
+            thread_id=message.thread_id,
+            sender_id=message.sender_id
+        )
+
+        self.db.add(db_message)
+        await self.db.commit()
+        return to_message_read(db_message)
+
+    async def retrieve_message(self, message_id: str) -> MessageRead:
+        result = await self.db.execute(select(Message).where(Message.id == message_id))
+        db_message = result.scalars().first()
+        if not db_message:
+            raise HTTPException(status_code=404, detail="Message not found")
+
+        return to_message_read(db_message)
+
+    async def _get_cursor(self, thread_id: str, message_id: str) -> Tuple[int, str]:
+        result = await self.db.execute(
+            select(Message.created_at, Message.id).where(Message.thread_id == thread_id, Message.id == message_id)
+        )
+        cursor = result.first()
+        if not cursor:
+            raise HTTPException(status_code=400, detail=f"Cursor message {message_id} not found in thread")
+        return tuple(cursor)
+
+    async def list_messages(self, thread_id: str, limit: int = 20, order: str = "asc",
+                            after: Optional[str] = None, before: Optional[str] = None) -> MessageList:
+        if after and before:
+            raise HTTPException(status_code=400, detail="Only one of 'after' or 'before' may be given")
+
+        await self._ensure_thread(thread_id)
+
+        cursor_id = after or before
+        cursor = await self._get_cursor(thread_id, cursor_id) if cursor_id else None
+
+        query = select(Message).where(Message.thread_id == thread_id)
+        result = await self.db.execute(keyset_page(query, cursor, limit, order, before=bool(before)))
+        messages = [to_message_read(db_message) for db_message in result.scalars().all()]
+        return to_message_list(messages, limit, before=bool(before))
+
+    async def save_assistant_message_chunk(self, thread_id: str, content: str, is_last_chunk: bool = False) -> Optional[MessageRead]:
+        if thread_id not in self.message_chunks:
+            self.message_chunks[thread_id] = []
+
+        self.message_chunks[thread_id].append(content)
+
+        if not is_last_chunk:
+            return None
+
+        complete_message = ''.join(self.message_chunks[thread_id])
+        del self.message_chunks[thread_id]
+
+        await self._ensure_thread(thread_id)
+
+        assistant_id = "assistant_id"  # Set a proper assistant ID
+        sender_id = "assistant"  # Set a fixed sender ID for the assistant
+
+        db_message = Message(
+            id=IdentifierService.generate_message_id(),
+            assistant_id=assistant_id,
+            attachments=[],
+            completed_at=int(time.time()),
+            content=complete_message,
+            created_at=int(time.time()),
+            incomplete_at=None,
+            incomplete_details=None,
+            meta_data=json.dumps({}),
+            object="message",
+            role="assistant",
+            run_id=None,
+            status=None,
+            thread_id=thread_id,
+            sender_id=sender_id
+        )
+
+        self.db.add(db_message)
+        await self.db.commit()
+        return to_message_read(db_message)
+
+    async def list_messages_for_thread(self, thread_id: str) -> List[Dict[str, Any]]:
+        await self._ensure_thread(thread_id)
+
+        result = await self.db.execute(
+            select(Message.role, Message.content)
+            .where(Message.thread_id == thread_id)
+            .order_by(Message.created_at.asc(), Message.id.asc())
+        )
+
+        formatted_messages = [
+            {
+                "role": "system",
+                "content": "Your name is Prime"
+            }
+        ]
+
+        for role, content in result.all():
+            formatted_messages.append({
+                "role": role,
+                "content": content
+            })
+
+        return formatted_messages
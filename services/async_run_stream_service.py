@@ -0,0 +1,61 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Assistant, Run
+from api.metrics import instrument_service
+from api.v1.schemas import RunStreamRequest
+from db.database import AsyncSessionLocal
+from services.async_context_service import AsyncContextService
+from services.run_stream_service import (
+    apply_run_outcome, build_assistant_message, check_streamable, run_instructions, run_model, stream_run_events
+)
+
+
+@instrument_service
+class AsyncRunStreamService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def prepare(self, thread_id: str, run_id: str, stream_request: RunStreamRequest) -> Tuple[str, List[Dict[str, Any]]]:
+        # Locked until the commit below, so two requests cannot both start the run
+        result = await self.db.execute(select(Run).where(Run.id == run_id).with_for_update())
+        db_run = result.scalars().first()
+        if not db_run or db_run.thread_id != thread_id:
+            raise HTTPException(status_code=404, detail="Run not found")
+        check_streamable(db_run)
+
+        result = await self.db.execute(select(Assistant).where(Assistant.id == db_run.assistant_id))
+        assistant = result.scalars().first()
+        context = await AsyncContextService(self.db).get_context(
+            thread_id,
+            max_tokens=stream_request.num_ctx - stream_request.response_tokens,
+            system_prompt=run_instructions(db_run, assistant)
+        )
+        model = run_model(db_run, assistant, stream_request)
+
+        db_run.status = "in_progress"
+        await self.db.commit()
+        return model, context.messages
+
+    async def _persist(self, run_id: str, content: str, usage: Optional[Dict[str, int]], error: Optional[str],
+                       cancelled: bool = False) -> Optional[str]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Run).where(Run.id == run_id))
+            db_run = result.scalars().first()
+            message_id = None
+            if not error and not cancelled:
+                db_message = build_assistant_message(db_run, content)
+                db.add(db_message)
+                message_id = db_message.id
+            apply_run_outcome(db_run, usage, error, cancelled)
+            await db.commit()
+            return message_id
+
+    def stream_run(self, run_id: str, model: str, messages: List[Dict[str, Any]],
+                   stream_request: RunStreamRequest) -> AsyncIterator[str]:
+        async def persist(content, usage, error, cancelled=False):
+            return await self._persist(run_id, content, usage, error, cancelled)
+
+        options = {**stream_request.options, "num_ctx": stream_request.num_ctx}
+        return stream_run_events(run_id, model, messages, options, persist)
@@ -0,0 +1,80 @@
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from models.models import Thread, User, Message
+from api.metrics import instrument_service
+from api.v1.schemas import ThreadCreate, ThreadReadDetailed, UserBase
+from services.context_builder import context_cache
+from services.identifier_service import IdentifierService
+import json
+import time
+from typing import List
+
+
+@instrument_service
+class AsyncThreadService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _get_db_thread(self, thread_id: str) -> Thread:
+        # Participants are loaded up front because lazy loading is unavailable on an AsyncSession
+        result = await self.db.execute(
+            select(Thread).options(selectinload(Thread.participants)).where(Thread.id == thread_id)
+        )
+        db_thread = result.scalars().first()
+        if not db_thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        return db_thread
+
+    def _to_thread_read(self, db_thread: Thread, participants: List[User]) -> ThreadReadDetailed:
+        return ThreadReadDetailed(
+            id=db_thread.id,
+            created_at=db_thread.created_at,
+            meta_data=json.loads(db_thread.meta_data),  # Convert JSON string back to dict
+            object=db_thread.object,
+            tool_resources=json.loads(db_thread.tool_resources),  # Convert JSON string back to dict
+            participants=[UserBase.from_orm(user) for user in participants]  # Include participants in the response
+        )
+
+    async def create_thread(self, thread: ThreadCreate) -> ThreadReadDetailed:
+        # Check if all users exist
+        result = await self.db.execute(select(User).where(User.id.in_(thread.participant_ids)))
+        existing_users = result.scalars().all()
+        if len(existing_users) != len(thread.participant_ids):
+            raise HTTPException(status_code=400, detail="Invalid user IDs")
+
+        db_thread = Thread(
+            id=IdentifierService.generate_thread_id(),
+            created_at=int(time.time()),
+            meta_data=json.dumps(thread.meta_data),  # Convert dict to JSON string
+            object="thread",  # Set object_type
+            tool_resources=json.dumps({}),  # Initialize tool_resources as JSON string
+            participants=list(existing_users)
+        )
+        self.db.add(db_thread)
+        await self.db.commit()
+
+        return self._to_thread_read(db_thread, existing_users)
+
+    async def get_thread(self, thread_id: str) -> ThreadReadDetailed:
+        db_thread = await self._get_db_thread(thread_id)
+        return self._to_thread_read(db_thread, db_thread.participants)
+
+    async def delete_thread(self, thread_id: str) -> None:
+        db_thread = await self._get_db_thread(thread_id)
+
+        # Remove all messages associated with the thread
+        await self.db.execute(delete(Message).where(Message.thread_id == thread_id))
+
+        # Remove relationships with participants
+        db_thread.participants = []
+
+        # Delete the thread itself
+        await self.db.delete(db_thread)
+        await self.db.commit()
+        context_cache.invalidate(thread_id)
+
+    async def list_threads_by_user(self, user_id: str) -> List[str]:
+        result = await self.db.execute(select(Thread.id).join(Thread.participants).where(User.id == user_id))
+        return list(result.scalars().all())
@@ -0,0 +1,64 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import User
+from api.metrics import instrument_service
+from api.v1.schemas import UserCreate, UserRead, UserUpdate
+from services.identifier_service import IdentifierService
+from typing import List
+from fastapi import HTTPException
+
+
+@instrument_service
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _get_db_user(self, user_id: str) -> User:
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        db_user = result.scalars().first()
+        if not db_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return db_user
+
+    async def create_user(self, user: UserCreate = None) -> UserRead:
+        if user is None:
+            user = UserCreate()
+
+        new_user = User(
+            id=IdentifierService.generate_user_id(),
+            name=user.name
+        )
+        self.db.add(new_user)
+        await self.db.commit()
+        return UserRead.from_orm(new_user)
+
+    async def get_user(self, user_id: str) -> UserRead:
+        return UserRead.from_orm(await self._get_db_user(user_id))
+
+    async def get_users(self) -> List[UserRead]:
+        result = await self.db.execute(select(User))
+        return [UserRead.from_orm(user) for user in result.scalars().all()]
+
+    async def update_user(self, user_id: str, user_update: UserUpdate) -> UserRead:
+        db_user = await self._get_db_user(user_id)
+
+        update_data = user_update.dict(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_user, key, value)
+
+        await self.db.commit()
+        return UserRead.from_orm(db_user)
+
+    async def delete_user(self, user_id: str) -> None:
+        db_user = await self._get_db_user(user_id)
+        await self.db.delete(db_user)
+        await self.db.commit()
+
+    async def get_or_create_user(self, user_id: str = None) -> UserRead:
+        if user_id:
+            try:
+                return await self.get_user(user_id)
+            except HTTPException:
+                pass
+
+        return await self.create_user()
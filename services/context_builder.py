@@ -0,0 +1,174 @@
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from models.models import Message
+import threading
+
+# Messages read per query while walking a thread backwards from its newest message
+CONTEXT_BATCH_SIZE = 64
+
+# Rough per-message overhead of the chat template (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count without loading a tokenizer: about four characters per token for
+    English text, which errs on the side of leaving headroom in `num_ctx`.
+    """
+    return len(text) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+
+def newest_messages_query(thread_id: str, before: Optional[Tuple[int, str]] = None, limit: int = CONTEXT_BATCH_SIZE):
+    """Newest-first batch of a thread's messages, older than `before` if given."""
+    query = select(Message.created_at, Message.id, Message.role, Message.content).where(Message.thread_id == thread_id)
+    if before is not None:
+        query = query.where(or_(
+            Message.created_at < before[0],
+            and_(Message.created_at == before[0], Message.id < before[1])
+        ))
+    return query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+
+
+def appended_messages_query(thread_id: str, after: Optional[Tuple[int, str]]):
+    """
+    Messages added to a thread since `after` (all of them if None), oldest first.
+
+    Message ids are random, so a message created within the same second as `after` may sort before
+    it; the whole of that second is read again and merged by `ThreadWindow.append`.
+    """
+    query = select(Message.created_at, Message.id, Message.role, Message.content).where(Message.thread_id == thread_id)
+    if after is not None:
+        query = query.where(Message.created_at >= after[0])
+    return query.order_by(Message.created_at.asc(), Message.id.asc())
+
+
+class ThreadWindow:
+    """
+    The newest messages of one thread that fit in `budget` tokens, oldest first.
+
+    `complete` is True when the window reaches back to the first message of the thread, in which
+    case any larger budget can be served from it as well.
+    """
+    __slots__ = ("entries", "tokens", "budget", "complete", "newest")
+
+    def __init__(self, budget: int):
+        self.entries = deque()  # (key, role, content, tokens)
+        self.tokens = 0
+        self.budget = budget
+        self.complete = False
+        self.newest: Optional[Tuple[int, str]] = None
+
+    @classmethod
+    def from_newest(cls, rows: Iterable[Tuple[int, str, str, str]], budget: int, exhausted: bool) -> "ThreadWindow":
+        """Build a window from newest-first rows; stops at the first message that no longer fits."""
+        window = cls(budget)
+        window.complete = exhausted
+        for created_at, message_id, role, content in rows:
+            if window.newest is None:
+                window.newest = (created_at, message_id)
+            tokens = estimate_tokens(content)
+            if window.tokens + tokens > budget:
+                window.complete = False
+                break
+            window.entries.appendleft(((created_at, message_id), role, content, tokens))
+            window.tokens += tokens
+        return window
+
+    def append(self, rows: Iterable[Tuple[int, str, str, str]]) -> None:
+        """Merge oldest-first rows from `appended_messages_query` and drop the oldest entries beyond the budget."""
+        rows = list(rows)
+        if not rows:
+            return
+
+        # Re-sort the tail from the first second the rows touch; rows already in the window are skipped
+        since = rows[0][0]
+        tail = []
+        while self.entries and self.entries[-1][0][0] >= since:
+            tail.append(self.entries.pop())
+        known = {entry[0] for entry in tail}
+        for created_at, message_id, role, content in rows:
+            key = (created_at, message_id)
+            if key in known:
+                continue
+            tail.append((key, role, content, estimate_tokens(content)))
+            self.tokens += tail[-1][3]
+            known.add(key)
+
+        tail.sort(key=lambda entry: entry[0])
+        self.entries.extend(tail)
+        if tail:
+            self.newest = max(self.newest, tail[-1][0]) if self.newest else tail[-1][0]
+
+        while self.entries and self.tokens > self.budget:
+            self.tokens -= self.entries.popleft()[3]
+            self.complete = False
+
+    def covers(self, budget: int) -> bool:
+        return self.complete or budget <= self.budget
+
+    def select(self, budget: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Newest entries within `budget`, oldest first, with their token count and whether any were left out."""
+        selected, tokens = [], 0
+        for _, role, content, entry_tokens in reversed(self.entries):
+            if tokens + entry_tokens > budget:
+                break
+            selected.append({"role": role, "content": content})
+            tokens += entry_tokens
+        selected.reverse()
+        truncated = len(selected) < len(self.entries) or not self.complete
+        return selected, tokens, truncated
+
+
+class ContextCache:
+    """Process-wide LRU of thread windows. Windows are only mutated under the lock; queries run outside it."""
+
+    def __init__(self, max_threads: int = 1024):
+        self.max_threads = max_threads
+        self._windows: "OrderedDict[str, ThreadWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str) -> Optional[ThreadWindow]:
+        with self._lock:
+            window = self._windows.get(thread_id)
+            if window is not None:
+                self._windows.move_to_end(thread_id)
+            return window
+
+    def put(self, thread_id: str, window: ThreadWindow) -> None:
+        with self._lock:
+            self._windows[thread_id] = window
+            self._windows.move_to_end(thread_id)
+            while len(self._windows) > self.max_threads:
+                self._windows.popitem(last=False)
+
+    def append(self, window: ThreadWindow, rows, budget: int) -> None:
+        with self._lock:
+            if window.complete:
+                window.budget = max(window.budget, budget)
+            window.append(rows)
+
+    def select(self, window: ThreadWindow, budget: int):
+        with self._lock:
+            return window.select(budget)
+
+    def invalidate(self, thread_id: str) -> None:
+        with self._lock:
+            self._windows.pop(thread_id, None)
+
+
+context_cache = ContextCache()
+
+
+def message_budget(max_tokens: int, system_prompt: Optional[str]) -> int:
+    """Tokens left for thread messages once the pinned system prompt is accounted for."""
+    return max_tokens - (estimate_tokens(system_prompt) if system_prompt else 0)
+
+
+def build_context(messages: List[Dict[str, Any]], tokens: int, truncated: bool, thread_id: str,
+                  system_prompt: Optional[str]) -> Dict[str, Any]:
+    """Assemble the `ThreadContext` payload, with the system prompt pinned ahead of the messages."""
+    if system_prompt:
+        messages = [{"role": "system", "content": system_prompt}] + messages
+        tokens += estimate_tokens(system_prompt)
+    return {"thread_id": thread_id, "messages": messages, "token_count": tokens, "truncated": truncated}
@@ -0,0 +1,57 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from models.models import Thread
+from api.metrics import instrument_service
+from api.v1.schemas import ThreadContext
+from services.context_builder import (
+    CONTEXT_BATCH_SIZE, ThreadWindow, appended_messages_query, build_context, context_cache, estimate_tokens,
+    message_budget, newest_messages_query
+)
+
+
+@instrument_service
+class ContextService:
+    """
+    Builds the prompt for a thread from its newest messages that fit a token budget.
+
+    Windows are cached per thread; later calls only read the messages appended since, so the
+    database work per turn is bounded by the new messages rather than the thread length.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load_window(self, thread_id: str, budget: int) -> ThreadWindow:
+        rows, tokens, before, exhausted = [], 0, None, False
+        while True:
+            batch = self.db.execute(newest_messages_query(thread_id, before)).all()
+            rows.extend(batch)
+            tokens += sum(estimate_tokens(row.content) for row in batch)
+            if len(batch) < CONTEXT_BATCH_SIZE:
+                exhausted = True
+                break
+            if tokens > budget:
+                break
+            before = (batch[-1].created_at, batch[-1].id)
+        return ThreadWindow.from_newest(rows, budget, exhausted)
+
+    def get_context(self, thread_id: str, max_tokens: int, system_prompt: Optional[str] = None) -> ThreadContext:
+        db_thread = self.db.query(Thread.id).filter(Thread.id == thread_id).first()
+        if not db_thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+
+        budget = message_budget(max_tokens, system_prompt)
+        if budget <= 0:
+            raise HTTPException(status_code=400, detail="System prompt does not fit in max_tokens")
+
+        window = context_cache.get(thread_id)
+        if window is None or not window.covers(budget):
+            window = self._load_window(thread_id, budget)
+            context_cache.put(thread_id, window)
+        else:
+            rows = self.db.execute(appended_messages_query(thread_id, window.newest)).all()
+            context_cache.append(window, rows, budget)
+
+        messages, tokens, truncated = context_cache.select(window, budget)
+        return ThreadContext(**build_context(messages, tokens, truncated, thread_id, system_prompt))
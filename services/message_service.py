@@ -1,9 +1,11 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from models.models import Message, Thread, User
-from api.v1.schemas import MessageCreate, MessageRead
+from api.metrics import instrument_service
+from api.v1.schemas import MessageCreate, MessageList, MessageRead
 from services.identifier_service import IdentifierService
+from services.pagination import keyset_page, to_message_list
 import json
 import time
 import logging
@@ -13,6 +15,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@instrument_service
 class MessageService:
     def __init__(self, db: Session):
         self.db = db
@@ -92,19 +95,28 @@ class MessageService:
             sender_id=db_message.sender_id
         )
 
-    def list_messages(self, thread_id: str, limit: int = 20, order: str = "asc") -> List[MessageRead]:
+    def _get_cursor(self, thread_id: str, message_id: str) -> Tuple[int, str]:
+        cursor = self.db.query(Message.created_at, Message.id).filter(
+            Message.thread_id == thread_id, Message.id == message_id).first()
+        if not cursor:
+            raise HTTPException(status_code=400, detail=f"Cursor message {message_id} not found in thread")
+        return tuple(cursor)
+
+    def list_messages(self, thread_id: str, limit: int = 20, order: str = "asc",
+                      after: Optional[str] = None, before: Optional[str] = None) -> MessageList:
+        if after and before:
+            raise HTTPException(status_code=400, detail="Only one of 'after' or 'before' may be given")
+
         db_thread = self.db.query(Thread).filter(Thread.id == thread_id).first()
         if not db_thread:
             raise HTTPException(status_code=404, detail="Thread not found")
 
-        query = self.db.query(Message).filter(Message.thread_id == thread_id)
-        if order == "asc":
-            query = query.order_by(Message.created_at.asc())
-        else:
-            query = query.order_by(Message.created_at.desc())
+        cursor_id = after or before
+        cursor = self._get_cursor(thread_id, cursor_id) if cursor_id else None
 
-        db_messages = query.limit(limit).all()
-        return [
+        query = self.db.query(Message).filter(Message.thread_id == thread_id)
+        db_messages = keyset_page(query, cursor, limit, order, before=bool(before)).all()
+        messages = [
             MessageRead(
                 id=db_message.id,
                 assistant_id=db_message.assistant_id,
@@ -124,6 +136,7 @@ class MessageService:
             )
             for db_message in db_messages
         ]
+        return to_message_list(messages, limit, before=bool(before))
 
     def save_assistant_message_chunk(self, thread_id: str, content: str, is_last_chunk: bool = False) -> Optional[MessageRead]:
         if thread_id not in self.message_chunks:
@@ -190,7 +203,7 @@ class MessageService:
             raise HTTPException(status_code=404, detail="Thread not found")
 
         db_messages = self.db.query(Message).filter(Message.thread_id == thread_id).order_by(
-            Message.created_at.asc()).all()
+            Message.created_at.asc(), Message.id.asc()).all()
 
         formatted_messages = [
             {
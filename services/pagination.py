@@ -0,0 +1,48 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, or_
+from models.models import Message
+from api.v1.schemas import MessageList, MessageRead
+
+
+def keyset_page(query, cursor: Optional[Tuple[int, str]], limit: int, order: str = "asc", before: bool = False):
+    """
+    Restrict a message query (ORM `Query` or 2.0-style `select`) to one page next to the cursor.
+
+    Messages are ordered by (created_at, id) so those created within the same second keep a stable
+    order, and the (thread_id, created_at, id) index serves every page as a range scan regardless of
+    how deep into the thread it is. One extra row is fetched to tell whether another page follows.
+    """
+    ascending = (order == "asc") != before
+    if cursor is not None:
+        created_at, message_id = cursor
+        if ascending:
+            query = query.filter(or_(
+                Message.created_at > created_at,
+                and_(Message.created_at == created_at, Message.id > message_id)
+            ))
+        else:
+            query = query.filter(or_(
+                Message.created_at < created_at,
+                and_(Message.created_at == created_at, Message.id < message_id)
+            ))
+
+    if ascending:
+        query = query.order_by(Message.created_at.asc(), Message.id.asc())
+    else:
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
+    return query.limit(limit + 1)
+
+
+def to_message_list(messages: List[MessageRead], limit: int, before: bool = False) -> MessageList:
+    """Trim the extra row fetched by `keyset_page` and restore the requested order for `before` pages."""
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if before:
+        messages.reverse()
+
+    return MessageList(
+        data=messages,
+        first_id=messages[0].id if messages else None,
+        last_id=messages[-1].id if messages else None,
+        has_more=has_more
+    )
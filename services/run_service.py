@@ -1,6 +1,7 @@
 from fastapi import HTTPException
 
 from models.models import Run  # Ensure Run is imported
+from api.metrics import instrument_service
 from pydantic import parse_obj_as
 from services.identifier_service import IdentifierService
 from api.v1.schemas import Tool
@@ -9,6 +10,7 @@ from typing import List
 import time
 
 
+@instrument_service
 class RunService:
     def __init__(self, db: Session):
         self.db = db
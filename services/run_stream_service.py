@@ -0,0 +1,190 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from models.models import Assistant, Message, Run
+from api.metrics import instrument_service
+from api.v1.schemas import RunStreamRequest
+from db.database import SessionLocal
+from services.context_service import ContextService
+from services.identifier_service import IdentifierService
+from ollama import AsyncClient
+from ollama.new_clients.loggin_service import LoggingUtility
+import anyio
+import asyncio
+import json
+import time
+import weakref
+
+logging_utility = LoggingUtility()
+
+_ollama_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+
+# A run is streamed once; later requests for it get a 409
+STREAMABLE_STATUSES = ("queued", "pending")
+
+
+def get_ollama_client() -> AsyncClient:
+    """
+    One Ollama client per event loop, so runs share its connection pool. The pool is bound to the loop
+    it was first used on, and a server or test client may run more than one. The host comes from OLLAMA_HOST.
+    """
+    loop = asyncio.get_running_loop()
+    client = _ollama_clients.get(loop)
+    if client is None:
+        client = _ollama_clients[loop] = AsyncClient()
+    return client
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def run_model(run: Run, assistant: Optional[Assistant], stream_request: RunStreamRequest) -> str:
+    return stream_request.model or (assistant.model if assistant else None) or run.model
+
+
+def run_instructions(run: Run, assistant: Optional[Assistant]) -> Optional[str]:
+    return run.instructions or (assistant.instructions if assistant else None)
+
+
+def build_assistant_message(run: Run, content: str) -> Message:
+    now = int(time.time())
+    return Message(
+        id=IdentifierService.generate_message_id(),
+        assistant_id=run.assistant_id,
+        attachments=[],
+        completed_at=now,
+        content=content,
+        created_at=now,
+        incomplete_at=None,
+        incomplete_details=None,
+        meta_data=json.dumps({}),
+        object="message",
+        role="assistant",
+        run_id=run.id,
+        status="completed",
+        thread_id=run.thread_id,
+        sender_id="assistant"
+    )
+
+
+def check_streamable(db_run: Run) -> None:
+    if db_run.status not in STREAMABLE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Run is {db_run.status}, only queued or pending runs can be streamed")
+
+
+def apply_run_outcome(db_run: Run, usage: Optional[Dict[str, int]], error: Optional[str], cancelled: bool = False) -> None:
+    if cancelled:
+        db_run.status = "cancelled"
+    elif error:
+        db_run.status = "failed"
+        db_run.last_error = error[:256]
+    else:
+        db_run.status = "completed"
+        db_run.usage = usage
+
+
+async def stream_run_events(run_id: str, model: str, messages: List[Dict[str, Any]], options: Dict[str, Any],
+                            persist: Callable[..., Awaitable[Optional[str]]]) -> AsyncIterator[str]:
+    """
+    Relay a chat completion as Server-Sent Events, then hand the full reply to `persist`, which stores
+    the message and the run status in one transaction.
+
+    Events: `message.delta` per token, then `run.completed` (with the message id) or `run.failed`.
+    If the client disconnects first, or the reply cannot be saved, the run is still marked cancelled
+    or failed on the way out.
+    """
+    content, usage, error, saved = [], None, None, False
+    try:
+        try:
+            async for chunk in await get_ollama_client().chat(model=model, messages=messages, options=options, stream=True):
+                token = chunk['message']['content']
+                if token:
+                    content.append(token)
+                    yield sse_event("message.delta", {"content": token})
+                if chunk.get('done'):
+                    prompt_tokens = chunk.get('prompt_eval_count') or 0
+                    completion_tokens = chunk.get('eval_count') or 0
+                    usage = {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens
+                    }
+        except Exception as e:
+            logging_utility.error("Run %s failed while streaming from Ollama: %s", run_id, e)
+            error = str(e)
+
+        try:
+            message_id = await persist("".join(content), usage, error)
+            saved = True
+        except Exception as e:
+            logging_utility.error("Run %s could not be saved: %s", run_id, e)
+            error = f"Could not save run: {str(e)}"
+            yield sse_event("run.failed", {"run_id": run_id, "error": error})
+            return
+
+        if error:
+            yield sse_event("run.failed", {"run_id": run_id, "error": error})
+        else:
+            yield sse_event("run.completed", {"run_id": run_id, "message_id": message_id, "usage": usage})
+    finally:
+        # Reached without a saved outcome on a disconnect (CancelledError or GeneratorExit) or a failed save.
+        # The shield keeps the cancelled task from cancelling this write as well.
+        if not saved:
+            with anyio.CancelScope(shield=True):
+                try:
+                    await persist("", None, error, cancelled=error is None)
+                except Exception as e:
+                    logging_utility.error("Run %s status could not be saved: %s", run_id, e)
+
+
+@instrument_service
+class RunStreamService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def prepare(self, thread_id: str, run_id: str, stream_request: RunStreamRequest) -> Tuple[str, List[Dict[str, Any]]]:
+        """Validate the run and build its prompt before the response starts, so errors are still plain HTTP errors."""
+        # Locked until the commit below, so two requests cannot both start the run
+        db_run = self.db.query(Run).filter(Run.id == run_id).with_for_update().first()
+        if not db_run or db_run.thread_id != thread_id:
+            raise HTTPException(status_code=404, detail="Run not found")
+        check_streamable(db_run)
+
+        assistant = self.db.query(Assistant).filter(Assistant.id == db_run.assistant_id).first()
+        context = ContextService(self.db).get_context(
+            thread_id,
+            max_tokens=stream_request.num_ctx - stream_request.response_tokens,
+            system_prompt=run_instructions(db_run, assistant)
+        )
+        model = run_model(db_run, assistant, stream_request)
+
+        db_run.status = "in_progress"
+        self.db.commit()
+        return model, context.messages
+
+    def _persist(self, run_id: str, content: str, usage: Optional[Dict[str, int]], error: Optional[str],
+                 cancelled: bool = False) -> Optional[str]:
+        # The request session is closed once the handler returns, so the stream writes through its own
+        db = SessionLocal()
+        try:
+            db_run = db.query(Run).filter(Run.id == run_id).first()
+            message_id = None
+            if not error and not cancelled:
+                db_message = build_assistant_message(db_run, content)
+                db.add(db_message)
+                message_id = db_message.id
+            apply_run_outcome(db_run, usage, error, cancelled)
+            db.commit()
+            return message_id
+        finally:
+            db.close()
+
+    def stream_run(self, run_id: str, model: str, messages: List[Dict[str, Any]],
+                   stream_request: RunStreamRequest) -> AsyncIterator[str]:
+        async def persist(content, usage, error, cancelled=False):
+            return await run_in_threadpool(self._persist, run_id, content, usage, error, cancelled)
+
+        options = {**stream_request.options, "num_ctx": stream_request.num_ctx}
+        return stream_run_events(run_id, model, messages, options, persist)
@@ -1,12 +1,15 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from models.models import Thread, User, Message
-from api.v1.schemas import ThreadCreate, ThreadReadDetailed, UserBase, MessageRead
+from api.metrics import instrument_service
+from api.v1.schemas import ThreadCreate, ThreadReadDetailed, UserBase
+from services.context_builder import context_cache
 from services.identifier_service import IdentifierService
 import json
 import time
 from typing import List
 
+@instrument_service
 class ThreadService:
     def __init__(self, db: Session):
         self.db = db
@@ -73,6 +76,7 @@ class ThreadService:
         # Delete the thread itself
         self.db.delete(db_thread)
         self.db.commit()
+        context_cache.invalidate(thread_id)
 
     def list_threads_by_user(self, user_id: str) -> List[str]:
         threads = self.db.query(Thread).join(Thread.participants).filter(User.id == user_id).all()
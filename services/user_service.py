@@ -1,11 +1,13 @@
 from sqlalchemy.orm import Session
 from models.models import User
+from api.metrics import instrument_service
 from api.v1.schemas import UserCreate, UserRead, UserUpdate
 from services.identifier_service import IdentifierService
 from typing import List
 from fastapi import HTTPException
 
 
+@instrument_service
 class UserService:
     def __init__(self, db: Session):
         self.db = db
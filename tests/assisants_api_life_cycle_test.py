@@ -193,7 +193,7 @@ def setup_message(client, thread_id, user_id, initial_message, role):
     return message_id
 
 def retrieve_messages(client, thread_id):
-    thread_messages = client.list_messages(thread_id=thread_id)
+    thread_messages = client.list_messages(thread_id=thread_id)["data"]
     print(f"Retrieved all messages in the thread: {json.dumps(thread_messages, indent=2)}")  # Print the entire response for debugging
 
     serialized_messages = []
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ollama.new_clients.async_message_client import AsyncMessageService
+from ollama.new_clients.async_ollama_client import AsyncOllamaClient
+from ollama.new_clients.async_run_client import AsyncRunService
+from ollama.new_clients.async_user_client import AsyncUserService
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.method == "POST" and request.url.path == "/v1/users":
+        return httpx.Response(200, json={"id": "user_1", "name": "Test"})
+    if request.method == "GET" and request.url.path == "/v1/threads/thread_1/formatted_messages":
+        return httpx.Response(200, json=[{"role": "user", "content": "Hello"}])
+    if request.method == "POST" and request.url.path == "/v1/threads/thread_1/runs/run_1/stream":
+        events = [
+            ("message.delta", {"content": "Hel"}),
+            ("message.delta", {"content": "lo"}),
+            ("run.completed", {"run_id": "run_1", "message_id": "message_1"}),
+        ]
+        body = "".join(f"event: {event}\ndata: {json.dumps(data)}\n\n" for event, data in events)
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+    if request.method == "POST" and request.url.path == "/v1/threads/thread_1/runs/run_2/stream":
+        body = f"event: run.failed\ndata: {json.dumps({'run_id': 'run_2', 'error': 'model not found'})}\n\n"
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+    return httpx.Response(404, json={"detail": "Not found"})
+
+
+def mock_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="http://testserver", transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_async_create_user():
+    user_service = AsyncUserService(client=mock_client())
+    user = await user_service.create_user(name="Test")
+    assert user.id == "user_1"
+    assert user.name == "Test"
+
+
+@pytest.mark.asyncio
+async def test_async_get_formatted_messages_concurrently():
+    message_service = AsyncMessageService(client=mock_client())
+    results = await asyncio.gather(*[
+        message_service.get_formatted_messages("thread_1", system_message="Be helpful") for _ in range(10)
+    ])
+    for messages in results:
+        assert messages == [{"role": "system", "content": "Be helpful"}, {"role": "user", "content": "Hello"}]
+
+
+@pytest.mark.asyncio
+async def test_async_ollama_client_shares_connection_pool():
+    async with AsyncOllamaClient(base_url="http://testserver", api_key="key") as client:
+        services = [client.user_service, client.assistant_service, client.thread_service,
+                    client.message_service, client.run_service]
+        assert all(service.client is client.http_client for service in services)
+
+
+@pytest.mark.asyncio
+async def test_async_stream_run():
+    run_service = AsyncRunService(client=mock_client())
+    tokens = [token async for token in run_service.stream_run("thread_1", "run_1")]
+    assert tokens == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_async_stream_run_failed():
+    run_service = AsyncRunService(client=mock_client())
+    with pytest.raises(RuntimeError, match="model not found"):
+        async for _ in run_service.stream_run("thread_1", "run_2"):
+            pass
@@ -0,0 +1,106 @@
+import json
+import logging
+import queue
+import sys
+from decimal import Decimal
+
+import pytest
+
+from ollama.new_clients.loggin_service import (
+    JsonFormatter, LoggingUtility, TruncatingQueueHandler, configure_logging, parse_levels, truncate
+)
+
+
+def record(msg, *args, level=logging.INFO, exc_info=None, **extra):
+    entry = logging.LogRecord("test", level, __file__, 1, msg, args, exc_info)
+    entry.__dict__.update(extra)
+    return entry
+
+
+def handled(entry, limit=10):
+    handler_queue = queue.SimpleQueue()
+    TruncatingQueueHandler(handler_queue, limit).handle(entry)
+    return handler_queue.get_nowait()
+
+
+class Point:
+    def __repr__(self):
+        return "Point()"
+
+    def __str__(self):
+        return "point"
+
+
+def test_truncate():
+    assert truncate("abcdef", 3) == "abc... (3 more characters)"
+    assert truncate("abc", 3) == "abc"
+    assert truncate("abcdef", 0) == "abcdef"
+
+
+def test_parse_levels():
+    assert parse_levels("httpx=warning, sqlalchemy.engine=INFO,,") == {"httpx": "WARNING", "sqlalchemy.engine": "INFO"}
+
+
+def test_handler_keeps_format_specifiers():
+    assert handled(record("%.2f %d %r %s", Decimal("1.005"), 7, Point(), Point())).msg == "1.00 7 Point() point"
+
+
+def test_handler_keeps_numpy_integers():
+    numpy = pytest.importorskip("numpy")
+    assert handled(record("%d", numpy.int64(12345678901234))).msg == "12345678901234"
+
+
+def test_handler_truncates_long_arguments():
+    entry = handled(record("body %s of %s", "x" * 15, list(range(10))))
+    assert entry.msg == "body xxxxxxxxxx... (5 more characters) of [0, 1, 2, ... (20 more characters)"
+    assert entry.args is None
+
+
+def test_handler_truncates_message_without_arguments():
+    assert handled(record("y" * 12)).msg == "yyyyyyyyyy... (2 more characters)"
+
+
+def test_handler_without_limit():
+    assert handled(record("%s", "z" * 50), limit=0).msg == "z" * 50
+
+
+def test_handler_mapping_arguments():
+    assert handled(record("%(name)s is %(age)d", {"name": "Ada", "age": 36})).msg == "Ada is 36"
+
+
+def test_json_formatter():
+    entry = json.loads(JsonFormatter().format(record("Run %s", "run_1", level=logging.WARNING, run_id="run_1")))
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "test"
+    assert entry["message"] == "Run run_1"
+    assert entry["run_id"] == "run_1"
+    assert entry["time"].endswith("+00:00")
+    assert "exception" not in entry
+
+
+def test_json_formatter_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_info = sys.exc_info()
+    entry = json.loads(JsonFormatter().format(record("failed", level=logging.ERROR, exc_info=exc_info, payload=Point())))
+    assert entry["exception"].splitlines()[-1] == "ValueError: boom"
+    assert entry["payload"] == "point"
+
+
+def test_handler_leaves_record_for_other_handlers():
+    entry = record("body %s", "x" * 15)
+    queued = handled(entry)
+    assert queued is not entry
+    assert (entry.msg, entry.args) == ("body %s", ("x" * 15,))
+    assert entry.getMessage() == "body " + "x" * 15
+
+
+def test_logging_utility_propagates_by_default(monkeypatch):
+    monkeypatch.delenv("LOG_PROPAGATE", raising=False)
+    assert LoggingUtility(name="tests.propagate").logger.propagate is True
+
+    monkeypatch.setenv("LOG_PROPAGATE", "false")
+    logger = LoggingUtility(name="tests.exclusive").logger
+    assert logger.propagate is False
+    assert logger.handlers.count(configure_logging()) == 1
@@ -0,0 +1,58 @@
+import httpx
+
+from ollama.new_clients.http_client import create_http_client
+from ollama.new_clients.new_ollama_client import OllamaClient
+from ollama.new_clients.thread_client import ThreadService
+from ollama.new_clients.user_client import UserService
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.method == "POST" and request.url.path == "/v1/users":
+        return httpx.Response(200, json={"id": "user_1", "name": "Test"})
+    if request.method == "POST" and request.url.path == "/v1/threads":
+        return httpx.Response(200, json={"id": "thread_1", "created_at": 0, "meta_data": {}, "object": "thread",
+                                         "tool_resources": {}})
+    return httpx.Response(404, json={"detail": "Not found"})
+
+
+def test_services_send_through_shared_client():
+    requests = []
+
+    def recording_handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.path))
+        return handler(request)
+
+    shared = httpx.Client(base_url="http://testserver", transport=httpx.MockTransport(recording_handler))
+    user_service = UserService("http://testserver", "key", client=shared)
+    thread_service = ThreadService("http://testserver", "key", client=shared)
+
+    user = user_service.create_user(name="Test")
+    thread = thread_service.create_thread(participant_ids=[user.id])
+
+    assert user_service.client is thread_service.client is shared
+    assert thread.id == "thread_1"
+    assert requests == [("POST", "/v1/users"), ("POST", "/v1/threads")]
+
+
+def test_ollama_client_creates_one_pool(monkeypatch):
+    created = []
+    original = httpx.Client.__init__
+
+    def init(self, *args, **kwargs):
+        created.append(str(kwargs.get("base_url", "")))
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(httpx.Client, "__init__", init)
+    with OllamaClient(base_url="http://testserver/", api_key="key") as client:
+        services = [client.user_service, client.assistant_service, client.thread_service,
+                    client.message_service, client.run_service]
+        assert all(service.client is client.http_client for service in services)
+
+    # The other client is the one that talks to Ollama
+    assert created.count("http://testserver/") == 1
+
+
+def test_http_client_keeps_httpx_default_timeout():
+    client = create_http_client("http://testserver", "key")
+    assert client.timeout == httpx.Timeout(5.0)
+    assert client.headers["Authorization"] == "Bearer key"
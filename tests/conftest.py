@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+# The API tests use DATABASE_URL from the environment or .env, or else a throwaway SQLite file.
+# A file rather than `sqlite://`, as every thread would get its own empty in-memory database.
+load_dotenv()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import db.database as database
+from api.v1.schemas import MessageCreate, ThreadCreate, UserCreate
+from db.database import create_db_engine, get_async_db, to_async_url
+from models.models import Base
+from services.async_message_service import AsyncMessageService
+from services.async_thread_service import AsyncThreadService
+from services.async_user_service import AsyncUserService
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("mysql+pymysql://user:pw@db:3306/app", "mysql+aiomysql://user:pw@db:3306/app"),
+    ("mysql://user:pw@db/app", "mysql+aiomysql://user:pw@db/app"),
+    ("postgresql://user@db/app", "postgresql+asyncpg://user@db/app"),
+    ("postgresql+psycopg2://user@db/app", "postgresql+asyncpg://user@db/app"),
+    ("sqlite:///app.db", "sqlite+aiosqlite:///app.db"),
+    ("sqlite+aiosqlite:///app.db", "sqlite+aiosqlite:///app.db"),
+])
+def test_to_async_url(url, expected):
+    assert to_async_url(url) == expected
+
+
+async def create_session_factory(tmp_path):
+    engine = create_db_engine(to_async_url(f"sqlite:///{tmp_path / 'async.db'}"), asynchronous=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_async_services_on_aiosqlite(tmp_path):
+    engine, session_factory = await create_session_factory(tmp_path)
+    async with session_factory() as db:
+        user = await AsyncUserService(db).create_user(UserCreate(name="Test"))
+        thread = await AsyncThreadService(db).create_thread(ThreadCreate(participant_ids=[user.id]))
+        message_service = AsyncMessageService(db)
+        for content in ("first", "second"):
+            await message_service.create_message(MessageCreate(content=content, thread_id=thread.id, sender_id=user.id))
+
+        page = await message_service.list_messages(thread.id)
+
+    assert sorted(message.content for message in page.data) == ["first", "second"]
+    # Messages created in the same second are ordered by id
+    assert [m.id for m in page.data] == [m.id for m in sorted(page.data, key=lambda m: (m.created_at, m.id))]
+    assert page.has_more is False
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_yields_and_closes_session(tmp_path, monkeypatch):
+    engine, session_factory = await create_session_factory(tmp_path)
+    monkeypatch.setattr(database, "AsyncSessionLocal", session_factory)
+
+    sessions = get_async_db()
+    db = await sessions.__anext__()
+    assert isinstance(db, AsyncSession)
+    user = await AsyncUserService(db).create_user(UserCreate(name="Test"))
+    assert (await AsyncUserService(db).get_user(user.id)).name == "Test"
+
+    with pytest.raises(StopAsyncIteration):
+        await sessions.__anext__()
+    await engine.dispose()
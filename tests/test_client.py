@@ -1,14 +1,34 @@
 import os
+import sys
+import copy
+import pickle
+import asyncio
 import io
 import json
+import time
+import httpx
 import pytest
+import hashlib
 import tempfile
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from pytest_httpserver import HTTPServer, URIPattern
 from werkzeug.wrappers import Request, Response
 from PIL import Image
 
+from ollama._admission import AdmissionController
+from ollama._blob import DigestCache, file_key
+from ollama._cache import EmbeddingCache, ImageCache
 from ollama._client import Client, AsyncClient
+from ollama._decoder import Decoder, available_backends
+from ollama._flight import SingleFlight
+from ollama._hooks import Hook
+from ollama._otel import OpenTelemetryHook
+from ollama._pool import AsyncPooledClient, PooledClient
+from ollama._retry import CircuitBreaker, RetryPolicy
+from ollama._responses import DirectoryBackend, MemoryBackend, ResponseCache, SQLiteBackend
+from ollama._types import ChatRecord, CircuitOpenError, GenerateRecord, MessageRecord, RequestError, ResponseError
 
 
 class PrefixPattern(URIPattern):
@@ -91,6 +111,53 @@ def test_client_chat_stream(httpserver: HTTPServer):
     assert part['message']['content'] == next(it)
 
 
+def test_client_chat_stream_records(httpserver: HTTPServer):
+  def stream_handler(_: Request):
+    def generate():
+      for message in ['I ', "don't ", 'know.']:
+        yield json.dumps({'model': 'dummy', 'message': {'role': 'assistant', 'content': message}, 'done': False}) + '\n'
+
+    return Response(generate())
+
+  httpserver.expect_ordered_request('/api/chat', method='POST').respond_with_handler(stream_handler)
+
+  client = Client(httpserver.url_for('/'), records=True)
+  response = client.chat('dummy', messages=[{'role': 'user', 'content': 'Why is the sky blue?'}], stream=True)
+
+  it = iter(['I ', "don't ", 'know.'])
+  for part in response:
+    assert isinstance(part, ChatRecord)
+    assert isinstance(part['message'], MessageRecord)
+    assert part['message']['role'] == 'assistant'
+    assert part.message.content == next(it)
+    assert 'done_reason' not in part
+
+
+@pytest.mark.parametrize('stream_body', [False, True])
+def test_client_chat_records_multi_turn(httpserver: HTTPServer, stream_body):
+  httpserver.expect_request('/api/chat', method='POST').respond_with_json({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'Rayleigh.'}, 'done': True})
+
+  client = Client(httpserver.url_for('/'), records=True, stream_body=stream_body)
+  messages = [{'role': 'user', 'content': 'Why is the sky blue?'}]
+  response = client.chat('dummy', messages=messages)
+  messages += [response['message'], {'role': 'user', 'content': 'And sunsets?'}]
+  client.chat('dummy', messages=messages)
+
+  sent = json.loads(httpserver.log[-1][0].data)['messages']
+  assert sent[1] == {'role': 'assistant', 'content': 'Rayleigh.'}
+  assert isinstance(messages[1], MessageRecord)
+
+
+def test_records_copy_and_pickle():
+  record = ChatRecord.from_mapping({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'hi'}, 'done': True, 'extra': 1})
+
+  for copied in (copy.copy(record), copy.deepcopy(record), pickle.loads(pickle.dumps(record))):
+    assert copied == record
+    assert isinstance(copied, ChatRecord)
+    assert isinstance(copied.message, MessageRecord)
+    assert copied['extra'] == 1
+
+
 def test_client_chat_images(httpserver: HTTPServer):
   httpserver.expect_ordered_request(
     '/api/chat',
@@ -130,6 +197,86 @@ def test_client_chat_images(httpserver: HTTPServer):
     assert response['message']['content'] == "I don't know."
 
 
+def test_client_chat_images_cached(httpserver: HTTPServer):
+  httpserver.expect_request('/api/chat', method='POST').respond_with_json({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'A cat.'}})
+
+  image_cache = ImageCache()
+  client = Client(httpserver.url_for('/'), image_cache=image_cache)
+
+  with tempfile.NamedTemporaryFile(suffix='.png') as temp:
+    Image.new('RGB', (1, 1)).save(temp, 'PNG')
+    temp.flush()
+
+    messages = [{'role': 'user', 'content': 'What is this?', 'images': [temp.name]}]
+    client.chat('dummy', messages=messages)
+    messages += [{'role': 'assistant', 'content': 'A cat.'}, {'role': 'user', 'content': 'And this?', 'images': [temp.name]}]
+    client.chat('dummy', messages=messages)
+
+  assert messages[0]['images'] == [temp.name]
+  assert image_cache.stats()['misses'] == 1
+  assert image_cache.stats()['hits'] == 2
+
+  sent = json.loads(httpserver.log[-1][0].data)['messages']
+  assert sent[0]['images'] == sent[2]['images'] == ['iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGNgYGAAAAAEAAH2FzhVAAAAAElFTkSuQmCC']
+
+
+def test_client_images_not_cached_by_default(httpserver: HTTPServer, monkeypatch):
+  httpserver.expect_request('/api/chat', method='POST').respond_with_json({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'A cat.'}})
+
+  client = Client(httpserver.url_for('/'))
+  assert client._images is None
+
+  # `ollama._client` is the default client, so the module is taken from sys.modules
+  module = sys.modules['ollama._client']
+  encoded = []
+  encode_image = module._encode_image
+  monkeypatch.setattr(module, '_encode_image', lambda image: encoded.append(image) or encode_image(image))
+
+  messages = [{'role': 'user', 'content': 'What is this?', 'images': [b'ollama']}]
+  client.chat('dummy', messages=messages)
+  client.chat('dummy', messages=messages)
+
+  assert encoded == [b'ollama', b'ollama']
+  assert json.loads(httpserver.log[-1][0].data)['messages'][0]['images'] == ['b2xsYW1h']
+
+
+def test_client_chat_stream_body(httpserver: HTTPServer):
+  httpserver.expect_ordered_request(
+    '/api/chat',
+    method='POST',
+    json={
+      'model': 'dummy',
+      'messages': [
+        {'role': 'user', 'content': 'Why is the sky blue?' * 1000},
+        {
+          'role': 'user',
+          'content': 'And this?',
+          'images': ['iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGNgYGAAAAAEAAH2FzhVAAAAAElFTkSuQmCC', 'b2xsYW1h'],
+        },
+      ],
+      'tools': [],
+      'stream': False,
+      'format': '',
+      'options': {},
+      'keep_alive': None,
+    },
+  ).respond_with_json({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'Rayleigh scattering.'}})
+
+  client = Client(httpserver.url_for('/'), stream_body=True)
+
+  with tempfile.NamedTemporaryFile(suffix='.png') as temp:
+    Image.new('RGB', (1, 1)).save(temp, 'PNG')
+    temp.flush()
+    messages = [
+      {'role': 'user', 'content': 'Why is the sky blue?' * 1000},
+      {'role': 'user', 'content': 'And this?', 'images': [temp.name, b'ollama']},
+    ]
+    response = client.chat('dummy', messages=messages)
+
+  assert response['message']['content'] == 'Rayleigh scattering.'
+  assert httpserver.log[-1][0].headers.get('Transfer-Encoding') == 'chunked'
+
+
 def test_client_generate(httpserver: HTTPServer):
   httpserver.expect_ordered_request(
     '/api/generate',
@@ -205,6 +352,49 @@ def test_client_generate_stream(httpserver: HTTPServer):
     assert part['response'] == next(it)
 
 
+def test_client_generate_stream_partial(httpserver: HTTPServer):
+  def stream_handler(_: Request):
+    def generate():
+      for message in ['Because ', 'it ', 'is.']:
+        yield json.dumps({'model': 'dummy', 'response': message, 'done': False}) + '\n'
+      yield json.dumps({'model': 'dummy', 'response': '', 'done': True, 'context': [1, 2, 3], 'eval_count': 3}) + '\n'
+
+    return Response(generate())
+
+  httpserver.expect_ordered_request('/api/generate', method='POST').respond_with_handler(stream_handler)
+
+  client = Client(httpserver.url_for('/'), decoder=Decoder('json', partial=True))
+  response = client.generate('dummy', 'Why is the sky blue?', stream=True)
+
+  assert list(response) == [
+    {'response': 'Because ', 'done': False},
+    {'response': 'it ', 'done': False},
+    {'response': 'is.', 'done': False},
+    {'response': '', 'done': True},
+  ]
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_client_chat_stream_backend(httpserver: HTTPServer, backend: str):
+  def stream_handler(_: Request):
+    def generate():
+      yield json.dumps({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'I '}}) + '\n'
+      yield json.dumps({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'know.'}}) + '\n'
+      yield json.dumps({'error': 'out of tokens'}) + '\n'
+
+    return Response(generate())
+
+  httpserver.expect_ordered_request('/api/chat', method='POST').respond_with_handler(stream_handler)
+
+  client = Client(httpserver.url_for('/'), decoder=backend)
+  response = client.chat('dummy', messages=[{'role': 'user', 'content': 'Why is the sky blue?'}], stream=True)
+
+  assert next(response)['message']['content'] == 'I '
+  assert next(response)['message']['content'] == 'know.'
+  with pytest.raises(ResponseError, match='out of tokens'):
+    next(response)
+
+
 def test_client_generate_images(httpserver: HTTPServer):
   httpserver.expect_ordered_request(
     '/api/generate',
@@ -520,6 +710,599 @@ def test_client_create_blob_exists(httpserver: HTTPServer):
     assert response == 'sha256:e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
 
 
+def test_client_create_blob_progress(httpserver: HTTPServer):
+  httpserver.expect_ordered_request(PrefixPattern('/api/blobs/'), method='HEAD').respond_with_response(Response(status=404))
+  httpserver.expect_ordered_request(PrefixPattern('/api/blobs/'), method='POST').respond_with_response(Response(status=201))
+
+  digests = DigestCache()
+  client = Client(httpserver.url_for('/'), digests=digests)
+
+  updates = []
+  with tempfile.NamedTemporaryFile() as blob:
+    blob.write(b'x' * 100)
+    blob.flush()
+    response = client._create_blob(blob.name, progress=updates.append)
+    assert response == 'sha256:' + hashlib.sha256(b'x' * 100).hexdigest()
+    assert digests.get(file_key(blob.name)) == response
+
+  assert httpserver.log[-1][0].data == b'x' * 100
+  assert [update['status'].split()[0] for update in updates] == ['hashing', 'uploading']
+  assert updates[-1] == {'status': f'uploading {response}', 'digest': response, 'total': 100, 'completed': 100}
+
+
+def test_client_create_blob_digest_cache():
+  digests = DigestCache()
+  client = Client(transport=httpx.MockTransport(lambda _: httpx.Response(200)), digests=digests)
+
+  with tempfile.NamedTemporaryFile() as blob:
+    digests.put(file_key(blob.name), 'sha256:cached')
+    assert client._create_blob(blob.name) == 'sha256:cached'
+
+
+def test_client_create_blob_retry(monkeypatch):
+  monkeypatch.setattr(time, 'sleep', lambda _: None)
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request.method)
+    if request.method == 'HEAD':
+      return httpx.Response(404)
+    if requests.count('POST') == 1:
+      raise httpx.WriteError('connection reset')
+    return httpx.Response(201)
+
+  client = Client(transport=httpx.MockTransport(handler), digests=DigestCache())
+
+  with tempfile.NamedTemporaryFile() as blob:
+    client._create_blob(blob.name)
+
+  assert requests == ['HEAD', 'POST', 'HEAD', 'POST']
+
+
+def test_client_create_blobs_concurrently():
+  uploads = threading.Barrier(3, timeout=5)
+  created = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    if request.method == 'HEAD':
+      return httpx.Response(404)
+    if request.method == 'POST' and request.url.path.startswith('/api/blobs/'):
+      uploads.wait()
+      return httpx.Response(201)
+    created.append(json.loads(request.content)['modelfile'])
+    return httpx.Response(200, json={'status': 'success'})
+
+  client = Client(transport=httpx.MockTransport(handler), digests=DigestCache())
+
+  with tempfile.TemporaryDirectory() as directory:
+    for name in ('model.gguf', 'a.gguf', 'b.gguf'):
+      Path(directory, name).write_text(name)
+    digests = {name: 'sha256:' + hashlib.sha256(name.encode()).hexdigest() for name in ('model.gguf', 'a.gguf', 'b.gguf')}
+
+    client.create('dummy', modelfile='FROM model.gguf\nADAPTER a.gguf\nADAPTER b.gguf\nADAPTER a.gguf\n'.replace(' ', f' {directory}/'), concurrency=3)
+
+  assert created == [f'FROM @{digests["model.gguf"]}\nADAPTER @{digests["a.gguf"]}\nADAPTER @{digests["b.gguf"]}\nADAPTER @{digests["a.gguf"]}\n']
+
+
+def test_client_single_flight():
+  flights = SingleFlight()
+  release = threading.Event()
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    release.wait(5)
+    return httpx.Response(200, json={'model': 'dummy', 'response': 'Because it is.', 'done': True})
+
+  client = Client(transport=httpx.MockTransport(handler), single_flight=flights)
+
+  with ThreadPoolExecutor(max_workers=4) as executor:
+    futures = [executor.submit(client.generate, 'dummy', 'Why is the sky blue?', options={'seed': 42}) for _ in range(4)]
+    while flights.stats()['hits'] < 3:
+      time.sleep(0.01)
+    release.set()
+    responses = [future.result() for future in futures]
+
+  assert len(requests) == 1
+  assert all(response['response'] == 'Because it is.' for response in responses)
+  assert responses[0] is not responses[1]
+  assert flights.stats() == {'hits': 3, 'misses': 1, 'in_flight': 0}
+
+  client.generate('dummy', 'Why is the sky blue?', options={'seed': 42})
+  assert len(requests) == 2
+
+
+def test_client_single_flight_stream():
+  flights = SingleFlight()
+  release = threading.Event()
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    release.wait(5)
+    lines = [{'model': 'dummy', 'message': {'role': 'assistant', 'content': token}, 'done': False} for token in ('Because', ' it', ' is.')]
+    return httpx.Response(200, content=''.join(json.dumps(line) + '\n' for line in lines))
+
+  client = Client(transport=httpx.MockTransport(handler), single_flight=flights)
+
+  def chat():
+    return ''.join(part['message']['content'] for part in client.chat('dummy', messages=[{'role': 'user', 'content': 'Why?'}], stream=True))
+
+  with ThreadPoolExecutor(max_workers=3) as executor:
+    futures = [executor.submit(chat) for _ in range(3)]
+    while flights.stats()['hits'] < 2:
+      time.sleep(0.01)
+    release.set()
+    assert [future.result() for future in futures] == ['Because it is.'] * 3
+
+  assert len(requests) == 1
+
+
+def test_client_single_flight_stream_abandoned():
+  flights = SingleFlight()
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    lines = [{'model': 'dummy', 'message': {'role': 'assistant', 'content': token}, 'done': False} for token in ('Because', ' it', ' is.')]
+    return httpx.Response(200, content=''.join(json.dumps(line) + '\n' for line in lines))
+
+  client = Client(transport=httpx.MockTransport(handler), single_flight=flights)
+
+  for _ in client.chat('dummy', messages=[{'role': 'user', 'content': 'Why?'}], stream=True):
+    break
+  assert flights.stats()['in_flight'] == 0
+
+  parts = list(client.chat('dummy', messages=[{'role': 'user', 'content': 'Why?'}], stream=True))
+  assert len(parts) == 3
+  assert len(requests) == 2
+
+
+def test_single_flight_stream_closes_source_after_last_reader():
+  flights = SingleFlight()
+  closed = []
+
+  def source():
+    try:
+      yield from range(5)
+    finally:
+      closed.append(True)
+
+  first, second = flights.stream('key', source), flights.stream('key', source)
+  assert (next(first), next(second)) == (0, 0)
+
+  first.close()
+  assert closed == [] and flights.stats()['in_flight'] == 1
+  second.close()
+  assert closed == [True] and flights.stats()['in_flight'] == 0
+
+
+def test_client_response_cache():
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(json.loads(request.content))
+    if requests[-1]['stream']:
+      lines = [{'model': 'dummy', 'response': token, 'done': False} for token in ('Because', ' it', ' is.')]
+      return httpx.Response(200, content=''.join(json.dumps(line) + '\n' for line in lines))
+    return httpx.Response(200, json={'model': 'dummy', 'response': 'Because it is.', 'done': True})
+
+  cache = ResponseCache()
+  client = Client(transport=httpx.MockTransport(handler), response_cache=cache)
+
+  for _ in range(2):
+    assert client.generate('dummy', 'Why is the sky blue?', options={'seed': 42})['response'] == 'Because it is.'
+  assert len(requests) == 1
+
+  assert [part['response'] for part in client.generate('dummy', 'Why is the sky blue?', options={'seed': 42}, stream=True)] == ['Because it is.']
+  assert len(requests) == 1
+
+  for _ in range(2):
+    assert [part['response'] for part in client.generate('dummy', 'Why is the sky blue?', options={'temperature': 0}, stream=True)] == ['Because', ' it', ' is.']
+  assert len(requests) == 2
+
+  client.generate('dummy', 'Why is the sky blue?')
+  client.generate('dummy', 'Why is the sky blue?')
+  assert len(requests) == 4
+  assert cache.stats() == {'hits': 3, 'misses': 2}
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite', 'directory'])
+def test_response_cache_backends(backend, tmp_path, monkeypatch):
+  def make(max_bytes, ttl=None):
+    if backend == 'memory':
+      return MemoryBackend(max_bytes=max_bytes, ttl=ttl)
+    if backend == 'sqlite':
+      return SQLiteBackend(tmp_path / f'{max_bytes}-{ttl}.db', max_bytes=max_bytes, ttl=ttl)
+    return DirectoryBackend(tmp_path / f'{max_bytes}-{ttl}', max_bytes=max_bytes, ttl=ttl)
+
+  store = make(max_bytes=20)
+  store.put('aa', b'x' * 10)
+  store.put('bb', b'y' * 10)
+  now = time.time()
+  monkeypatch.setattr(time, 'time', lambda: now + 10)
+  assert store.get('aa') == b'x' * 10
+  store.put('cc', b'z' * 10)
+  assert store.get('bb') is None
+  assert store.get('aa') == b'x' * 10
+  store.put('dd', b'w' * 30)
+  assert store.get('dd') is None
+
+  store = make(max_bytes=100, ttl=60)
+  store.put('aa', b'x')
+  monkeypatch.setattr(time, 'time', lambda: now + 120)
+  assert store.get('aa') is None
+
+
+def test_client_retry():
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request.url.path)
+    if len(requests) < 3:
+      return httpx.Response(503, json={'error': 'server busy, please try again'}, headers={'Retry-After': '0'})
+    return httpx.Response(200, json={'model': 'dummy', 'message': {'role': 'assistant', 'content': 'Because.'}})
+
+  client = Client(transport=httpx.MockTransport(handler), retry=RetryPolicy(backoff=0))
+  assert client.chat('dummy', messages=[{'role': 'user', 'content': 'Why?'}])['message']['content'] == 'Because.'
+  assert requests == ['/api/chat'] * 3
+
+  requests.clear()
+  with pytest.raises(ResponseError) as e:
+    client.pull('dummy')
+  assert e.value.status_code == 503
+  assert e.value.retry_after == 0
+  assert requests == ['/api/pull']
+
+
+def test_client_retry_stream():
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+
+    def lines():
+      if len(requests) == 1:
+        yield b'{"error": "llm server loading model"}\n'
+        return
+      yield json.dumps({'model': 'dummy', 'response': 'Because', 'done': False}).encode() + b'\n'
+      raise httpx.ReadError('connection reset')
+
+    return httpx.Response(200, content=lines())
+
+  client = Client(transport=httpx.MockTransport(handler), retry=RetryPolicy(backoff=0))
+  parts = client.generate('dummy', 'Why?', stream=True)
+  assert next(parts)['response'] == 'Because'
+  with pytest.raises(httpx.ReadError):
+    next(parts)
+  assert len(requests) == 2
+
+
+def test_client_circuit_breaker(monkeypatch):
+  down = True
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    if down:
+      raise httpx.ConnectError('connection refused', request=request)
+    return httpx.Response(200, json={'models': []})
+
+  breaker = CircuitBreaker(failures=2, reset=30)
+  client = Client('http://gpu-1:11434', transport=httpx.MockTransport(handler), breaker=breaker)
+  for _ in range(2):
+    with pytest.raises(httpx.ConnectError):
+      client.ps()
+
+  with pytest.raises(CircuitOpenError) as e:
+    client.ps()
+  assert len(requests) == 2
+  assert 0 < e.value.retry_after <= 30
+  assert breaker.stats() == {'http://gpu-1:11434': 'open'}
+
+  now = time.monotonic()
+  monkeypatch.setattr(time, 'monotonic', lambda: now + 31)
+  down = False
+  assert client.ps() == {'models': []}
+  assert breaker.stats() == {'http://gpu-1:11434': 'closed'}
+
+
+def test_client_admission_priority():
+  order = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    order.append(json.loads(request.content)['prompt'])
+    return httpx.Response(200, json={'model': 'dummy', 'response': 'ok'})
+
+  admission = AdmissionController(per_model=1)
+  batch = Client(transport=httpx.MockTransport(handler), admission=admission, priority=AdmissionController.BATCH)
+  interactive = Client(transport=httpx.MockTransport(handler), admission=admission)
+
+  admission.acquire('dummy')
+  with ThreadPoolExecutor(max_workers=4) as executor:
+    futures = [executor.submit(batch.generate, 'dummy', f'batch {i}') for i in range(3)]
+    while admission.stats()['queued'] < 3:
+      time.sleep(0.001)
+    futures.append(executor.submit(interactive.generate, 'dummy', 'interactive'))
+    while admission.stats()['queued'] < 4:
+      time.sleep(0.001)
+    admission.release('dummy')
+    [future.result() for future in futures]
+
+  assert order == ['interactive', 'batch 0', 'batch 1', 'batch 2']
+  stats = admission.stats()
+  assert stats['admitted'] == 5
+  assert stats['in_flight'] == stats['queued'] == 0
+
+
+def test_admission_model_names_and_queue_cleanup():
+  admission = AdmissionController(per_model=1, limits={'big': 2})
+  assert admission.limits == {'big:latest': 2}
+
+  admission.acquire('llama3')
+  with pytest.raises(RequestError):
+    admission.acquire('llama3:latest', timeout=0.01)
+  assert admission.stats()['models'] == {'llama3:latest': 1}
+
+  for _ in range(20):
+    with pytest.raises(RequestError):
+      admission.acquire('llama3', timeout=0)
+  admission.release('llama3:latest')
+  assert admission._queues == {}
+
+  with admission.slot('big'), admission.slot('big:latest'):
+    assert admission.stats()['models'] == {'big:latest': 2}
+  assert admission.stats()['models'] == {}
+
+
+def test_client_admission_deadline():
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    return httpx.Response(200, json={'model': 'dummy', 'embeddings': [[0.5]]})
+
+  admission = AdmissionController(max_concurrency=1)
+  client = Client(transport=httpx.MockTransport(handler), admission=admission, deadline=0.01)
+
+  with admission.slot('other'):
+    with pytest.raises(RequestError):
+      client.embed('dummy', 'hello')
+  assert client.embed('dummy', 'hello')['embeddings'] == [[0.5]]
+  assert len(requests) == 1
+  assert admission.stats()['dropped'] == 1
+
+
+class RecordingHook(Hook):
+  def __init__(self):
+    self.events = []
+    self.calls = []
+
+  def on_request(self, call):
+    self.events.append('request')
+    self.calls.append(call)
+
+  def on_first_byte(self, call):
+    self.events.append('first_byte')
+
+  def on_first_token(self, call):
+    self.events.append('first_token')
+
+  def on_chunk(self, call, chunk):
+    self.events.append('chunk')
+
+  def on_done(self, call):
+    self.events.append('done')
+
+  def on_error(self, call, error):
+    self.events.append(type(error).__name__)
+
+
+def generate_stream_handler(request: httpx.Request) -> httpx.Response:
+  payload = json.loads(request.content)
+  if payload['model'] == 'missing':
+    return httpx.Response(404, json={'error': 'model not found'})
+
+  lines = [
+    {'model': 'dummy', 'response': '', 'done': False},
+    {'model': 'dummy', 'response': 'Because', 'done': False},
+    {'model': 'dummy', 'response': ' it is.', 'done': False},
+    {'model': 'dummy', 'response': '', 'done': True, 'total_duration': 3_000_000_000, 'load_duration': 1_000_000_000, 'prompt_eval_count': 5, 'prompt_eval_duration': 500_000_000, 'eval_count': 3, 'eval_duration': 1_500_000_000},
+  ]
+  if not payload['stream']:
+    return httpx.Response(200, json=lines[-1])
+  return httpx.Response(200, content=''.join(json.dumps(line) + '\n' for line in lines))
+
+
+def test_client_hooks():
+  hook = RecordingHook()
+  client = Client(transport=httpx.MockTransport(generate_stream_handler), hooks=[hook])
+
+  assert ''.join(part['response'] for part in client.generate('dummy', 'Why?', stream=True)) == 'Because it is.'
+  assert hook.events == ['request', 'first_byte', 'chunk', 'first_token', 'chunk', 'chunk', 'chunk', 'done']
+  call = hook.calls[0]
+  assert (call.url, call.model, call.stream, call.chunks) == ('/api/generate', 'dummy', True, 4)
+  assert 0 <= call.time_to_first_byte <= call.time_to_first_token <= call.duration
+  assert call.tokens_per_second == 2.0
+
+  hook.events.clear()
+  with pytest.raises(ResponseError):
+    client.generate('missing', 'Why?')
+  assert hook.events == ['request', 'first_byte', 'ResponseError']
+
+  hook.events.clear()
+  parts = client.generate('dummy', 'Why?', stream=True)
+  assert next(parts)['response'] == ''
+  parts.close()
+  assert hook.events == ['request', 'first_byte', 'chunk', 'GeneratorExit']
+
+
+def test_client_otel_hook():
+  pytest.importorskip('opentelemetry.sdk')
+  from opentelemetry.sdk.metrics import MeterProvider
+  from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+  from opentelemetry.sdk.trace import TracerProvider
+  from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+  from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+  spans, reader = InMemorySpanExporter(), InMemoryMetricReader()
+  tracer_provider = TracerProvider()
+  tracer_provider.add_span_processor(SimpleSpanProcessor(spans))
+  hook = OpenTelemetryHook(tracer_provider=tracer_provider, meter_provider=MeterProvider(metric_readers=[reader]))
+
+  client = Client(transport=httpx.MockTransport(generate_stream_handler), hooks=[hook])
+  list(client.generate('dummy', 'Why?', stream=True))
+
+  (span,) = spans.get_finished_spans()
+  assert span.name == 'ollama text_completion'
+  assert span.attributes['gen_ai.request.model'] == 'dummy'
+  assert span.attributes['ollama.load_duration'] == 1.0
+  assert span.attributes['gen_ai.usage.output_tokens'] == 3
+  assert [event.name for event in span.events] == ['gen_ai.first_token']
+
+  metrics = {metric.name for resource in reader.get_metrics_data().resource_metrics for scope in resource.scope_metrics for metric in scope.metrics}
+  assert {'gen_ai.client.operation.duration', 'ollama.client.time_to_first_token', 'ollama.client.tokens_per_second', 'ollama.server.eval_duration'} <= metrics
+
+
+def pool_handler(loaded, down=()):
+  "Serves `/api/ps` with the models in `loaded` per host, and fails to connect to the hosts in `down`."
+  requests = []
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    host = request.url.host
+    if host in down:
+      raise httpx.ConnectError('connection refused', request=request)
+    if request.url.path == '/api/ps':
+      return httpx.Response(200, json={'models': [{'name': name} for name in loaded.get(host, [])]})
+
+    requests.append((host, request.url.path))
+    payload = json.loads(request.content)
+    if payload.get('stream'):
+      return httpx.Response(200, content=json.dumps({'model': payload['model'], 'message': {'role': 'assistant', 'content': host}, 'done': True}) + '\n')
+    return httpx.Response(200, json={'model': payload['model'], 'response': host, 'embeddings': [[0.5]]})
+
+  return handler, requests
+
+
+def test_pooled_client_affinity():
+  handler, requests = pool_handler({'b': ['llama3:latest']})
+  client = PooledClient(['http://a:11434', 'http://b:11434'], transport=httpx.MockTransport(handler))
+
+  assert [client.generate('llama3', 'Why?')['response'] for _ in range(3)] == ['b', 'b', 'b']
+  client.embed('all-minilm', 'hello')
+  assert requests[-1] == ('a', '/api/embed')
+
+  stats = {host['host']: host for host in client.stats()}
+  assert stats['http://a:11434']['models'] == ['all-minilm:latest']
+  assert stats['http://b:11434']['models'] == ['llama3:latest']
+  assert stats['http://b:11434']['outstanding'] == 0
+
+  client = PooledClient(['http://a:11434', 'http://b:11434'], strategy='least_outstanding', transport=httpx.MockTransport(handler))
+  assert [client.generate('llama3', 'Why?')['response'] for _ in range(4)] == ['a', 'b', 'a', 'b']
+
+
+def test_pooled_client_failover():
+  down = {'a'}
+  handler, requests = pool_handler({}, down)
+  client = PooledClient(['http://a:11434', 'http://b:11434'], strategy='least_outstanding', check_interval=None, max_failures=2, transport=httpx.MockTransport(handler))
+
+  assert [client.generate('llama3', 'Why?')['response'] for _ in range(4)] == ['b', 'b', 'b', 'b']
+  assert [host['up'] for host in client.stats()] == [False, True]
+
+  down.clear()
+  client.check()
+  assert [host['up'] for host in client.stats()] == [True, True]
+  assert client.generate('llama3', 'Why?')['response'] == 'a'
+
+  down.update({'a', 'b'})
+  with pytest.raises(httpx.ConnectError):
+    client.generate('llama3', 'Why?')
+
+
+def embed_handler(request: Request):
+  texts = json.loads(request.data)['input']
+  return Response(json.dumps({'model': 'dummy', 'embeddings': [[float(text), 0.5] for text in texts]}))
+
+
+def test_client_embed_many(httpserver: HTTPServer):
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  client = Client(httpserver.url_for('/'))
+  response = client.embed_many('dummy', (str(i) for i in range(10)), batch_size=3, concurrency=2)
+  assert response == [[float(i), 0.5] for i in range(10)]
+  assert [len(json.loads(request.data)['input']) for request, _ in httpserver.log] == [3, 3, 3, 1]
+
+
+def test_client_embed_many_single_string(httpserver: HTTPServer):
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  client = Client(httpserver.url_for('/'))
+  assert client.embed_many('dummy', '12') == [[12.0, 0.5]]
+  assert json.loads(httpserver.log[-1][0].data)['input'] == ['12']
+
+
+def test_client_embed_many_numpy(httpserver: HTTPServer):
+  numpy = pytest.importorskip('numpy')
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  client = Client(httpserver.url_for('/'))
+  response = client.embed_many('dummy', [str(i) for i in range(10)], batch_size=4, output='numpy')
+  assert response.dtype == numpy.float32
+  assert response.shape == (10, 2)
+  assert response.flags['C_CONTIGUOUS']
+  assert response[:, 0].tolist() == list(range(10))
+
+
+def test_client_embed_numpy(httpserver: HTTPServer):
+  numpy = pytest.importorskip('numpy')
+  httpserver.expect_request('/api/embed', method='POST').respond_with_data(
+    b'{"model":"dummy","embeddings":[[1,2.5,-3e-1],[4,0.125,6]],"total_duration":7}',
+  )
+
+  client = Client(httpserver.url_for('/'))
+  response = client.embed('dummy', ['a', 'b'], output='numpy')
+  assert response['embeddings'].dtype == numpy.float32
+  assert response['embeddings'].tolist() == numpy.array([[1, 2.5, -0.3], [4, 0.125, 6]], dtype=numpy.float32).tolist()
+  assert response['total_duration'] == 7
+
+
+def test_client_embed_numpy_empty(httpserver: HTTPServer):
+  pytest.importorskip('numpy')
+  httpserver.expect_request('/api/embed', method='POST').respond_with_json({'model': 'dummy', 'embeddings': []})
+
+  client = Client(httpserver.url_for('/'))
+  assert client.embed('dummy', [], output='numpy')['embeddings'].shape == (0, 0)
+
+
+def test_client_embed_cache(httpserver: HTTPServer):
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  cache = EmbeddingCache()
+  client = Client(httpserver.url_for('/'), cache=cache)
+  assert client.embed('dummy', ['1', '2'])['embeddings'] == [[1.0, 0.5], [2.0, 0.5]]
+  assert client.embed('dummy', ['2', '3', '1', '3'])['embeddings'] == [[2.0, 0.5], [3.0, 0.5], [1.0, 0.5], [3.0, 0.5]]
+  assert client.embed('dummy', '3') == {'model': 'dummy', 'embeddings': [[3.0, 0.5]]}
+
+  # Only the distinct misses go upstream
+  assert [json.loads(request.data)['input'] for request, _ in httpserver.log] == [['1', '2'], ['3']]
+  assert cache.stats()['hits'] == 3
+
+
+def test_client_embed_cache_persistent(httpserver: HTTPServer):
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  with tempfile.TemporaryDirectory() as temp:
+    path = Path(temp) / 'embeddings.db'
+    Client(httpserver.url_for('/'), cache=EmbeddingCache(path)).embed('dummy', ['1', '2'])
+
+    cache = EmbeddingCache(path)
+    response = Client(httpserver.url_for('/'), cache=cache).embed('dummy', ['2', '1'])
+    assert response['embeddings'] == [[2.0, 0.5], [1.0, 0.5]]
+    assert len(httpserver.log) == 1
+    assert cache.stats()['disk_hits'] == 2
+    cache.close()
+
+
 @pytest.mark.asyncio
 async def test_async_client_chat(httpserver: HTTPServer):
   httpserver.expect_ordered_request(
@@ -584,6 +1367,26 @@ async def test_async_client_chat_stream(httpserver: HTTPServer):
     assert part['message']['content'] == next(it)
 
 
+@pytest.mark.asyncio
+async def test_async_client_chat_stream_partial(httpserver: HTTPServer):
+  def stream_handler(_: Request):
+    def generate():
+      yield json.dumps({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'I '}, 'done': False}) + '\n'
+      yield json.dumps({'model': 'dummy', 'message': {'role': 'assistant', 'content': ''}, 'done': True, 'eval_count': 1}) + '\n'
+
+    return Response(generate())
+
+  httpserver.expect_ordered_request('/api/chat', method='POST').respond_with_handler(stream_handler)
+
+  client = AsyncClient(httpserver.url_for('/'), decoder=Decoder('json', partial=True))
+  response = await client.chat('dummy', messages=[{'role': 'user', 'content': 'Why is the sky blue?'}], stream=True)
+
+  assert [part async for part in response] == [
+    {'message': {'content': 'I '}, 'done': False},
+    {'message': {'content': ''}, 'done': True},
+  ]
+
+
 @pytest.mark.asyncio
 async def test_async_client_chat_images(httpserver: HTTPServer):
   httpserver.expect_ordered_request(
@@ -640,6 +1443,24 @@ async def test_async_client_generate(httpserver: HTTPServer):
   assert isinstance(response, dict)
 
 
+@pytest.mark.asyncio
+async def test_async_client_generate_records(httpserver: HTTPServer):
+  httpserver.expect_ordered_request('/api/generate', method='POST').respond_with_json(
+    {
+      'model': 'dummy',
+      'response': 'Because it is.',
+      'done': True,
+      'context': [1, 2, 3],
+    }
+  )
+
+  client = AsyncClient(httpserver.url_for('/'), records=True)
+  response = await client.generate('dummy', 'Why is the sky blue?')
+  assert isinstance(response, GenerateRecord)
+  assert response == {'model': 'dummy', 'response': 'Because it is.', 'done': True, 'context': [1, 2, 3]}
+  assert response.context == [1, 2, 3]
+
+
 @pytest.mark.asyncio
 async def test_async_client_generate_stream(httpserver: HTTPServer):
   def stream_handler(_: Request):
@@ -992,3 +1813,276 @@ async def test_async_client_create_blob_exists(httpserver: HTTPServer):
   with tempfile.NamedTemporaryFile() as blob:
     response = await client._create_blob(blob.name)
     assert response == 'sha256:e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+
+
+@pytest.mark.asyncio
+async def test_async_client_create_blob_progress(httpserver: HTTPServer):
+  httpserver.expect_ordered_request(PrefixPattern('/api/blobs/'), method='HEAD').respond_with_response(Response(status=404))
+  httpserver.expect_ordered_request(PrefixPattern('/api/blobs/'), method='POST').respond_with_response(Response(status=201))
+
+  client = AsyncClient(httpserver.url_for('/'), digests=DigestCache())
+
+  updates = []
+  with tempfile.NamedTemporaryFile() as blob:
+    blob.write(b'x' * 100)
+    blob.flush()
+    response = await client._create_blob(blob.name, progress=updates.append)
+
+  assert httpserver.log[-1][0].data == b'x' * 100
+  assert updates[-1] == {'status': f'uploading {response}', 'digest': response, 'total': 100, 'completed': 100}
+
+
+@pytest.mark.asyncio
+async def test_async_client_create_blobs_concurrently():
+  in_flight, peak, created = 0, 0, []
+
+  async def handler(request: httpx.Request) -> httpx.Response:
+    nonlocal in_flight, peak
+    if request.method == 'HEAD':
+      return httpx.Response(404)
+    if request.method == 'POST' and request.url.path.startswith('/api/blobs/'):
+      in_flight += 1
+      peak = max(peak, in_flight)
+      await asyncio.sleep(0.01)
+      in_flight -= 1
+      return httpx.Response(201)
+    created.append(json.loads(request.content)['modelfile'])
+    return httpx.Response(200, json={'status': 'success'})
+
+  client = AsyncClient(transport=httpx.MockTransport(handler), digests=DigestCache())
+
+  with tempfile.TemporaryDirectory() as directory:
+    for name in ('model.gguf', 'a.gguf', 'b.gguf'):
+      Path(directory, name).write_text(name)
+
+    await client.create('dummy', modelfile=f'FROM {directory}/model.gguf\nADAPTER {directory}/a.gguf\nADAPTER {directory}/b.gguf\n', concurrency=2)
+
+  assert peak == 2
+  assert created[0].startswith('FROM @sha256:')
+  assert created[0].count('ADAPTER @sha256:') == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_generate_stream_body(httpserver: HTTPServer):
+  httpserver.expect_ordered_request(
+    '/api/generate',
+    method='POST',
+    json={
+      'model': 'dummy',
+      'prompt': 'Why is the sky blue?',
+      'suffix': '',
+      'system': '',
+      'template': '',
+      'context': [],
+      'stream': False,
+      'raw': False,
+      'images': ['b2xsYW1h'],
+      'format': '',
+      'options': {},
+      'keep_alive': None,
+    },
+  ).respond_with_json({'model': 'dummy', 'response': 'Because it is.'})
+
+  client = AsyncClient(httpserver.url_for('/'), stream_body=True)
+  response = await client.generate('dummy', 'Why is the sky blue?', images=[b'ollama'])
+  assert response['response'] == 'Because it is.'
+
+
+@pytest.mark.asyncio
+async def test_async_client_single_flight():
+  flights = SingleFlight()
+  requests = []
+
+  async def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    await asyncio.sleep(0.05)
+    if json.loads(request.content)['model'] == 'missing':
+      return httpx.Response(404, text='model not found')
+    return httpx.Response(200, json={'model': 'dummy', 'embeddings': [[0.1, 0.2]]})
+
+  client = AsyncClient(transport=httpx.MockTransport(handler), single_flight=flights)
+
+  responses = await asyncio.gather(*[client.embed('dummy', 'Why is the sky blue?') for _ in range(5)])
+  assert [response['embeddings'] for response in responses] == [[[0.1, 0.2]]] * 5
+  assert len(requests) == 1
+
+  errors = await asyncio.gather(*[client.embed('missing', 'Why is the sky blue?') for _ in range(3)], return_exceptions=True)
+  assert all(isinstance(error, ResponseError) and error.status_code == 404 for error in errors)
+  assert len(requests) == 2
+  assert flights.stats() == {'hits': 6, 'misses': 2, 'in_flight': 0}
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_stream_abandoned():
+  flights = SingleFlight()
+  started, closed = [], []
+
+  async def source():
+    started.append(True)
+    try:
+      for i in range(5):
+        yield i
+    finally:
+      closed.append(True)
+
+  stream = flights.astream('key', source)
+  assert await stream.__anext__() == 0
+  await stream.aclose()
+  assert closed == [True]
+  assert flights.stats()['in_flight'] == 0
+
+  assert [i async for i in flights.astream('key', source)] == [0, 1, 2, 3, 4]
+  assert len(started) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_retry_stream():
+  requests = []
+
+  async def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    if len(requests) == 1:
+      raise httpx.ConnectError('connection refused', request=request)
+    return httpx.Response(200, content=json.dumps({'model': 'dummy', 'message': {'role': 'assistant', 'content': 'Because.'}, 'done': True}) + '\n')
+
+  client = AsyncClient(transport=httpx.MockTransport(handler), retry=RetryPolicy(backoff=0))
+  parts = [part async for part in await client.chat('dummy', messages=[{'role': 'user', 'content': 'Why?'}], stream=True)]
+  assert [part['message']['content'] for part in parts] == ['Because.']
+  assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_admission():
+  async def handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=json.dumps({'model': 'dummy', 'response': 'ok', 'done': True}) + '\n')
+
+  admission = AdmissionController(per_model=1)
+  client = AsyncClient(transport=httpx.MockTransport(handler), admission=admission)
+
+  # A slot held by a thread holds up the event loop's requests too
+  admission.acquire('dummy')
+  threading.Timer(0.05, admission.release, ('dummy',)).start()
+  parts = [part async for part in await client.generate('dummy', 'Why?', stream=True)]
+  assert [part['response'] for part in parts] == ['ok']
+  assert admission.stats()['max_wait_seconds'] > 0.01
+  assert admission.stats()['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_client_hooks():
+  hook = RecordingHook()
+  client = AsyncClient(transport=httpx.MockTransport(generate_stream_handler), hooks=[hook, OpenTelemetryHook()])
+
+  assert (await client.generate('dummy', 'Why?'))['done'] is True
+  assert hook.events == ['request', 'first_byte', 'done']
+  assert hook.calls[0].final['response'] == ''
+
+  hook.events.clear()
+  parts = [part async for part in await client.generate('dummy', 'Why?', stream=True)]
+  assert len(parts) == 4
+  assert hook.events == ['request', 'first_byte', 'chunk', 'first_token', 'chunk', 'chunk', 'chunk', 'done']
+
+
+@pytest.mark.asyncio
+async def test_async_pooled_client():
+  handler, requests = pool_handler({'b': ['llava:latest']}, down={'c'})
+  client = AsyncPooledClient(['http://a:11434', 'http://b:11434', 'http://c:11434'], transport=httpx.MockTransport(handler))
+
+  parts = [part async for part in await client.chat('llava', messages=[{'role': 'user', 'content': 'Why?'}], stream=True)]
+  assert [part['message']['content'] for part in parts] == ['b']
+  assert (await client.generate('llama3', 'Why?'))['response'] == 'a'
+  assert [host['up'] for host in client.stats()] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_async_client_response_cache():
+  requests = []
+
+  async def handler(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    lines = [{'model': 'dummy', 'message': {'role': 'assistant', 'content': token}, 'done': False} for token in ('Because', ' it', ' is.')]
+    return httpx.Response(200, content=''.join(json.dumps(line) + '\n' for line in lines))
+
+  client = AsyncClient(transport=httpx.MockTransport(handler), response_cache=ResponseCache())
+
+  for _ in range(2):
+    parts = [part async for part in await client.chat('dummy', messages=[{'role': 'user', 'content': 'Why?'}], options={'seed': 42}, stream=True)]
+    assert [part['message']['content'] for part in parts] == ['Because', ' it', ' is.']
+  assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_embed_many(httpserver: HTTPServer):
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  client = AsyncClient(httpserver.url_for('/'))
+  response = await client.embed_many('dummy', (str(i) for i in range(10)), batch_size=2, concurrency=2)
+  assert response == [[float(i), 0.5] for i in range(10)]
+  assert len(httpserver.log) == 5
+
+
+@pytest.mark.asyncio
+async def test_async_client_embed_many_single_string(httpserver: HTTPServer):
+  httpserver.expect_request('/api/embed', method='POST').respond_with_handler(embed_handler)
+
+  client = AsyncClient(httpserver.url_for('/'))
+  assert await client.embed_many('dummy', '12') == [[12.0, 0.5]]
+
+
+@pytest.mark.asyncio
+async def test_async_client_embeddings_cache(httpserver: HTTPServer):
+  httpserver.expect_oneshot_request('/api/embeddings', method='POST').respond_with_json({'embedding': [0.1, 0.2]})
+
+  client = AsyncClient(httpserver.url_for('/'), cache=EmbeddingCache())
+  assert await client.embeddings('dummy', 'hello') == {'embedding': [0.1, 0.2]}
+  assert await client.embeddings('dummy', 'hello') == {'embedding': [0.1, 0.2]}
+  assert len(httpserver.log) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_create_blob_reads_off_event_loop(monkeypatch):
+  loop_thread = threading.get_ident()
+  reads = []
+
+  def read_chunks(path, chunk_size=8 * 1024 * 1024):
+    reads.append(threading.get_ident())
+    yield Path(path).read_bytes()
+
+  monkeypatch.setattr('ollama._blob.read_chunks', read_chunks)
+
+  async def handler(request: httpx.Request) -> httpx.Response:
+    if request.method == 'HEAD':
+      return httpx.Response(404)
+    assert await request.aread() == b'x' * 100
+    return httpx.Response(201)
+
+  client = AsyncClient(transport=httpx.MockTransport(handler), digests=DigestCache())
+  with tempfile.NamedTemporaryFile() as blob:
+    blob.write(b'x' * 100)
+    blob.flush()
+    await client._create_blob(blob.name)
+
+  assert reads and loop_thread not in reads
+
+
+@pytest.mark.asyncio
+async def test_aiter_json_reads_image_files_off_event_loop(monkeypatch):
+  from ollama._body import Base64, aiter_json, iter_json
+
+  loop_thread = threading.get_ident()
+  reads = []
+  chunks = Base64.chunks
+
+  def recording_chunks(self):
+    reads.append(threading.get_ident())
+    return chunks(self)
+
+  monkeypatch.setattr(Base64, 'chunks', recording_chunks)
+
+  with tempfile.NamedTemporaryFile() as image:
+    image.write(b'ollama')
+    image.flush()
+    body = {'messages': [{'content': 'hi', 'images': [Base64(Path(image.name))]}]}
+    assert b''.join([chunk async for chunk in aiter_json(body)]) == b''.join(iter_json(body))
+
+  assert reads[0] != loop_thread
@@ -0,0 +1,146 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.schemas import MessageCreate, ThreadCreate, UserCreate
+from models.models import Base
+from services.context_builder import ContextCache, ThreadWindow, context_cache, estimate_tokens
+import services.message_service
+from services.context_service import ContextService
+from services.message_service import MessageService
+from services.thread_service import ThreadService
+from services.user_service import UserService
+
+
+def rows(*messages):
+    """Oldest-first (created_at, id, role, content) rows; `messages` are (created_at, id) pairs."""
+    return [(created_at, message_id, "user", f"content of {message_id} " * 5) for created_at, message_id in messages]
+
+
+def newest_first(oldest_first):
+    return list(reversed(oldest_first))
+
+
+def contents(window, budget=None):
+    return [message["content"] for message in window.select(budget or window.budget)[0]]
+
+
+THREAD = rows((1, "a"), (1, "c"), (2, "b"), (3, "d"), (3, "e"), (4, "f"))
+ENTRY_TOKENS = estimate_tokens(THREAD[0][3])
+
+
+@pytest.mark.parametrize("split", range(len(THREAD)))
+def test_append_matches_full_build(split):
+    budget = ENTRY_TOKENS * 4
+    full = ThreadWindow.from_newest(newest_first(THREAD), budget, exhausted=True)
+
+    window = ThreadWindow.from_newest(newest_first(THREAD[:split]), budget, exhausted=True)
+    # Re-read from the newest second like `appended_messages_query`, so some rows are already known
+    window.append([row for row in THREAD if window.newest is None or row[0] >= window.newest[0]])
+
+    assert list(window.entries) == list(full.entries)
+    assert window.tokens == full.tokens
+    assert window.newest == full.newest == (4, "f")
+
+
+def test_append_merges_rows_within_the_same_second():
+    window = ThreadWindow.from_newest(newest_first(rows((1, "b"))), ENTRY_TOKENS * 10, exhausted=True)
+    window.append(rows((1, "a"), (1, "b"), (2, "c")))
+    assert [entry[0] for entry in window.entries] == [(1, "a"), (1, "b"), (2, "c")]
+    assert window.complete
+
+
+def test_budget_drops_oldest_messages_first():
+    window = ThreadWindow.from_newest(newest_first(THREAD[:3]), ENTRY_TOKENS * 3, exhausted=True)
+    assert window.complete
+
+    window.append(THREAD[3:5])
+    assert [entry[0] for entry in window.entries] == [(2, "b"), (3, "d"), (3, "e")]
+    assert window.tokens <= window.budget
+    assert not window.complete
+
+    messages, tokens, truncated = window.select(ENTRY_TOKENS * 2)
+    assert messages == [{"role": "user", "content": THREAD[3][3]}, {"role": "user", "content": THREAD[4][3]}]
+    assert tokens == ENTRY_TOKENS * 2
+    assert truncated
+
+
+def test_from_newest_stops_at_first_message_over_budget():
+    window = ThreadWindow.from_newest(newest_first(THREAD), ENTRY_TOKENS * 2, exhausted=True)
+    assert [entry[0] for entry in window.entries] == [(3, "e"), (4, "f")]
+    assert not window.complete
+    assert window.newest == (4, "f")
+
+
+def test_cache_append_widens_complete_windows_only():
+    cache = ContextCache()
+    complete = ThreadWindow.from_newest(newest_first(THREAD[:2]), ENTRY_TOKENS * 2, exhausted=True)
+    cache.append(complete, THREAD[2:4], ENTRY_TOKENS * 10)
+    assert complete.budget == ENTRY_TOKENS * 10
+    assert len(complete.entries) == 4
+
+    partial = ThreadWindow.from_newest(newest_first(THREAD[:3]), ENTRY_TOKENS * 2, exhausted=True)
+    assert not partial.complete
+    cache.append(partial, THREAD[3:4], ENTRY_TOKENS * 10)
+    assert partial.budget == ENTRY_TOKENS * 2
+    assert [entry[0] for entry in partial.entries] == [(2, "b"), (3, "d")]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ContextCache(max_threads=2)
+    for thread_id in ("t1", "t2"):
+        cache.put(thread_id, ThreadWindow(10))
+    cache.get("t1")
+    cache.put("t3", ThreadWindow(10))
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None
+
+    cache.invalidate("t1")
+    assert cache.get("t1") is None
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'context.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_context_service_keeps_system_prompt_and_sees_new_messages(db, monkeypatch):
+    # One message per second, so the thread's order is the order they are added in
+    clock = itertools.count(1000)
+    monkeypatch.setattr(services.message_service, "time", SimpleNamespace(time=lambda: next(clock)))
+    user = UserService(db).create_user(UserCreate(name="Test"))
+    thread = ThreadService(db).create_thread(ThreadCreate(participant_ids=[user.id]))
+    messages = MessageService(db)
+
+    def add(content):
+        messages.create_message(MessageCreate(content=content, thread_id=thread.id, sender_id=user.id))
+
+    system_prompt = "You are terse. " * 10
+    budget = estimate_tokens(system_prompt) + estimate_tokens("x" * 40) * 2
+
+    add("x" * 40)
+    context = ContextService(db).get_context(thread.id, budget, system_prompt)
+    assert context.messages[0] == {"role": "system", "content": system_prompt}
+    assert [m["content"] for m in context.messages[1:]] == ["x" * 40]
+    window = context_cache.get(thread.id)
+    assert window is not None
+
+    add("y" * 40)
+    add("z" * 40)
+    context = ContextService(db).get_context(thread.id, budget, system_prompt)
+    assert context_cache.get(thread.id) is window
+    assert context.messages[0]["role"] == "system"
+    assert [m["content"] for m in context.messages[1:]] == ["y" * 40, "z" * 40]
+    assert context.token_count <= budget
+    assert context.truncated
+
+    ThreadService(db).delete_thread(thread.id)
+    assert context_cache.get(thread.id) is None
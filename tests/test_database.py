@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError
+
+from api.app import create_app
+from db.database import TimedQueuePool, create_db_engine, pool_options, pool_status
+
+
+def test_pool_options_sqlite_keeps_default_pool(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    options = pool_options("sqlite:///app.db")
+    assert options == {"pool_pre_ping": True, "pool_recycle": 1800}
+
+
+def test_pool_options_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "60")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    assert pool_options("mysql+pymysql://user@db/app") == {
+        "pool_pre_ping": False,
+        "pool_recycle": 60,
+        "pool_size": 3,
+        "max_overflow": 0,
+        "pool_timeout": 2.5,
+    }
+
+
+def test_timed_pool_records_waits_and_timeouts(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool,
+                              pool_size=1, max_overflow=0, pool_timeout=0.1)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(TimeoutError):
+            engine.connect()
+
+        status = pool_status(engine)
+        assert status["pool"] == "TimedQueuePool"
+        assert status["size"] == 1
+        assert status["checked_out"] == 1
+        assert status["checkouts"] == 2
+        assert status["timeouts"] == 1
+        assert status["wait_time_max"] >= 0.1
+        assert status["wait_time_avg"] == pytest.approx(status["wait_time_total"] / 2)
+
+    assert pool_status(engine)["checked_in"] == 1
+    engine.dispose()
+
+
+def test_pool_status_route():
+    client = TestClient(create_app(init_db=False))
+    response = client.get("/db/pool")
+    assert response.status_code == 200
+    assert "pool" in response.json()["sync"]
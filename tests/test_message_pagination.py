@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import services.message_service
+from api.app import create_test_app
+
+client = TestClient(create_test_app())
+
+
+@pytest.fixture(scope="module")
+def thread():
+    """A thread of five messages, the first three created in the same second."""
+    user = client.post("/v1/users", json={"name": "Pager"}).json()
+    thread = client.post("/v1/threads", json={"participant_ids": [user["id"]]}).json()
+
+    clock = iter([1000, 1000, 1000, 1001, 1002])
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(services.message_service, "time", SimpleNamespace(time=lambda: next(clock)))
+        messages = [
+            client.post("/v1/messages", json={"content": f"message {i}", "thread_id": thread["id"],
+                                              "sender_id": user["id"], "role": "user"}).json()
+            for i in range(5)
+        ]
+
+    thread["ids"] = [m["id"] for m in sorted(messages, key=lambda m: (m["created_at"], m["id"]))]
+    return thread
+
+
+def list_messages(thread_id, **params):
+    return client.get(f"/v1/threads/{thread_id}/messages", params=params)
+
+
+def ids(response):
+    assert response.status_code == 200, response.text
+    return [message["id"] for message in response.json()["data"]]
+
+
+def test_order_asc_and_desc(thread):
+    assert ids(list_messages(thread["id"])) == thread["ids"]
+    assert ids(list_messages(thread["id"], order="desc")) == thread["ids"][::-1]
+
+
+def test_ties_on_created_at_are_ordered_by_id(thread):
+    page = list_messages(thread["id"], limit=3).json()
+    assert {m["created_at"] for m in page["data"]} == {1000}
+    assert [m["id"] for m in page["data"]] == sorted(m["id"] for m in page["data"])
+
+
+def test_after_and_before_keep_requested_order(thread):
+    expected = thread["ids"]
+    assert ids(list_messages(thread["id"], after=expected[1], limit=2)) == expected[2:4]
+    assert ids(list_messages(thread["id"], before=expected[3], limit=2)) == expected[1:3]
+    assert ids(list_messages(thread["id"], order="desc", after=expected[3], limit=2)) == expected[2:0:-1]
+    assert ids(list_messages(thread["id"], order="desc", before=expected[1], limit=2)) == expected[3:1:-1]
+
+
+def test_pages_walk_the_whole_thread(thread):
+    seen, after = [], None
+    while True:
+        page = list_messages(thread["id"], limit=2, **({"after": after} if after else {})).json()
+        seen += [m["id"] for m in page["data"]]
+        if not page["has_more"]:
+            break
+        after = page["last_id"]
+    assert seen == thread["ids"]
+
+
+def test_has_more_at_the_limit(thread):
+    assert list_messages(thread["id"], limit=4).json()["has_more"] is True
+    page = list_messages(thread["id"], limit=5).json()
+    assert page["has_more"] is False
+    assert (page["first_id"], page["last_id"]) == (thread["ids"][0], thread["ids"][-1])
+    assert list_messages(thread["id"], after=thread["ids"][0], limit=4).json()["has_more"] is False
+
+
+def test_unknown_cursor(thread):
+    response = list_messages(thread["id"], after="message_unknown")
+    assert response.status_code == 400
+
+
+def test_after_and_before_together(thread):
+    response = list_messages(thread["id"], after=thread["ids"][0], before=thread["ids"][-1])
+    assert response.status_code == 400
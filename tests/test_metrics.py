@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from api.app import create_app
+from db.database import SessionLocal, engine
+from models.models import Run
+
+client = TestClient(create_app())
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_labelled_by_route_template():
+    labels = {"method": "GET", "route": "/v1/threads/{thread_id}/messages", "status": "404"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    queries = sample("db_query_duration_seconds_count", operation="MessageService.list_messages")
+
+    assert client.get("/v1/threads/abc/messages").status_code == 404
+    assert client.get("/v1/threads/def/messages").status_code == 404
+
+    assert sample("http_request_duration_seconds_count", **labels) == before + 2
+    assert sample("db_query_duration_seconds_count", operation="MessageService.list_messages") > queries
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_count",
+                                     {**labels, "route": "/v1/threads/abc/messages"}) is None
+
+
+def test_unmatched_requests_share_one_label():
+    before = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+    assert client.get("/no/such/path").status_code == 404
+    assert sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == before + 1
+
+
+def test_metrics_endpoint_serves_histograms():
+    client.get("/v1/threads/abc/messages")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ("http_request_duration_seconds_bucket", "service_method_duration_seconds_bucket",
+                 "db_query_duration_seconds_bucket", "db_pool_checkouts"):
+        assert name in response.text
+    assert 'route="/v1/threads/{thread_id}/messages"' in response.text
+
+
+def test_run_transitions_counted_once_per_flush():
+    def transitions(from_status, to_status):
+        return sample("run_status_transitions_total", from_status=from_status, to_status=to_status)
+
+    created, started = transitions("none", "queued"), transitions("queued", "in_progress")
+    db = SessionLocal()
+    try:
+        run = Run(id="run_metrics", assistant_id="asst_metrics", object="run", status="queued", thread_id="thread_metrics")
+        db.add(run)
+        db.flush()
+        assert transitions("none", "queued") == created + 1
+
+        run.status = "in_progress"
+        db.flush()
+        db.flush()
+        db.commit()
+        assert transitions("queued", "in_progress") == started + 1
+
+        # Writing the same status again is not a transition
+        run.status = "in_progress"
+        db.commit()
+        assert transitions("in_progress", "in_progress") == 0
+
+        db.delete(run)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_failed_queries_do_not_skew_later_timings():
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+        assert connection.info.get("query_start") == []
+
+        before = sample("db_query_duration_seconds_count", operation="other")
+        connection.execute(text("SELECT 1"))
+        assert sample("db_query_duration_seconds_count", operation="other") == before + 1
+        assert connection.info["query_start"] == []
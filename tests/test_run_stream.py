@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import services.run_stream_service
+from api.app import create_test_app
+from ollama import AsyncClient
+from services.run_stream_service import stream_run_events
+
+client = TestClient(create_test_app())
+
+CHUNKS = [
+    {"model": "llama3", "message": {"role": "assistant", "content": "Hello"}, "done": False},
+    {"model": "llama3", "message": {"role": "assistant", "content": " there"}, "done": False},
+    {"model": "llama3", "message": {"role": "assistant", "content": ""}, "done": True,
+     "prompt_eval_count": 7, "eval_count": 2},
+]
+
+
+def ollama_client(handler):
+    return AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def chat_handler(request: httpx.Request) -> httpx.Response:
+    assert request.url.path == "/api/chat"
+    return httpx.Response(200, content="".join(json.dumps(chunk) + "\n" for chunk in CHUNKS))
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    mock = ollama_client(chat_handler)
+    monkeypatch.setattr(services.run_stream_service, "get_ollama_client", lambda: mock)
+
+
+@pytest.fixture
+def run():
+    user = client.post("/v1/users", json={"name": "Streamer"}).json()
+    thread = client.post("/v1/threads", json={"participant_ids": [user["id"]]}).json()
+    client.post("/v1/messages", json={"content": "Hi", "thread_id": thread["id"], "sender_id": user["id"],
+                                      "role": "user"})
+    assistant = client.post("/v1/assistants", json={
+        "user_id": user["id"], "name": "a", "description": "d", "model": "llama3", "instructions": "i", "tools": []
+    }).json()
+
+    # The API assigns the run its own id
+    run = {
+        "id": "run_placeholder", "assistant_id": assistant["id"], "cancelled_at": None, "completed_at": None,
+        "created_at": int(time.time()), "expires_at": int(time.time()) + 600, "failed_at": None,
+        "incomplete_details": None, "instructions": "Be brief.", "last_error": None,
+        "max_completion_tokens": 100, "max_prompt_tokens": 500, "meta_data": {}, "model": "llama3",
+        "object": "run", "parallel_tool_calls": False, "required_action": None, "response_format": "text",
+        "started_at": None, "status": "queued", "thread_id": thread["id"], "tool_choice": "none", "tools": [],
+        "truncation_strategy": {}, "usage": None, "temperature": 0.7, "top_p": 0.9, "tool_resources": {}
+    }
+    response = client.post("/v1/runs", json=run)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def stream(run):
+    return client.post(f"/v1/threads/{run['thread_id']}/runs/{run['id']}/stream")
+
+
+def events(response):
+    return [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+
+
+def assistant_messages(run):
+    messages = client.get(f"/v1/threads/{run['thread_id']}/messages").json()["data"]
+    return [m for m in messages if m["role"] == "assistant"]
+
+
+def test_stream_completes_run_once(ollama, run):
+    response = stream(run)
+    assert response.status_code == 200
+    assert events(response) == ["message.delta", "message.delta", "run.completed"]
+
+    stored = client.get(f"/v1/runs/{run['id']}").json()
+    assert stored["status"] == "completed"
+    assert stored["usage"] == {"prompt_tokens": 7, "completion_tokens": 2, "total_tokens": 9}
+    assert [m["content"] for m in assistant_messages(run)] == ["Hello there"]
+
+    again = stream(run)
+    assert again.status_code == 409
+    assert len(assistant_messages(run)) == 1
+
+
+def test_stream_rejects_run_already_in_progress(ollama, run):
+    client.put(f"/v1/runs/{run['id']}/status", json={"status": "in_progress"})
+    assert stream(run).status_code == 409
+
+
+def test_stream_rejects_response_tokens_over_num_ctx(ollama, run):
+    response = client.post(f"/v1/threads/{run['thread_id']}/runs/{run['id']}/stream",
+                           json={"num_ctx": 1024, "response_tokens": 1024})
+    assert response.status_code == 422
+    assert "response_tokens (1024) must be less than num_ctx (1024)" in response.text
+    assert client.get(f"/v1/runs/{run['id']}").json()["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_per_event_loop():
+    first = services.run_stream_service.get_ollama_client()
+    assert services.run_stream_service.get_ollama_client() is first
+
+    async def other_loop_client():
+        return services.run_stream_service.get_ollama_client()
+
+    assert await asyncio.to_thread(asyncio.run, other_loop_client()) is not first
+
+
+def test_stream_unknown_run(ollama, run):
+    response = client.post(f"/v1/threads/{run['thread_id']}/runs/run_missing/stream")
+    assert response.status_code == 404
+
+
+def test_ollama_error_fails_run(monkeypatch, run):
+    failing = ollama_client(lambda request: httpx.Response(500, json={"error": "model not found"}))
+    monkeypatch.setattr(services.run_stream_service, "get_ollama_client", lambda: failing)
+    response = stream(run)
+    assert events(response) == ["run.failed"]
+
+    stored = client.get(f"/v1/runs/{run['id']}").json()
+    assert stored["status"] == "failed"
+    assert "model not found" in stored["last_error"]
+    assert assistant_messages(run) == []
+
+
+@pytest.mark.asyncio
+async def test_disconnect_marks_run_cancelled(ollama):
+    calls = []
+
+    async def persist(content, usage, error, cancelled=False):
+        calls.append((content, error, cancelled))
+
+    events = stream_run_events("run_1", "llama3", [], {}, persist)
+    assert (await events.__anext__()).startswith("event: message.delta")
+    await events.aclose()
+
+    assert calls == [("", None, True)]
+
+
+@pytest.mark.asyncio
+async def test_failed_save_marks_run_failed(ollama):
+    calls = []
+
+    async def persist(content, usage, error, cancelled=False):
+        calls.append((error, cancelled))
+        if len(calls) == 1:
+            raise RuntimeError("database is gone")
+
+    sent = [event async for event in stream_run_events("run_1", "llama3", [], {}, persist)]
+
+    assert sent[-1].startswith("event: run.failed")
+    assert calls == [(None, False), ("Could not save run: database is gone", False)]